@@ -0,0 +1,196 @@
+import asyncio
+import time
+
+from src.logger import logging
+
+# Queued by close(): the worker scores every request queued before it, then exits.
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Groups concurrent single-application requests into small batches that are scored with one model call.
+
+    Requests are put on an asyncio queue. A background task takes the first waiting request, then keeps
+    collecting until either max_batch_size requests are gathered or max_wait_ms has passed, and scores
+    the batch in a worker thread so the event loop is never blocked by the model.
+
+    Args:
+        score_fn: Callable taking a list of records and returning (labels, probabilities).
+        max_batch_size (int): Maximum number of requests scored together.
+        max_wait_ms (float): Maximum time the first request of a batch waits for others to join.
+
+    Example:
+    batcher = MicroBatcher(prediction_pipeline.predict_with_proba, max_batch_size=64, max_wait_ms=2)
+    label, probability = await batcher.submit(request.dict())
+    """
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=2.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._worker = None
+
+        # Counters exposed through stats() for tuning latency against throughput.
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.last_batch_size = 0
+        self.max_seen_batch_size = 0
+        self.batch_size_histogram = {}
+        self.total_score_seconds = 0.0
+
+    def _ensure_started(self):
+        """
+        Start the background worker on the running event loop the first time it is needed.
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, record):
+        """
+        Queue one record for scoring and wait for its (label, probability) result.
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _collect(self):
+        """
+        Wait for the first request, then gather more until the batch is full or the wait time is used up.
+        Returns None when close() was called and no request is left.
+        """
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take everything that is already waiting without yielding to the event loop.
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is _STOP:
+                    # Score this batch first; the worker stops when it takes the marker again.
+                    self._queue.put_nowait(_STOP)
+                    return batch
+                batch.append(item)
+            timeout = deadline - loop.time()
+            if len(batch) >= self.max_batch_size or timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is _STOP:
+                self._queue.put_nowait(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            if batch is None:
+                return
+            # Requests whose client already went away do not need to be scored.
+            batch = [(record, future) for record, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                await self._score(batch)
+            except asyncio.CancelledError:
+                self._fail(future for _, future in batch)
+                raise
+
+    @staticmethod
+    def _fail(futures):
+        for future in futures:
+            if not future.done():
+                future.set_exception(RuntimeError("The micro-batcher was closed before the request was scored"))
+
+    async def _score(self, batch):
+        records = [record for record, _ in batch]
+        started = time.perf_counter()
+        try:
+            labels, probabilities = await asyncio.to_thread(self.score_fn, records)
+            results = [
+                (labels[i], None if probabilities is None else float(probabilities[i]))
+                for i in range(len(batch))
+            ]
+        except Exception:
+            self.failed_batches += 1
+            logging.info(f"Micro-batch of {len(batch)} failed, rescoring the requests one by one")
+            results = []
+            for record in records:
+                try:
+                    labels, probabilities = await asyncio.to_thread(self.score_fn, [record])
+                    results.append((labels[0], None if probabilities is None else float(probabilities[0])))
+                except Exception as e:
+                    results.append(e)
+        self.total_score_seconds += time.perf_counter() - started
+        self._record_batch(len(batch))
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record_batch(self, size):
+        self.batches += 1
+        self.items += size
+        self.last_batch_size = size
+        self.max_seen_batch_size = max(self.max_seen_batch_size, size)
+        # Bucket batch sizes by powers of two: 1, 2, 4, 8, ...
+        bucket = 1 << (size - 1).bit_length()
+        self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        """
+        Return the current queue depth and batch-size statistics.
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "last_batch_size": self.last_batch_size,
+            "max_seen_batch_size": self.max_seen_batch_size,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "mean_score_ms": 1000.0 * self.total_score_seconds / self.batches if self.batches else 0.0,
+            "batch_size_histogram": {str(k): v for k, v in sorted(self.batch_size_histogram.items())},
+        }
+
+    async def close(self, timeout=10.0):
+        """
+        Score the requests that are already queued, then stop the background worker. Requests still
+        pending after timeout seconds fail with a RuntimeError instead of waiting forever.
+        """
+        if self._worker is None:
+            return
+        if not self._worker.done():
+            await self._queue.put(_STOP)
+            try:
+                await asyncio.wait_for(asyncio.shield(self._worker), timeout)
+            except asyncio.TimeoutError:
+                self._worker.cancel()
+                try:
+                    await self._worker
+                except (asyncio.CancelledError, Exception):
+                    pass
+            except Exception:
+                pass
+        pending = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                pending.append(item[1])
+        self._fail(pending)
+        self._worker = None
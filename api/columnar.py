@@ -0,0 +1,182 @@
+import io
+import json
+
+import numpy as np
+
+from src.pipelines.prediction_pipeline import FIELD_MAP, VALUE_ALIASES, _category_key
+
+
+# Media types of the columnar payload formats accepted by POST /check-status/columnar.
+JSON_TYPES = ("application/json",)
+ARROW_TYPES = ("application/vnd.apache.arrow.stream", "application/vnd.apache.arrow.file")
+NPZ_TYPES = ("application/x-npz", "application/octet-stream")
+
+# Accepted (minimum, maximum) of the numerical fields; None leaves a side open.
+NUMERIC_RANGES = {
+    "applicant_income": (0.0, None),
+    "coapplicant_income": (0.0, None),
+    "loan_amount": (0.0, None),
+    "loan_amount_term": (0.0, None),
+    "credit_history": (0.0, 1.0),
+}
+
+
+class ColumnarPayloadError(ValueError):
+    """
+    The payload as a whole cannot be read (unsupported format, missing field, columns of different lengths).
+    """
+
+
+def _to_array(field, values):
+    """
+    Turn a decoded column into a NumPy array: numerical fields as float64 (nulls as NaN), text as a fixed-width
+    string array, and text with nulls as an object array. Numbers sent for a text field become their string
+    keys (2.0 -> "2"), like in the row API.
+    """
+    array = values if isinstance(values, np.ndarray) else np.asarray(values, dtype=object)
+    if array.ndim != 1:
+        raise ColumnarPayloadError(f"{field} must be a one-dimensional column")
+    if array.dtype.kind in "US":
+        return array.astype(str, copy=False)
+    if field in NUMERIC_RANGES:
+        try:
+            return array.astype(np.float64)
+        except (TypeError, ValueError):
+            pass
+    elif array.dtype.kind in "biuf":
+        uniques, inverse = np.unique(array.astype(np.float64), return_inverse=True)
+        keys = np.asarray([_category_key(value) for value in uniques.tolist()], dtype=object)
+        array = keys[inverse.reshape(-1)]
+    # JSON lists and Arrow string columns arrive as objects; keep them as objects only if they hold nulls.
+    if not np.equal(array, None).any():
+        return array.astype(str)
+    return array
+
+
+def decode_columnar(body, content_type):
+    """
+    Decode a columnar payload into {field: numpy array}, without building an object per application.
+
+    Args:
+        body (bytes): The request body.
+        content_type (str): application/json (an object of arrays per field), an Arrow IPC stream or file,
+            or an .npz archive with one array per field (application/x-npz).
+
+    Returns:
+        dict: Snake_case field (see api/schemas.py) -> one-dimensional array.
+
+    Raises:
+        ColumnarPayloadError: If the body cannot be decoded or the columns do not line up.
+    """
+    media_type = (content_type or "application/json").split(";")[0].strip().lower()
+    try:
+        if media_type in JSON_TYPES:
+            data = json.loads(body)
+            if not isinstance(data, dict) or not all(isinstance(values, list) for values in data.values()):
+                raise ColumnarPayloadError("Expected a JSON object with an array of values per field")
+        elif media_type in ARROW_TYPES:
+            import pyarrow as pa
+            import pyarrow.ipc
+            reader = pa.ipc.open_stream if media_type.endswith("stream") else pa.ipc.open_file
+            table = reader(pa.BufferReader(body)).read_all()
+            data = {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+        elif media_type in NPZ_TYPES:
+            with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+                data = {name: archive[name] for name in archive.files}
+        else:
+            raise ColumnarPayloadError(f"Unsupported content type {media_type!r}")
+    except ColumnarPayloadError:
+        raise
+    except ImportError as e:
+        raise ColumnarPayloadError(f"{media_type} payloads need {e.name}, which is not installed")
+    except Exception as e:
+        raise ColumnarPayloadError(f"Could not decode the {media_type} payload: {e}")
+
+    missing = [field for field in FIELD_MAP if field not in data]
+    if missing:
+        raise ColumnarPayloadError(f"Missing fields: {', '.join(missing)}")
+    columns = {field: _to_array(field, data[field]) for field in FIELD_MAP}
+    lengths = {len(values) for values in columns.values()}
+    if len(lengths) > 1:
+        raise ColumnarPayloadError(f"All fields must have the same number of values, got {sorted(lengths)}")
+    return columns
+
+
+def _null_mask(values):
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    if values.dtype.kind == "U":
+        return values == ""
+    return np.equal(values, None) | np.equal(values, "")
+
+
+def _numbers(field, values):
+    """
+    Convert a column to float64, mapping aliases such as "Yes" -> 1.0, with NaN where a value is not a number.
+    """
+    if values.dtype.kind == "f":
+        return values
+    aliases = VALUE_ALIASES.get(FIELD_MAP[field], {})
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    converted = np.empty(len(uniques), dtype=np.float64)
+    for i, value in enumerate(uniques.tolist()):
+        try:
+            converted[i] = aliases[value] if value in aliases else float(value)
+        except ValueError:
+            converted[i] = np.nan
+    return converted[inverse.reshape(-1)]
+
+
+def validate_columns(columns, allowed_categories):
+    """
+    Validate whole columns at once: nulls, numbers and their ranges (see NUMERIC_RANGES) and, for the
+    categorical fields, the accepted values.
+
+    Args:
+        columns (dict): Output of decode_columnar.
+        allowed_categories (dict): Training column -> accepted values (see PredictionPipeline.allowed_categories).
+
+    Returns:
+        tuple: (valid, errors), a boolean mask of the valid rows and {row: [messages]} for the others.
+            Numerical fields of columns are replaced by their float64 values.
+    """
+    n_rows = len(next(iter(columns.values())))
+    errors = {}
+
+    def flag(mask, message):
+        # Messages are only built for the rows that failed a check.
+        for i in np.flatnonzero(mask):
+            errors.setdefault(int(i), []).append(message(int(i)))
+
+    for field, values in columns.items():
+        column = FIELD_MAP[field]
+        nulls = _null_mask(values)
+        flag(nulls, lambda i: f"{field}: value is required")
+
+        if field in NUMERIC_RANGES:
+            numbers = _numbers(field, values)
+            flag(np.isnan(numbers) & ~nulls, lambda i: f"{field}: invalid value {values[i]!r}")
+            low, high = NUMERIC_RANGES[field]
+            with np.errstate(invalid="ignore"):
+                if low is not None:
+                    flag(numbers < low, lambda i: f"{field}: {numbers[i]} is below {low}")
+                if high is not None:
+                    flag(numbers > high, lambda i: f"{field}: {numbers[i]} is above {high}")
+            columns[field] = numbers
+        elif column in allowed_categories:
+            known = np.isin(values.astype(str), np.asarray(allowed_categories[column], dtype=str)) | nulls
+            flag(~known, lambda i: f"{field}: {values[i]!r} is not one of {allowed_categories[column]}")
+
+    valid = np.ones(n_rows, dtype=bool)
+    if errors:
+        valid[list(errors)] = False
+    return valid, errors
+
+
+def select_rows(columns, mask):
+    """
+    Keep the rows of every column where mask is set. Validated rows hold no nulls, so text is returned as
+    fixed-width string arrays, which the featurizer encodes per distinct value.
+    """
+    return {field: values[mask].astype(str) if values.dtype.kind == "O" else values[mask]
+            for field, values in columns.items()}
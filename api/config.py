@@ -0,0 +1,58 @@
+import os
+from dataclasses import dataclass
+
+from src.model_registry import ModelRegistryConfig
+
+
+@dataclass
+class ServingConfig:
+    """
+    Configuration class for the scoring API. Every setting can be overridden through an environment variable.
+
+    Attributes:
+        max_batch_size (int): Maximum number of applications accepted by POST /check-status/batch.
+        max_columnar_rows (int): Maximum number of applications accepted by POST /check-status/columnar.
+        micro_batching (bool): Whether concurrent /check-status requests are grouped into micro-batches.
+        micro_batch_max_size (int): Maximum number of requests scored together by the micro-batcher.
+        micro_batch_max_wait_ms (float): Maximum time a request waits for others to join its micro-batch.
+        compiled_model (bool): Whether the compiled tree ensemble is served instead of the pickled model.
+        serving_artifact (bool): Whether the slim serving artifact is loaded instead of the pickles.
+        registry_dir (str): Model registry whose active version is served (see src/model_registry.py).
+        registry_poll_seconds (float): How often the registry is checked for a new active version; 0 disables it.
+        prediction_cache_size (int): Maximum number of cached /check-status results; 0 disables the cache.
+        prediction_cache_ttl_seconds (float): Lifetime of a cached result; 0 keeps results until they are evicted.
+        drift_monitoring (bool): Whether served applications are compared with the training features (GET /drift).
+        drift_profile_path (str): Reference profile saved by DataTransformation (see src/components/drift_profile.py).
+        drift_window_size (int): Applications per window of the windowed drift scores.
+        drift_psi_threshold (float): PSI above which a field is reported as drifted.
+        job_workers (int): Background processes running bulk-scoring jobs (see api/jobs.py); 0 only queues jobs.
+        job_chunk_size (int): Rows scored and committed at a time by a job worker.
+        job_poll_seconds (float): How often an idle job worker checks the queue.
+        job_lease_seconds (float): Time without a committed chunk after which a running job is claimed again.
+        job_worker_priority (str): "idle" runs job workers only when the CPU is otherwise idle (Linux; niceness
+            10 elsewhere), "low" with niceness 10, "normal" at the priority of the API process.
+        job_input_dir (str): Directory that jobs submitted by path may read from.
+        job_max_upload_bytes (int): Maximum size of an uploaded job input.
+    """
+    max_batch_size: int = int(os.environ.get("LOAN_API_MAX_BATCH_SIZE", 1000))
+    max_columnar_rows: int = int(os.environ.get("LOAN_API_MAX_COLUMNAR_ROWS", 100_000))
+    micro_batching: bool = os.environ.get("LOAN_API_MICRO_BATCHING", "1") == "1"
+    micro_batch_max_size: int = int(os.environ.get("LOAN_API_MICRO_BATCH_MAX_SIZE", 64))
+    micro_batch_max_wait_ms: float = float(os.environ.get("LOAN_API_MICRO_BATCH_MAX_WAIT_MS", 2.0))
+    compiled_model: bool = os.environ.get("LOAN_API_COMPILED_MODEL", "1") == "1"
+    serving_artifact: bool = os.environ.get("LOAN_API_SERVING_ARTIFACT", "1") == "1"
+    registry_dir: str = ModelRegistryConfig().registry_dir
+    registry_poll_seconds: float = float(os.environ.get("LOAN_API_REGISTRY_POLL_SECONDS", 2.0))
+    prediction_cache_size: int = int(os.environ.get("LOAN_API_PREDICTION_CACHE_SIZE", 10_000))
+    prediction_cache_ttl_seconds: float = float(os.environ.get("LOAN_API_PREDICTION_CACHE_TTL_SECONDS", 600.0))
+    drift_monitoring: bool = os.environ.get("LOAN_API_DRIFT_MONITORING", "1") == "1"
+    drift_profile_path: str = os.environ.get("LOAN_API_DRIFT_PROFILE", os.path.join('artifacts', 'drift_profile.json'))
+    drift_window_size: int = int(os.environ.get("LOAN_API_DRIFT_WINDOW_SIZE", 1000))
+    drift_psi_threshold: float = float(os.environ.get("LOAN_API_DRIFT_PSI_THRESHOLD", 0.2))
+    job_workers: int = int(os.environ.get("LOAN_API_JOB_WORKERS", 1))
+    job_chunk_size: int = int(os.environ.get("LOAN_API_JOB_CHUNK_SIZE", 10_000))
+    job_poll_seconds: float = float(os.environ.get("LOAN_API_JOB_POLL_SECONDS", 1.0))
+    job_lease_seconds: float = float(os.environ.get("LOAN_API_JOB_LEASE_SECONDS", 60.0))
+    job_worker_priority: str = os.environ.get("LOAN_API_JOB_WORKER_PRIORITY", "idle")
+    job_input_dir: str = os.environ.get("LOAN_API_JOB_INPUT_DIR", "data")
+    job_max_upload_bytes: int = int(os.environ.get("LOAN_API_JOB_MAX_UPLOAD_BYTES", 1 << 30))
@@ -0,0 +1,210 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from src.components.drift_profile import load_drift_profile
+from src.pipelines.prediction_pipeline import FIELD_MAP, VALUE_ALIASES, _to_float
+
+# Proportions are floored at this value in the PSI, so that an empty bin does not make the score infinite.
+PSI_EPSILON = 1e-4
+
+
+def _label(value, aliases):
+    if aliases and value in aliases:
+        value = aliases[value]
+    if value is None or value == "" or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class _NumericalSketch:
+    """
+    Counts of one numerical feature in the reference bins, plus a slot for missing values.
+    """
+    def __init__(self, reference, aliases):
+        self.edges = list(reference["edges"])
+        self.aliases = aliases
+        self.expected = np.asarray(reference["proportions"], dtype=np.float64)
+        self.reference_missing = reference["missing"]
+        self.missing_slot = len(self.edges) + 1
+        self.n_slots = len(self.edges) + 2
+
+    def slot(self, value):
+        try:
+            x = _to_float(value, self.aliases)
+        except (TypeError, ValueError):
+            return self.missing_slot
+        return self.missing_slot if x != x else bisect_right(self.edges, x)
+
+    def slot_counts(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        slots = np.where(np.isnan(values), self.missing_slot, np.searchsorted(self.edges, values, side="right"))
+        return np.bincount(slots, minlength=self.n_slots)
+
+    def scores(self, counts):
+        scores = _missing_rates(counts, self.reference_missing)
+        observed = counts[:-1].sum()
+        if observed:
+            actual = counts[:-1] / observed
+            scores["psi"] = _psi(actual, self.expected)
+            # Kolmogorov-Smirnov distance between the binned distributions.
+            scores["ks"] = float(np.abs(np.cumsum(actual) - np.cumsum(self.expected)).max())
+        return scores
+
+
+class _CategoricalSketch:
+    """
+    Counts of one categorical feature per reference category, plus slots for unseen categories and missing
+    values, so that new values do not grow the sketch.
+    """
+    def __init__(self, reference, aliases):
+        labels = list(reference["proportions"])
+        self.aliases = aliases
+        self.slots = {label: i for i, label in enumerate(labels)}
+        proportions = [reference["proportions"][label] for label in labels]
+        self.expected = np.array(proportions + [0.0], dtype=np.float64)
+        self.reference_missing = reference["missing"]
+        self.unseen_slot = len(labels)
+        self.missing_slot = len(labels) + 1
+        self.n_slots = len(labels) + 2
+
+    def slot(self, value):
+        label = _label(value, self.aliases)
+        return self.missing_slot if label is None else self.slots.get(label, self.unseen_slot)
+
+    def slot_counts(self, values):
+        # Only the distinct values of the column are looked up.
+        unique, counts = np.unique(np.asarray(values).astype(str), return_counts=True)
+        slot_counts = np.zeros(self.n_slots, dtype=np.int64)
+        for value, count in zip(unique.tolist(), counts.tolist()):
+            slot_counts[self.slot(value)] += count
+        return slot_counts
+
+    def scores(self, counts):
+        scores = _missing_rates(counts, self.reference_missing)
+        observed = counts[:-1].sum()
+        if observed:
+            actual = counts[:-1] / observed
+            scores["psi"] = _psi(actual, self.expected)
+            scores["unseen_rate"] = float(actual[-1])
+        return scores
+
+
+def _missing_rates(counts, reference_missing):
+    return {"missing_rate": float(counts[-1] / counts.sum()), "reference_missing_rate": reference_missing}
+
+
+def _psi(actual, expected):
+    """
+    Population stability index: sum over bins of (actual - expected) * ln(actual / expected).
+    """
+    actual = np.maximum(actual, PSI_EPSILON)
+    expected = np.maximum(expected, PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class DriftMonitor:
+    """
+    Streaming comparison of the served applications with the training features.
+
+    Every LoanData field keeps a fixed-size sketch in the bins of the reference profile that DataTransformation
+    saves at training time (see src/components/drift_profile.py): quantile-bin counts for numerical fields
+    and per-category counts for categorical ones. Recording an application increments one slot per field,
+    so the cost per request and the memory do not grow with traffic.
+
+    Scores are computed on demand for all applications since startup and for the last complete window of
+    window_size applications: the population stability index (PSI) of every field, and for numerical fields
+    the Kolmogorov-Smirnov distance between the binned distributions. Both compare the non-missing values,
+    since LoanData requires every field; the missing rates are reported next to them. Fields with a PSI
+    above psi_threshold are reported as drifted (0.1-0.2 is commonly read as a moderate shift, above 0.2 as
+    significant).
+
+    Example:
+    drift_monitor = DriftMonitor.from_file('artifacts/drift_profile.json')
+    drift_monitor.update(LoanData.Config.schema_extra["example"])
+    drift_monitor.report()
+    """
+    def __init__(self, profile, window_size=1000, psi_threshold=0.2):
+        self.window_size = window_size
+        self.psi_threshold = psi_threshold
+        self.reference_rows = profile["rows"]
+        self.sketches = {}
+        for field, column in FIELD_MAP.items():
+            if column in profile["numerical"]:
+                self.sketches[field] = _NumericalSketch(profile["numerical"][column], VALUE_ALIASES.get(column))
+            elif column in profile["categorical"]:
+                self.sketches[field] = _CategoricalSketch(profile["categorical"][column], VALUE_ALIASES.get(column))
+        self.observed = 0
+        self._total = {field: [0] * sketch.n_slots for field, sketch in self.sketches.items()}
+        self._window = {field: [0] * sketch.n_slots for field, sketch in self.sketches.items()}
+        self._window_count = 0
+        self._last_window = None
+
+    @classmethod
+    def from_file(cls, file_path, **kwargs):
+        return cls(load_drift_profile(file_path), **kwargs)
+
+    def _roll_window(self):
+        if self._window_count >= self.window_size:
+            self._last_window = (self._window, self._window_count)
+            self._window = {field: [0] * sketch.n_slots for field, sketch in self.sketches.items()}
+            self._window_count = 0
+
+    def update(self, record):
+        """
+        Record one application, given as a LoanData dict.
+        """
+        for field, sketch in self.sketches.items():
+            slot = sketch.slot(record.get(field))
+            self._total[field][slot] += 1
+            self._window[field][slot] += 1
+        self.observed += 1
+        self._window_count += 1
+        self._roll_window()
+
+    def update_columns(self, columns):
+        """
+        Record the applications of a columnar payload (see api/columnar.py), one column at a time. A payload
+        that does not fit in the current window is split at the window boundary, so that every window holds
+        exactly window_size applications.
+        """
+        n_rows = len(next(iter(columns.values())))
+        start = 0
+        while start < n_rows:
+            stop = min(n_rows, start + max(self.window_size - self._window_count, 1))
+            for field, sketch in self.sketches.items():
+                counts = sketch.slot_counts(columns[field][start:stop]).tolist()
+                for target in (self._total[field], self._window[field]):
+                    for slot, count in enumerate(counts):
+                        target[slot] += count
+            self.observed += stop - start
+            self._window_count += stop - start
+            self._roll_window()
+            start = stop
+
+    def _scores(self, counts, rows):
+        features = {}
+        for field, sketch in self.sketches.items():
+            scores = sketch.scores(np.asarray(counts[field], dtype=np.float64))
+            scores["drifted"] = scores.get("psi", 0.0) > self.psi_threshold
+            features[field] = {name: round(value, 6) if isinstance(value, float) else value
+                               for name, value in scores.items()}
+        return {"applications": rows, "drifted": [field for field, scores in features.items() if scores["drifted"]],
+                "features": features}
+
+    def report(self):
+        """
+        Return the drift scores since startup ("total") and over the last complete window ("window"; the
+        current partial window until window_size applications were recorded).
+        """
+        report = {"reference_rows": self.reference_rows, "window_size": self.window_size,
+                  "psi_threshold": self.psi_threshold, "total": None, "window": None}
+        if self.observed:
+            report["total"] = self._scores(self._total, self.observed)
+            if self._last_window is not None:
+                report["window"] = self._scores(*self._last_window)
+            else:
+                report["window"] = self._scores(self._window, self._window_count)
+        return report
@@ -0,0 +1,227 @@
+import asyncio
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from api.model_watcher import registry_pipeline_config
+from src.job_store import JobStore, JobStoreConfig
+from src.logger import logging, stop_logging
+from src.model_registry import ModelRegistry, ModelRegistryConfig
+from src.pipelines.bulk_scoring import format_chunk, read_chunks, score_chunk
+from src.pipelines.prediction_pipeline import PredictionPipeline
+
+# Media types of uploaded job inputs and of the results, by format.
+UPLOAD_TYPES = {"text/csv": "csv", "application/x-ndjson": "jsonl", "application/jsonl": "jsonl"}
+RESULT_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+def input_format_of(path):
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".json", ".ndjson") else "csv"
+
+
+def count_rows(input_path, input_format):
+    """
+    Count the applications of an input file (lines after the header for CSV, non-empty lines for JSONL),
+    to report progress. Quoted line breaks in a CSV make this an overestimate.
+    """
+    with open(input_path, "rb") as file_obj:
+        if input_format == "csv":
+            return max(sum(1 for _ in file_obj) - 1, 0)
+        return sum(1 for line in file_obj if line.strip())
+
+
+def run_job(store, job, worker_id, pipelines, stop_event):
+    """
+    Score a claimed job chunk by chunk, resuming after its last committed chunk.
+
+    Each chunk's results are appended to the results file and synced before the chunk is committed together
+    with the new file size; on resume the file is cut back to the committed size, which drops the results
+    of a chunk that was written but not committed. When stop_event is set the job is put back in the queue.
+
+    Returns:
+        bool: True if the job was finished, False if it was released or its lease was lost.
+    """
+    job_id = job["id"]
+    if job["total_rows"] is None:
+        # First claim: pin the model version, so that a resumed job is scored by the same model throughout.
+        version = pipelines.current_version()
+        if not store.start(job_id, worker_id, count_rows(job["input_path"], job["input_format"]), version):
+            return False
+    else:
+        version = job["model_version"]
+    pipeline = pipelines.load(version)
+
+    os.makedirs(os.path.dirname(job["output_path"]) or ".", exist_ok=True)
+    with open(job["output_path"], "r+b" if os.path.exists(job["output_path"]) else "w+b") as output_file:
+        output_file.truncate(job["output_bytes"])
+        output_file.seek(job["output_bytes"])
+
+        start_row, rows_done, errors = 0, job["rows_done"], job["errors"]
+        for index, chunk in enumerate(read_chunks(job["input_path"], job["chunk_size"], job["input_format"])):
+            if index < job["chunks_done"]:
+                start_row += len(chunk)
+                continue
+            if stop_event.is_set():
+                store.release(job_id, worker_id)
+                logging.info(f"Released scoring job {job_id} after {index} chunks")
+                return False
+
+            result = score_chunk(chunk, start_row, pipeline)
+            output_file.write(format_chunk(result, job["output_format"], start_row == 0).encode())
+            output_file.flush()
+            os.fsync(output_file.fileno())
+            start_row += len(chunk)
+            rows_done += len(result)
+            errors += int(result["error"].notna().sum())
+            if not store.commit_chunk(job_id, worker_id, index + 1, rows_done, errors, output_file.tell()):
+                logging.info(f"Lost the lease of scoring job {job_id}; another worker resumes it")
+                return False
+
+    store.finish(job_id, worker_id, "succeeded")
+    logging.info(f"Scoring job {job_id} succeeded: {rows_done} rows, {errors} with errors")
+    return True
+
+
+class _PipelineLoader:
+    """
+    Loads the PredictionPipeline of a registry version, keeping the last one loaded.
+    """
+    def __init__(self, serving_config):
+        self.registry = ModelRegistry(ModelRegistryConfig(registry_dir=serving_config.registry_dir))
+        self.use_compiled_model = serving_config.compiled_model
+        self.use_serving_artifact = serving_config.serving_artifact
+        self._loaded = (object(), None)
+
+    def current_version(self):
+        return self.registry.current()
+
+    def load(self, version):
+        if self._loaded[0] != version:
+            config = registry_pipeline_config(self.registry, version, self.use_compiled_model,
+                                              self.use_serving_artifact)
+            self._loaded = (version, PredictionPipeline(config=config))
+        return self._loaded[1]
+
+
+def _stop_when_orphaned(parent_pid, stop_event, interval=1.0):
+    # A worker whose API process was killed puts its job back in the queue and exits.
+    while not stop_event.is_set():
+        if os.getppid() != parent_pid:
+            stop_event.set()
+        time.sleep(interval)
+
+
+def job_worker(serving_config, store_config, stop_event):
+    """
+    Worker process: claim and run jobs until stop_event is set.
+    """
+    # Leave the CPU to the API process first, so that interactive requests keep their latency: with the
+    # idle scheduling policy (Linux) a worker only runs when no other process wants the CPU.
+    if serving_config.job_worker_priority == "idle" and hasattr(os, "SCHED_IDLE"):
+        os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+    elif serving_config.job_worker_priority != "normal":
+        os.nice(10)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    threading.Thread(target=_stop_when_orphaned, args=(os.getppid(), stop_event), daemon=True).start()
+    store = JobStore(store_config)
+    pipelines = _PipelineLoader(serving_config)
+    try:
+        while not stop_event.is_set():
+            job = store.claim(worker_id, serving_config.job_lease_seconds)
+            if job is None:
+                stop_event.wait(serving_config.job_poll_seconds)
+                continue
+            logging.info(f"Worker {worker_id} claimed scoring job {job['id']} (attempt {job['attempts']})")
+            try:
+                run_job(store, job, worker_id, pipelines, stop_event)
+            except Exception as e:
+                logging.exception(f"Scoring job {job['id']} failed")
+                store.finish(job["id"], worker_id, "failed", error=str(e))
+    finally:
+        stop_logging()
+
+
+class JobRunner:
+    """
+    Pool of background processes running the bulk-scoring jobs queued in the JobStore.
+
+    Jobs are scored in separate processes at a lower scheduling priority, so that they neither hold the
+    event loop nor the GIL of the API process. Each worker loads its own pipeline for the model version a
+    job was pinned to and processes the job in chunks of ServingConfig.job_chunk_size rows. Workers that
+    exit are replaced. On shutdown, workers put their job back in the queue after the current chunk; jobs of
+    a process that died are claimed again once their lease expires. Either way the job resumes after its
+    last committed chunk. When the API runs in several processes (see serve.py) only one of them starts the
+    workers; the others set enabled to False and only queue jobs.
+
+    Example:
+    job_runner = JobRunner(ServingConfig(job_workers=2))
+    job_runner.start()
+    await job_runner.close()
+    """
+    def __init__(self, serving_config, store_config=None):
+        self.serving_config = serving_config
+        self.store_config = store_config or JobStoreConfig()
+        self.enabled = True
+        self.processes = []
+        self.restarts = 0
+        self._context = None
+        self._stop_event = None
+        self._task = None
+
+    def _spawn(self):
+        process = self._context.Process(target=job_worker, args=(self.serving_config, self.store_config,
+                                                                 self._stop_event), daemon=True)
+        process.start()
+        return process
+
+    def start(self):
+        """
+        Start the workers and a task that replaces workers that exit. Called from the app's startup event.
+        """
+        if self.processes or not self.enabled or self.serving_config.job_workers <= 0:
+            return
+        # Spawned rather than forked: the API process runs threads (e.g. the log writer).
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self.processes = [self._spawn() for _ in range(self.serving_config.job_workers)]
+        self._task = asyncio.get_running_loop().create_task(self._supervise())
+        logging.info(f"Started {len(self.processes)} scoring job workers")
+
+    async def _supervise(self):
+        while True:
+            await asyncio.sleep(self.serving_config.job_poll_seconds)
+            for i, process in enumerate(self.processes):
+                if not process.is_alive():
+                    logging.info(f"Scoring job worker {process.pid} exited with {process.exitcode}, starting a new one")
+                    self.processes[i] = self._spawn()
+                    self.restarts += 1
+
+    def _join(self, timeout):
+        self._stop_event.set()
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+
+    async def close(self, timeout=30.0):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.processes:
+            await asyncio.to_thread(self._join, timeout)
+            self.processes = []
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "workers": len(self.processes),
+            "workers_alive": sum(process.is_alive() for process in self.processes),
+            "restarts": self.restarts,
+        }
@@ -1,39 +1,352 @@
-from fastapi import FastAPI
-from app.schemas import LoanData
-import pickle
+import asyncio
+import os
+import shutil
+from typing import Any, Dict, List
+
 import numpy as np
-import pandas as pd
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+from pydantic import ValidationError
+from api.batching import MicroBatcher
+from api.columnar import ColumnarPayloadError, decode_columnar, select_rows, validate_columns
+from api.config import ServingConfig
+from api.drift import DriftMonitor
+from api.jobs import JobRunner, RESULT_TYPES, UPLOAD_TYPES, input_format_of
+from api.metrics import MetricsMiddleware, ServingMetrics
+from api.model_watcher import ModelWatcher
+from api.prediction_cache import PredictionCache
+from api.schemas import LoanData, BatchItemResult, BatchResponse
+from src.job_store import JobStore
+from src.logger import logging
+from src.model_registry import ModelRegistryConfig
 
 app = FastAPI()
 
-with open('classifier.pkl', 'rb') as file:
-    classifier = pickle.load(file)
+serving_config = ServingConfig()
+
+# Request counts, errors, requests in flight and per-stage latency histograms, exposed on GET /metrics.
+metrics = ServingMetrics()
+
+app.add_middleware(MetricsMiddleware, metrics=metrics, routes=lambda: app.routes)
+
+# Load the active registry version (or the default artifacts) once; it is shared by every request and
+# hot-swapped in the background when a new version is activated.
+model_watcher = ModelWatcher(
+    ModelRegistryConfig(registry_dir=serving_config.registry_dir),
+    poll_seconds=serving_config.registry_poll_seconds,
+    use_compiled_model=serving_config.compiled_model,
+    use_serving_artifact=serving_config.serving_artifact,
+)
+
+def serving_pipeline():
+    # A fresh checkout has no model until app.py is run or a version is published.
+    prediction_pipeline = model_watcher.pipeline
+    if prediction_pipeline is None:
+        raise HTTPException(status_code=503,
+                            detail="No model is loaded yet: run app.py or publish a version with registry.py")
+    return prediction_pipeline
+
+def score_records(prediction_pipeline, records):
+    with metrics.stage("featurize"):
+        features = prediction_pipeline.featurize(records)
+    with metrics.stage("predict"):
+        return prediction_pipeline.predict_features(features)
+
+def score_batch(records):
+    # Each micro-batch is scored by the pipeline that is current when the batch starts.
+    return score_records(model_watcher.pipeline, records)
+
+# Group concurrent single-application requests into one model call, scored off the event loop.
+micro_batcher = MicroBatcher(
+    score_batch,
+    max_batch_size=serving_config.micro_batch_max_size,
+    max_wait_ms=serving_config.micro_batch_max_wait_ms,
+)
+
+# Results of repeated applications, invalidated whenever a different model version is served.
+prediction_cache = PredictionCache(
+    max_entries=serving_config.prediction_cache_size,
+    ttl_seconds=serving_config.prediction_cache_ttl_seconds or None,
+)
+
+# Fixed-size sketches of the served applications, compared with the training features on GET /drift.
+drift_monitor = None
+if serving_config.drift_monitoring:
+    if os.path.exists(serving_config.drift_profile_path):
+        drift_monitor = DriftMonitor.from_file(
+            serving_config.drift_profile_path,
+            window_size=serving_config.drift_window_size,
+            psi_threshold=serving_config.drift_psi_threshold,
+        )
+    else:
+        logging.info(f"Drift monitoring is off: {serving_config.drift_profile_path} not found")
+
+# Bulk-scoring jobs, queued in SQLite and scored in chunks by background worker processes.
+job_store = JobStore()
+job_runner = JobRunner(serving_config)
+
+@app.on_event('startup')
+async def startup():
+    model_watcher.start()
+    job_runner.start()
+
+@app.on_event('shutdown')
+async def shutdown():
+    await micro_batcher.close()
+    await model_watcher.close()
+    await job_runner.close()
 
 @app.get('/')
 async def home():
     return "Check you are eligible for Loan or Not!"
 
 @app.post('/check-status')
+@metrics.instrumented
 async def check_loan_status(request: LoanData):
     data = request.dict()
+    model_version = model_watcher.version
+    prediction_pipeline = serving_pipeline()
+
+    # A cached result was validated and scored by the same model version before.
+    cached = prediction_cache.get(data, model_version)
+    if cached is not None:
+        label, _ = cached
+    else:
+        with metrics.stage("validate"):
+            errors = prediction_pipeline.validate([data])
+        if errors:
+            raise HTTPException(status_code=422, detail=errors[0])
 
-    gender = 1 if data['gender'] == "Male" else 0
-    married = 1 if data['married'] == "Married" else 0
-    dependents = int(data['dependents'].rstrip("+"))
-    education = 1 if data['education'] == 'Graduate' else 0
-    self_employed = 1 if data['self_employed'] == 'Yes' else 0
-    applicant_income = float(data['applicant_income'])
-    coapplicant_income = float(data['coapplicant_income'])
-    loan_amount = float(data['loan_amount'])
-    loan_amount_term = float(data['loan_amount_term'])
-    credit_history = 1 if data['credit_history'] == 'Yes' else 0
-    property_area = 1 if data['property_area'] == "Urban" else (2 if data['property_area'] == "Semiurban" else 0)
+        if serving_config.micro_batching:
+            label, probability = await micro_batcher.submit(data)
+        else:
+            labels, probabilities = score_records(prediction_pipeline, [data])
+            label, probability = labels[0], None if probabilities is None else probabilities[0]
 
-    input_data = np.array([[gender, married, dependents, education, self_employed, applicant_income, coapplicant_income, loan_amount, loan_amount_term, credit_history, property_area]])
+        # Do not cache a result if the model was swapped while it was being scored.
+        if model_watcher.version == model_version:
+            prediction_cache.put(data, model_version, (label, probability))
 
-    prediction = classifier.predict(input_data)
+    if drift_monitor is not None:
+        drift_monitor.update(data)
 
-    if prediction[0] == 1:
+    if label == 1:
         return "Congratulations! Your loan application is Approved."
     else:
         return "Sorry, your loan application is Rejected."
+
+@app.post('/check-status/batch', response_model=BatchResponse)
+@metrics.instrumented
+async def check_loan_status_batch(requests: List[Dict[str, Any]]):
+    if len(requests) > serving_config.max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(requests)} applications exceeds the maximum of {serving_config.max_batch_size}"
+        )
+
+    prediction_pipeline = serving_pipeline()
+
+    # Validate every item on its own so that one bad application does not fail the whole batch.
+    results = [BatchItemResult(index=i) for i in range(len(requests))]
+    valid_indices, valid_records = [], []
+    with metrics.stage("validate"):
+        for i, item in enumerate(requests):
+            try:
+                valid_records.append(LoanData(**item).dict())
+                valid_indices.append(i)
+            except ValidationError as e:
+                results[i].errors = [f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in e.errors()]
+
+        value_errors = prediction_pipeline.validate(valid_records) if valid_records else {}
+    for position, messages in value_errors.items():
+        results[valid_indices[position]].errors = messages
+    scored = [(i, record) for position, (i, record) in enumerate(zip(valid_indices, valid_records))
+              if position not in value_errors]
+
+    # Encode all remaining applications as one matrix and call the model once.
+    if scored:
+        if drift_monitor is not None:
+            for _, record in scored:
+                drift_monitor.update(record)
+        labels, probabilities = score_records(prediction_pipeline, [record for _, record in scored])
+        for position, (i, _) in enumerate(scored):
+            approved = bool(labels[position] == 1)
+            results[i].approved = approved
+            results[i].status = "Approved" if approved else "Rejected"
+            if probabilities is not None:
+                results[i].probability = float(probabilities[position])
+
+    return BatchResponse(count=len(results), failed=len(results) - len(scored), results=results)
+
+@app.post('/check-status/columnar')
+async def check_loan_status_columnar(request: Request):
+    """
+    Score applications sent as columns (a JSON object of arrays per field, an Arrow IPC body or an .npz
+    archive), validated with whole-column checks instead of one LoanData object per application.
+    """
+    try:
+        with metrics.stage("decode"):
+            columns = decode_columnar(await request.body(), request.headers.get("content-type"))
+    except ColumnarPayloadError as e:
+        raise HTTPException(status_code=415 if "Unsupported content type" in str(e) else 422, detail=str(e))
+
+    n_rows = len(columns["gender"])
+    if n_rows > serving_config.max_columnar_rows:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Payload of {n_rows} applications exceeds the maximum of {serving_config.max_columnar_rows}"
+        )
+
+    prediction_pipeline = serving_pipeline()
+    with metrics.stage("validate"):
+        valid, errors = validate_columns(columns, prediction_pipeline.allowed_categories())
+
+    # Results are returned as columns too; rows that failed validation hold null.
+    approved = np.full(n_rows, None, dtype=object)
+    probability = np.full(n_rows, None, dtype=object)
+    if valid.any():
+        valid_columns = select_rows(columns, valid)
+        if drift_monitor is not None:
+            drift_monitor.update_columns(valid_columns)
+        # Large payloads are scored in a worker thread so that the event loop keeps serving other requests.
+        labels, probabilities = await asyncio.to_thread(score_records, prediction_pipeline, valid_columns)
+        approved[valid] = (np.asarray(labels) == 1).tolist()
+        if probabilities is not None:
+            probability[valid] = np.asarray(probabilities, dtype=float).tolist()
+
+    with metrics.stage("respond"):
+        return JSONResponse({
+            "count": n_rows,
+            "failed": len(errors),
+            "approved": approved.tolist(),
+            "probability": probability.tolist(),
+            "errors": {str(i): messages for i, messages in errors.items()},
+        })
+
+@app.get('/check-status/batching-stats')
+async def batching_stats():
+    return micro_batcher.stats()
+
+@app.get('/check-status/cache-stats')
+async def cache_stats():
+    return prediction_cache.stats()
+
+@app.get('/metrics')
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.content_type)
+
+@app.get('/drift')
+async def drift_report():
+    if drift_monitor is None:
+        raise HTTPException(status_code=404, detail="Drift monitoring is off or no reference profile was found")
+    return drift_monitor.report()
+
+@app.get('/model')
+async def model_info():
+    return model_watcher.info()
+
+
+def job_view(job):
+    total_rows = job["total_rows"]
+    succeeded = job["status"] == "succeeded"
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "total_rows": total_rows,
+        "rows_done": job["rows_done"],
+        "chunks_done": job["chunks_done"],
+        "errors": job["errors"],
+        "progress": 1.0 if succeeded else min(job["rows_done"] / total_rows, 1.0) if total_rows else 0.0,
+        "model_version": job["model_version"],
+        "attempts": job["attempts"],
+        "error": job["error"],
+        "created": job["created"],
+        "started": job["started"],
+        "finished": job["finished"],
+        "results": f"/jobs/{job['id']}/results" if succeeded else None,
+    }
+
+async def save_upload(request, file_path):
+    # Stream the body to disk instead of holding a large file in memory.
+    size = 0
+    with open(file_path, "wb") as file_obj:
+        async for block in request.stream():
+            size += len(block)
+            if size > serving_config.job_max_upload_bytes:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload exceeds the maximum of {serving_config.job_max_upload_bytes} bytes"
+                )
+            file_obj.write(block)
+
+@app.post('/jobs', status_code=202)
+async def submit_job(request: Request, output_format: str = "csv"):
+    """
+    Queue a bulk-scoring job. The applications are either uploaded as the body (text/csv in the
+    data/loan_dataset.csv schema, or application/x-ndjson with one application per line), or read from a
+    file under ServingConfig.job_input_dir given as {"path": ...} (application/json).
+    """
+    serving_pipeline()
+    if output_format not in RESULT_TYPES:
+        raise HTTPException(status_code=422, detail=f"output_format must be one of {list(RESULT_TYPES)}")
+    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    job_id = JobStore.new_id()
+    job_dir = job_store.job_dir(job_id)
+
+    if content_type in UPLOAD_TYPES:
+        input_format = UPLOAD_TYPES[content_type]
+        input_path = os.path.join(job_dir, f"input.{input_format}")
+        os.makedirs(job_dir, exist_ok=True)
+        try:
+            await save_upload(request, input_path)
+        except BaseException:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+    elif content_type == "application/json":
+        try:
+            body = await request.json()
+            path = body["path"]
+        except Exception:
+            raise HTTPException(status_code=422, detail='Expected a JSON object {"path": ...}')
+        input_path = os.path.realpath(path)
+        input_dir = os.path.realpath(serving_config.job_input_dir)
+        if os.path.commonpath([input_path, input_dir]) != input_dir:
+            raise HTTPException(status_code=403, detail=f"Jobs may only read files under {serving_config.job_input_dir}")
+        if not os.path.isfile(input_path):
+            raise HTTPException(status_code=404, detail=f"{path} not found")
+        input_format = body.get("format") or input_format_of(input_path)
+        if input_format not in RESULT_TYPES:
+            raise HTTPException(status_code=422, detail=f"format must be one of {list(RESULT_TYPES)}")
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported content type {content_type!r}; expected one of {list(UPLOAD_TYPES)} or application/json"
+        )
+
+    output_path = os.path.join(job_dir, f"results.{output_format}")
+    await asyncio.to_thread(job_store.create, input_path, input_format, output_path, output_format,
+                            serving_config.job_chunk_size, job_id)
+    return job_view(await asyncio.to_thread(job_store.get, job_id))
+
+@app.get('/jobs')
+async def list_jobs(status: str = None, limit: int = 100):
+    jobs = await asyncio.to_thread(job_store.list, status, limit)
+    counts = await asyncio.to_thread(job_store.counts)
+    return {"counts": counts, "runner": job_runner.stats(), "jobs": [job_view(job) for job in jobs]}
+
+@app.get('/jobs/{job_id}')
+async def job_status(job_id: str):
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job_view(job)
+
+@app.get('/jobs/{job_id}/results')
+async def job_results(job_id: str):
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    if job["status"] != "succeeded":
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}")
+    return FileResponse(job["output_path"], media_type=RESULT_TYPES[job["output_format"]],
+                        filename=f"{job_id}.{job['output_format']}")
@@ -0,0 +1,244 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+
+from starlette.routing import Match
+
+from src.logger import logging, REQUEST_LOGGER_NAME
+
+# Per-request access log; sampled by src.logger so that it stays cheap under load.
+request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
+
+
+# Upper bounds (seconds) of the latency histogram buckets, from 100us to 10s.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+
+
+def _format_labels(labelnames, labels, extra=None):
+    pairs = list(zip(labelnames, labels)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class _Sharded:
+    """
+    Base class of metrics that every thread updates in its own shard, so that recording takes no lock.
+    The shards are only summed when the metric is collected.
+    """
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        shard = self._shards.get(threading.get_ident())
+        if shard is None:
+            # Only the first update of a thread takes the lock.
+            with self._lock:
+                shard = self._shards.setdefault(threading.get_ident(), {})
+        return shard
+
+    def _merged(self, new, add):
+        merged = {}
+        with self._lock:
+            shards = list(self._shards.values())
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                merged[labels] = add(merged[labels], value) if labels in merged else new(value)
+        return merged
+
+
+class Counter(_Sharded):
+    """
+    Monotonic count, e.g. of requests.
+
+    Example:
+    requests_total = Counter("loan_api_requests_total", "Requests served.", ["path"])
+    requests_total.inc("/check-status")
+    """
+    def inc(self, *labels, amount=1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._merged(lambda value: value, lambda a, b: a + b).items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    Value that goes up and down, e.g. requests in flight. Only updated from the event loop thread.
+    """
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def collect(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {self.value}"]
+
+
+class Histogram(_Sharded):
+    """
+    Distribution of observed values over fixed buckets, exposed as cumulative Prometheus buckets.
+
+    Example:
+    stage_seconds = Histogram("loan_api_stage_duration_seconds", "Time per stage.", ["stage"])
+    stage_seconds.observe(0.0012, "featurize")
+    """
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        counts = shard.get(labels)
+        if counts is None:
+            # One slot per bucket, one for +Inf and one for the sum.
+            counts = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        merged = self._merged(list, lambda a, b: [x + y for x, y in zip(a, b)])
+        for labels, counts in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {counts[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class ServingMetrics:
+    """
+    Request and pipeline-stage metrics of the scoring API, exposed in the Prometheus text format.
+    The stages are decode, validate, featurize, predict and respond.
+
+    MetricsMiddleware counts requests, errors and requests in flight and times whole requests. Endpoints
+    time their stages with stage(); for endpoints with a LoanData body, decode covers reading the body,
+    parsing the JSON and building the model, from the start of the request until the endpoint runs, and
+    respond covers serializing and sending the response after it returns (see instrumented).
+
+    Example:
+    metrics = ServingMetrics()
+    with metrics.stage("featurize"):
+        features = prediction_pipeline.featurize(records)
+    """
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self.requests_total = Counter("loan_api_requests_total", "Requests served.", ["method", "path", "status"])
+        self.errors_total = Counter("loan_api_request_errors_total",
+                                    "Requests that failed, by client (4xx) or server (5xx) error.", ["path", "kind"])
+        self.in_flight = Gauge("loan_api_requests_in_flight", "Requests being served.")
+        self.request_seconds = Histogram("loan_api_request_duration_seconds", "Time to serve a request.", ["path"])
+        self.stage_seconds = Histogram("loan_api_stage_duration_seconds", "Time spent in each pipeline stage.",
+                                       ["stage"])
+        self._request_times = ContextVar("loan_api_request_times", default=None)
+
+    def observe_stage(self, stage, seconds):
+        self.stage_seconds.observe(seconds, stage)
+
+    @contextmanager
+    def stage(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds.observe(time.perf_counter() - started, stage)
+
+    def instrumented(self, endpoint):
+        """
+        Decorate an async endpoint so that the decode and respond stages around it are recorded.
+        """
+        @wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            times = self._request_times.get()
+            if times is not None:
+                self.stage_seconds.observe(time.perf_counter() - times["started"], "decode")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if times is not None:
+                    times["handled"] = time.perf_counter()
+        return wrapper
+
+    def render(self):
+        metrics = (self.requests_total, self.errors_total, self.in_flight, self.request_seconds, self.stage_seconds)
+        return "\n".join(line for metric in metrics for line in metric.collect()) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording ServingMetrics for every HTTP request. Requests are labelled with the path
+    template of the route they match (e.g. /jobs/{job_id}), and paths that match no route are counted under
+    "other", so that neither path parameters nor unknown URLs create new time series.
+    """
+    def __init__(self, app, metrics, routes):
+        self.app = app
+        self.metrics = metrics
+        self.routes = routes
+        self.route_label = lru_cache(maxsize=1024)(self._route_label)
+
+    def _route_label(self, path):
+        # Any method: a request with the wrong method is still counted under the route it was sent to.
+        scope = {"type": "http", "path": path, "root_path": "", "method": "GET"}
+        for route in self.routes():
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return getattr(route, "path_format", path)
+        return "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        path = self.route_label(scope["path"])
+        times = {"started": time.perf_counter(), "handled": None}
+        token = metrics._request_times.set(times)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) \
+                    and times["handled"] is not None:
+                metrics.observe_stage("respond", time.perf_counter() - times["handled"])
+
+        metrics.in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - times["started"]
+            metrics.in_flight.dec()
+            metrics._request_times.reset(token)
+            metrics.request_seconds.observe(seconds, path)
+            metrics.requests_total.inc(scope["method"], path, str(status))
+            if status >= 400:
+                metrics.errors_total.inc(path, "client" if status < 500 else "server")
+            request_logger.info("%s %s %s %.2fms", scope["method"], scope["path"], status, seconds * 1000,
+                                extra={"method": scope["method"], "path": scope["path"], "status": status,
+                                       "duration_ms": round(seconds * 1000, 3)})
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import time
+
+from src.logger import logging
+from src.model_registry import ModelRegistry, ModelRegistryConfig
+from src.pipelines.prediction_pipeline import PredictionPipeline, PredictionPipelineConfig
+
+
+def registry_pipeline_config(registry, version, use_compiled_model=True, use_serving_artifact=True):
+    """
+    Return the PredictionPipelineConfig of a registry version, or of the default artifacts for None.
+    """
+    if version is None:
+        return PredictionPipelineConfig(use_compiled_model=use_compiled_model,
+                                        use_serving_artifact=use_serving_artifact)
+    files = registry.files(version)
+    return PredictionPipelineConfig(
+        preprocessor_file_path=files["preprocessor"],
+        model_file_path=files["model"],
+        compiled_model_file_path="",
+        use_compiled_model=False,
+        serving_artifact_file_path=files.get("serving_artifact", ""),
+        use_serving_artifact=use_serving_artifact,
+    )
+
+
+class ModelWatcher:
+    """
+    Holds the PredictionPipeline being served and hot-swaps it when the registry's active version changes.
+
+    A background task polls the registry pointer. A new version is loaded in a worker thread, off the request
+    path, and then swapped in with a single reference assignment: requests that already picked up the old
+    pipeline finish with it, and no request ever waits for a load or sees a partially loaded model. Without a
+    published version the pipeline is loaded from the default artifact paths, as before.
+
+    Example:
+    watcher = ModelWatcher(ModelRegistryConfig(), poll_seconds=2.0)
+    watcher.start()
+    labels, probabilities = watcher.pipeline.predict_with_proba(records)
+    """
+    def __init__(self, registry_config=None, poll_seconds=2.0, use_compiled_model=True, use_serving_artifact=True):
+        self.registry = ModelRegistry(registry_config or ModelRegistryConfig())
+        self.poll_seconds = poll_seconds
+        self.use_compiled_model = use_compiled_model
+        self.use_serving_artifact = use_serving_artifact
+        self.swaps = 0
+        self._failed_version = None
+        self._task = None
+        version = self.registry.current()
+        if version is None and not self._available(None):
+            logging.info("No model to serve yet: run app.py or publish a version with registry.py")
+            self._current = (None, None, None)
+        else:
+            self._current = (version, self._load(version), time.time())
+
+    @property
+    def pipeline(self):
+        return self._current[1]
+
+    @property
+    def version(self):
+        return self._current[0]
+
+    def _pipeline_config(self, version):
+        return registry_pipeline_config(self.registry, version, self.use_compiled_model, self.use_serving_artifact)
+
+    def _available(self, version):
+        config = self._pipeline_config(version)
+        return os.path.exists(config.preprocessor_file_path) and os.path.exists(config.model_file_path)
+
+    def _load(self, version):
+        return PredictionPipeline(config=self._pipeline_config(version))
+
+    async def check(self):
+        """
+        Load and swap in the active registry version if it differs from the one being served.
+
+        Returns:
+            bool: True if a new version was swapped in.
+        """
+        version = await asyncio.to_thread(self.registry.current)
+        if version is None:
+            # Without a published version, only wait for app.py to write the default artifacts.
+            if self.pipeline is not None or not self._available(None):
+                return False
+        elif version == self.version or version == self._failed_version:
+            return False
+        started = time.perf_counter()
+        try:
+            pipeline = await asyncio.to_thread(self._load, version)
+        except Exception as e:
+            # Keep serving the current version and do not retry until the pointer changes again.
+            self._failed_version = version
+            logging.info(f"Could not load model version {version}, still serving {self.version}: {e}")
+            return False
+        previous = self.version
+        self._current = (version, pipeline, time.time())
+        self._failed_version = None
+        self.swaps += 1
+        logging.info(f"Swapped model version {previous} -> {version} (loaded in {time.perf_counter() - started:.2f}s)")
+        return True
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.check()
+            except Exception as e:
+                logging.info(f"Model registry poll failed: {e}")
+
+    def start(self):
+        if self._task is None and self.poll_seconds > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def info(self):
+        version, pipeline, loaded_at = self._current
+        return {
+            "version": version,
+            "model": type(pipeline.model).__name__ if pipeline is not None else None,
+            "loaded_at": loaded_at,
+            "swaps": self.swaps,
+        }
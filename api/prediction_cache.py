@@ -0,0 +1,125 @@
+import hashlib
+import json
+import sys
+import time
+from collections import OrderedDict
+
+
+def canonical_key(record):
+    """
+    Hash an application into a fixed-size key. The record is the validated LoanData dict, so numbers are
+    already floats (5000 and 5000.0 give the same key); fields are serialized in sorted order.
+    """
+    payload = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+
+class PredictionCache:
+    """
+    Bounded in-process LRU cache of (label, probability) results for repeated applications.
+
+    Entries are keyed by the canonical hash of an application and the model version that scored it. When
+    a different model version is looked up the cache is cleared, so results of a swapped-out model are never
+    returned. Entries expire ttl_seconds after they were stored (None keeps them until they are evicted), and
+    the least recently used entry is evicted once max_entries is reached.
+
+    Args:
+        max_entries (int): Maximum number of cached results; 0 disables the cache.
+        ttl_seconds (float): Lifetime of an entry, or None for no expiry.
+
+    Example:
+    cache = PredictionCache(max_entries=10000, ttl_seconds=600)
+    result = cache.get(record, model_watcher.version)
+    if result is None:
+        result = score(record)
+        cache.put(record, model_watcher.version, result)
+    """
+    def __init__(self, max_entries=10_000, ttl_seconds=600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._model_version = None
+
+        # Counters exposed through stats() for sizing the cache.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def _check_model(self, model_version):
+        if model_version != self._model_version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._model_version = model_version
+
+    def get(self, record, model_version):
+        """
+        Return the cached (label, probability) of a record scored by model_version, or None.
+        """
+        if not self.enabled:
+            return None
+        self._check_model(model_version)
+        key = (canonical_key(record), model_version)
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl_seconds is not None and time.monotonic() - entry[1] > self.ttl_seconds:
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, record, model_version, result):
+        """
+        Store the (label, probability) of a record scored by model_version.
+        """
+        if not self.enabled:
+            return
+        self._check_model(model_version)
+        key = (canonical_key(record), model_version)
+        self._entries[key] = (result, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def memory_bytes(self):
+        """
+        Approximate memory held by the entries: the dict slots plus each key, value and timestamp.
+        """
+        if not self._entries:
+            return sys.getsizeof(self._entries)
+        key, (result, stored) = next(iter(self._entries.items()))
+        per_entry = (sys.getsizeof(key) + sys.getsizeof(key[0]) + sys.getsizeof(result)
+                     + sum(sys.getsizeof(value) for value in result) + sys.getsizeof((result, stored))
+                     + sys.getsizeof(stored))
+        return sys.getsizeof(self._entries) + per_entry * len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "model_version": self._model_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "memory_bytes": self.memory_bytes(),
+        }
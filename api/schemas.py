@@ -1,3 +1,4 @@
+from typing import List, Optional
 from pydantic import BaseModel
 
 class LoanData(BaseModel):
@@ -29,3 +30,17 @@ class LoanData(BaseModel):
                 "property_area": "Urban"
             }
         }
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: Optional[str] = None
+    approved: Optional[bool] = None
+    probability: Optional[float] = None
+    errors: Optional[List[str]] = None
+
+
+class BatchResponse(BaseModel):
+    count: int
+    failed: int
+    results: List[BatchItemResult]
@@ -1,5 +1,6 @@
 from src.logger import logging
 from src.exception import CustomException
+from src.cache import StageCache
 from src.components.data_ingestion import DataIngestion, DataIngestionConfig
 from src.components.data_transformation import DataTransformationConfig, DataTransformation
 from src.components.model_trainer import ModelTrainerConfig, ModelTrainer
@@ -11,14 +12,18 @@ if __name__=="__main__":
     logging.info("The execution has started")
 
     try:
-        data_ingestion=DataIngestion()
+        stage_cache=StageCache()
+
+        data_ingestion=DataIngestion(stage_cache)
         train_data_path,test_data_path=data_ingestion.initiate_data_ingestion()
 
-        data_transformation=DataTransformation()
+        data_transformation=DataTransformation(stage_cache)
         train_arr,test_arr,_=data_transformation.initiate_data_transformation(train_data_path,test_data_path)
 
-        model_trainer=ModelTrainer()
+        model_trainer=ModelTrainer(stage_cache)
         print(model_trainer.initiate_model_trainer(train_arr,test_arr))
+
+        logging.info(f"Stage cache summary: {stage_cache.summary()}")
         
     except Exception as e:
         logging.info("Custom Exception")
@@ -0,0 +1,322 @@
+from src.logger import logging
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+SOURCE_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "loan_dataset.csv")
+
+# Benchmarks that can be selected with --benchmarks, in the order they run.
+BENCHMARKS = ("ingestion", "preprocessor", "featurize", "predict", "search")
+
+# Small fixed grids, so that the search benchmark times each model family rather than the size of its grid.
+SEARCH_GRIDS = {
+    "Random Forest": {"n_estimators": [16, 64], "max_depth": [None, 10]},
+    "Decision Tree": {"max_depth": [None, 5, 10]},
+    "Gradient Boosting": {"n_estimators": [16, 64], "learning_rate": [0.1]},
+    "Logistic Regression": {},
+    "XGBClassifier": {"n_estimators": [16, 64], "max_depth": [3, 5]},
+    "CatBoostClassifier": {"iterations": [30, 100], "depth": [6], "learning_rate": [0.1]},
+    "AdaBoost Classifier": {"n_estimators": [16, 64], "learning_rate": [0.5]},
+}
+
+
+def make_synthetic_dataset(scale, seed=0, source_path=SOURCE_DATA_PATH):
+    """
+    Generate scale times as many applications as data/loan_dataset.csv, with the same columns, categories,
+    missing values and label balance: rows are drawn from the source with replacement, amounts get
+    multiplicative noise and every row gets a new Loan_ID. The same scale and seed give the same data.
+    """
+    source = pd.read_csv(source_path)
+    rng = np.random.default_rng(seed)
+    n_rows = int(round(len(source) * scale))
+    df = source.iloc[rng.integers(0, len(source), n_rows)].reset_index(drop=True)
+    df["Loan_ID"] = [f"LP{i:09d}" for i in range(n_rows)]
+    for column in ("ApplicantIncome", "CoapplicantIncome", "LoanAmount"):
+        df[column] = np.round(df[column] * rng.lognormal(0.0, 0.1, n_rows))
+    return df
+
+
+def measure(fn, repeats):
+    """
+    Call fn repeats times and return the median wall time in seconds and the last result.
+    """
+    times, result = [], None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def result(benchmark, scale, metric, value, unit, higher_is_better):
+    return {"benchmark": benchmark, "scale": scale, "metric": metric, "value": float(value), "unit": unit,
+            "higher_is_better": higher_is_better}
+
+
+@contextmanager
+def working_directory(path):
+    # The pipeline components write to relative artifacts/ paths; keep them out of the repository.
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def bench_ingestion(data_path, scale, n_rows, repeats):
+    from src.cache import StageCache, StageCacheConfig
+    from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+
+    results = []
+    for streaming in (False, True):
+        def run():
+            ingestion = DataIngestion(StageCache(StageCacheConfig(enabled=False)))
+            ingestion.ingestion_config = DataIngestionConfig(source_data_path=data_path, streaming=streaming)
+            return ingestion.initiate_data_ingestion()
+        seconds, _ = measure(run, repeats)
+        name = "ingestion.streaming" if streaming else "ingestion.batch"
+        results.append(result(name, scale, "rows_per_second", n_rows / seconds, "rows/s", True))
+    return results
+
+
+def bench_preprocessor(train_path, scale, repeats):
+    from src.components.data_transformation import DataTransformation
+    from src.utils import load_frame
+
+    transformation = DataTransformation()
+    features = load_frame(train_path).drop(columns=["Loan_Status", "Loan_ID"])
+    batch_seconds, preprocessor = measure(lambda: transformation.get_data_transformer_object().fit(features), repeats)
+    incremental_seconds, _ = measure(
+        lambda: transformation.fit_incremental_preprocessor(transformation.compute_statistics(train_path)), repeats)
+    return [
+        result("preprocessor.fit_batch", scale, "seconds", batch_seconds, "s", False),
+        result("preprocessor.fit_incremental", scale, "seconds", incremental_seconds, "s", False),
+    ], preprocessor, features
+
+
+def bench_featurize(pipeline, features, scale, repeats):
+    from src.pipelines.prediction_pipeline import FIELD_MAP
+
+    # Request-shaped inputs: a list of snake_case dicts, and the same applications as string/float columns.
+    request_fields = {column: field for field, column in FIELD_MAP.items()}
+    frame = features.rename(columns=request_fields)
+    records = frame.to_dict("records")
+    columns = {field: frame[field].to_numpy(dtype=np.float64) if pd.api.types.is_numeric_dtype(frame[field])
+               else np.asarray(frame[field].fillna("").astype(str).tolist())
+               for field in frame.columns}
+    n_rows = len(records)
+    records_seconds, _ = measure(lambda: pipeline.featurize(records), repeats)
+    columns_seconds, _ = measure(lambda: pipeline.featurize(columns), repeats)
+    return [
+        result("featurize.records", scale, "rows_per_second", n_rows / records_seconds, "rows/s", True),
+        result("featurize.columns", scale, "rows_per_second", n_rows / columns_seconds, "rows/s", True),
+    ], records
+
+
+def bench_predict(pipelines, records, scale, single_calls):
+    results = []
+    rng = np.random.default_rng(0)
+    for name, pipeline in pipelines.items():
+        latencies = []
+        for i in rng.integers(0, len(records), single_calls):
+            started = time.perf_counter()
+            pipeline.predict_with_proba([records[i]])
+            latencies.append(time.perf_counter() - started)
+        batch = records[:1000]
+        batch_seconds, _ = measure(lambda: pipeline.predict_with_proba(batch), 5)
+        results += [
+            result(f"predict.{name}.single", scale, "p50_ms", np.percentile(latencies, 50) * 1000, "ms", False),
+            result(f"predict.{name}.single", scale, "p99_ms", np.percentile(latencies, 99) * 1000, "ms", False),
+            result(f"predict.{name}.batch", scale, "rows_per_second", len(batch) / batch_seconds, "rows/s", True),
+        ]
+    return results
+
+
+def bench_search(X, y, scale, families):
+    from sklearn.base import clone
+    from src.evaluate import evaluate_models
+
+    from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+    from xgboost import XGBClassifier
+    from catboost import CatBoostClassifier
+
+    models = {
+        "Random Forest": RandomForestClassifier(random_state=0),
+        "Decision Tree": DecisionTreeClassifier(random_state=0),
+        "Gradient Boosting": GradientBoostingClassifier(random_state=0),
+        "Logistic Regression": LogisticRegression(),
+        "XGBClassifier": XGBClassifier(random_state=0),
+        "CatBoostClassifier": CatBoostClassifier(verbose=False, random_seed=0, thread_count=1),
+        "AdaBoost Classifier": AdaBoostClassifier(random_state=0),
+    }
+    split = int(len(X) * 0.8)
+    results = []
+    for family in families:
+        started = time.perf_counter()
+        evaluate_models(models={family: clone(models[family])}, params={family: SEARCH_GRIDS[family]},
+                        X_train=X[:split], y_train=y[:split], X_test=X[split:], y_test=y[split:], n_jobs=1)
+        family_key = family.lower().replace(" ", "_")
+        results.append(result(f"search.{family_key}", scale, "seconds", time.perf_counter() - started, "s", False))
+    return results
+
+
+def run_scale(scale, args):
+    """
+    Generate the dataset of one scale factor in a temporary directory and run the selected benchmarks on it.
+    """
+    from src.pipelines.compiled_model import compile_model
+    from src.pipelines.prediction_pipeline import PredictionPipeline
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="loan-benchmark-") as tmp_dir, working_directory(tmp_dir):
+        df = make_synthetic_dataset(scale, seed=args.seed)
+        data_path = os.path.join(tmp_dir, "loan_dataset.csv")
+        df.to_csv(data_path, index=False)
+        n_rows = len(df)
+        print(f"scale {scale}x: {n_rows} rows")
+
+        if "ingestion" in args.benchmarks:
+            results += bench_ingestion(data_path, scale, n_rows, args.repeats)
+
+        train_df = df.sample(frac=0.8, random_state=args.seed)
+        train_path = os.path.join(tmp_dir, "train.feather")
+        train_df.reset_index(drop=True).to_feather(train_path)
+
+        needs_models = {"preprocessor", "featurize", "predict", "search"} & set(args.benchmarks)
+        if not needs_models:
+            return results
+
+        preprocessor_results, preprocessor, features = bench_preprocessor(train_path, scale, args.repeats)
+        if "preprocessor" in args.benchmarks:
+            results += preprocessor_results
+
+        X = np.asarray(preprocessor.transform(features))
+        y = (train_df["Loan_Status"].to_numpy() == "Y").astype(int)
+        fit_rows = min(len(X), args.search_max_rows)
+        pipelines = {
+            "logistic_regression": PredictionPipeline(preprocessor=preprocessor,
+                                                      model=LogisticRegression().fit(X[:fit_rows], y[:fit_rows])),
+            "random_forest": PredictionPipeline(preprocessor=preprocessor, model=compile_model(
+                RandomForestClassifier(n_estimators=100, random_state=0).fit(X[:fit_rows], y[:fit_rows]))),
+        }
+
+        records = None
+        if "featurize" in args.benchmarks or "predict" in args.benchmarks:
+            featurize_results, records = bench_featurize(pipelines["logistic_regression"], features, scale,
+                                                         args.repeats)
+            if "featurize" in args.benchmarks:
+                results += featurize_results
+        if "predict" in args.benchmarks:
+            results += bench_predict(pipelines, records, scale, args.single_calls)
+        if "search" in args.benchmarks:
+            # The search runs on at most search_max_rows rows, so that 1000x stays tractable.
+            results += bench_search(X[:fit_rows], y[:fit_rows], scale, args.families)
+    return results
+
+
+def environment():
+    import sklearn
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "created": time.time(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(baseline, current, threshold):
+    """
+    Match the results of two runs by (benchmark, scale, metric) and flag those that got worse by more than
+    threshold (a fraction, e.g. 0.1 = 10%).
+
+    Returns:
+        list: One row per shared result with the relative change (positive = better) and a regression flag.
+    """
+    baseline_results = {(r["benchmark"], r["scale"], r["metric"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        key = (r["benchmark"], r["scale"], r["metric"])
+        if key not in baseline_results or baseline_results[key]["value"] == 0:
+            continue
+        before, after = baseline_results[key]["value"], r["value"]
+        change = (after - before) / before if r["higher_is_better"] else (before - after) / before
+        rows.append({"benchmark": key[0], "scale": key[1], "metric": key[2], "unit": r["unit"],
+                     "baseline": before, "current": after, "change": change, "regression": change < -threshold})
+    return rows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic data at several scale factors.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run the benchmarks and write the results as JSON")
+    run.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100, 1000])
+    run.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    run.add_argument("--families", nargs="+", choices=list(SEARCH_GRIDS), default=list(SEARCH_GRIDS))
+    run.add_argument("--repeats", type=int, default=3, help="Timings are the median of this many runs")
+    run.add_argument("--single-calls", type=int, default=200, help="Single-row predictions per model")
+    run.add_argument("--search-max-rows", type=int, default=20_000)
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--output", default="benchmark_results.json")
+
+    comparison = commands.add_parser("compare", help="Compare two result files and flag regressions")
+    comparison.add_argument("baseline")
+    comparison.add_argument("current")
+    comparison.add_argument("--threshold", type=float, default=0.10,
+                            help="Relative slowdown above which a result is a regression")
+    return parser.parse_args()
+
+
+if __name__=="__main__":
+    args = parse_args()
+
+    if args.command == "run":
+        logging.info("Benchmark suite has started")
+        results = []
+        for scale in args.scales:
+            results += run_scale(int(scale) if float(scale).is_integer() else scale, args)
+        for r in results:
+            print(f"{r['benchmark']:>40} {r['scale']:>6}x {r['metric']:>16}: {r['value']:.4g} {r['unit']}")
+        with open(args.output, "w") as file_obj:
+            json.dump({"environment": environment(), "results": results}, file_obj, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+    else:
+        with open(args.baseline) as file_obj:
+            baseline = json.load(file_obj)
+        with open(args.current) as file_obj:
+            current = json.load(file_obj)
+        rows = compare(baseline, current, args.threshold)
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(f"{row['benchmark']:>40} {row['scale']:>6}x {row['metric']:>16}: {row['baseline']:.4g} -> "
+                  f"{row['current']:.4g} {row['unit']} ({row['change']:+.1%}) {flag}")
+        regressions = [row for row in rows if row["regression"]]
+        print(f"{len(rows)} results compared, {len(regressions)} regressions beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
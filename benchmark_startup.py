@@ -0,0 +1,89 @@
+from src.logger import logging
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+# Each run imports the API in a fresh interpreter and answers one /check-status request.
+CHILD_CODE = """
+import time
+started = time.perf_counter()
+import asyncio, json, sys
+from api.main import check_loan_status
+from api.schemas import LoanData
+imported = time.perf_counter()
+answer = asyncio.run(check_loan_status(LoanData(**LoanData.Config.schema_extra["example"])))
+answered = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - started,
+    "first_prediction_seconds": answered - imported,
+    "answer": answer,
+    "heavy_modules": [name for name in ("pandas", "scipy", "sklearn", "xgboost", "catboost") if name in sys.modules],
+}))
+"""
+
+# Serving modes, from the slimmest to the original pickles, selected through the API's environment variables.
+MODES = {
+    "serving_artifact": {"LOAN_API_SERVING_ARTIFACT": "1", "LOAN_API_COMPILED_MODEL": "1"},
+    "compiled_model": {"LOAN_API_SERVING_ARTIFACT": "0", "LOAN_API_COMPILED_MODEL": "1"},
+    "pickle": {"LOAN_API_SERVING_ARTIFACT": "0", "LOAN_API_COMPILED_MODEL": "0"},
+}
+
+
+def measure_startup(mode, runs):
+    """
+    Start the API runs times in fresh processes and return the median timings of the given serving mode.
+    Time to first prediction covers interpreter start, imports, artifact loading and the first request.
+    """
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-c", CHILD_CODE], env={**os.environ, **MODES[mode]},
+                                   capture_output=True, text=True, check=True)
+        wall = time.perf_counter() - started
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result["time_to_first_prediction_seconds"] = wall
+        samples.append(result)
+
+    return {
+        "mode": mode,
+        "runs": runs,
+        "time_to_first_prediction_seconds": statistics.median(s["time_to_first_prediction_seconds"] for s in samples),
+        "import_seconds": statistics.median(s["import_seconds"] for s in samples),
+        "first_prediction_seconds": statistics.median(s["first_prediction_seconds"] for s in samples),
+        "heavy_modules": samples[-1]["heavy_modules"],
+        "answer": samples[-1]["answer"],
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure the API's time to first prediction in fresh processes.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="Exit with status 1 if the first mode's time to first prediction exceeds this")
+    return parser.parse_args()
+
+
+if __name__=="__main__":
+    args = parse_args()
+    logging.info("Startup benchmark has started")
+
+    results = [measure_startup(mode, args.runs) for mode in args.modes]
+    for result in results:
+        print(f"{result['mode']:>16}: time to first prediction {result['time_to_first_prediction_seconds']:.3f}s "
+              f"(imports and loading {result['import_seconds']:.3f}s, first request {result['first_prediction_seconds']:.3f}s), "
+              f"heavy modules: {', '.join(result['heavy_modules']) or 'none'}")
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(results, file_obj, indent=2)
+
+    if args.max_seconds is not None and results[0]["time_to_first_prediction_seconds"] > args.max_seconds:
+        print(f"Regression: {results[0]['mode']} took longer than {args.max_seconds:.3f}s")
+        sys.exit(1)
@@ -0,0 +1,254 @@
+from src.logger import logging
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+
+SOURCE_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "loan_dataset.csv")
+
+
+def load_payloads(path):
+    """
+    Load captured requests from a JSONL file (or a JSON array). Each entry is either a LoanData payload, or
+    {"path": ..., "body": ...} to replay it against another endpoint.
+
+    Returns:
+        list: (path, body) pairs, in capture order.
+    """
+    with open(path, "r") as file_obj:
+        text = file_obj.read()
+    entries = json.loads(text) if text.lstrip().startswith("[") else [json.loads(line) for line in text.splitlines()
+                                                                      if line.strip()]
+    return [(entry.get("path", "/check-status"), entry["body"]) if "body" in entry else ("/check-status", entry)
+            for entry in entries]
+
+
+def synthesize_payloads(count, seed=0, source_path=SOURCE_DATA_PATH):
+    """
+    Build LoanData payloads from rows of data/loan_dataset.csv drawn at random, leaving out rows with
+    missing values (LoanData requires every field).
+    """
+    import pandas as pd
+    from src.pipelines.prediction_pipeline import FIELD_MAP
+
+    df = pd.read_csv(source_path).rename(columns={column: field for field, column in FIELD_MAP.items()})
+    df = df[list(FIELD_MAP)].dropna()
+    for field in ("dependents", "credit_history"):
+        df[field] = df[field].astype(str).str.replace(r"\.0$", "", regex=True)
+    rows = df.sample(n=count, replace=True, random_state=seed).to_dict("records")
+    return [("/check-status", row) for row in rows]
+
+
+class Target:
+    """
+    HTTP client for the scoring API: in-process through the ASGI app (startup and shutdown events included)
+    when url is None, else against a running server such as `uvicorn api.main:app` or serve.py.
+    """
+    def __init__(self, url=None, timeout=30.0):
+        self.url = url
+        self.timeout = timeout
+        self.app = None
+        self.client = None
+
+    async def __aenter__(self):
+        import httpx
+        if self.url is None:
+            from api.main import app
+            self.app = app
+            for handler in app.router.on_startup:
+                await handler()
+            transport = httpx.ASGITransport(app=app)
+            self.client = httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=self.timeout)
+        else:
+            limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+            self.client = httpx.AsyncClient(base_url=self.url, timeout=self.timeout, limits=limits)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        if self.app is not None:
+            for handler in self.app.router.on_shutdown:
+                await handler()
+
+    async def send(self, path, body):
+        """
+        Send one request and return (status, seconds); status is None when the request failed to complete.
+        """
+        started = time.perf_counter()
+        try:
+            response = await self.client.post(path, json=body)
+            return response.status_code, time.perf_counter() - started
+        except Exception:
+            return None, time.perf_counter() - started
+
+
+def summarize(latencies, statuses, seconds, label):
+    """
+    Summarize one run: throughput, latency percentiles (ms) and the error rate by status.
+    """
+    latencies = np.asarray(latencies) * 1000
+    counts = {}
+    for status in statuses:
+        counts[str(status)] = counts.get(str(status), 0) + 1
+    errors = sum(count for status, count in counts.items() if status == "None" or int(status) >= 400)
+    summary = {"run": label, "requests": len(statuses), "seconds": seconds,
+               "throughput_rps": len(statuses) / seconds if seconds else 0.0,
+               "error_rate": errors / len(statuses) if statuses else 0.0, "statuses": counts}
+    for name, q in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99), ("p999_ms", 99.9)):
+        summary[name] = float(np.percentile(latencies, q)) if len(latencies) else None
+    summary["max_ms"] = float(latencies.max()) if len(latencies) else None
+    return summary
+
+
+async def run_concurrency(target, payloads, concurrency, duration, max_requests=None):
+    """
+    Closed loop: concurrency clients each send their next request as soon as the previous one is answered.
+    """
+    latencies, statuses = [], []
+    deadline = time.perf_counter() + duration
+    position = 0
+
+    async def client():
+        nonlocal position
+        while time.perf_counter() < deadline and (max_requests is None or position < max_requests):
+            path, body = payloads[position % len(payloads)]
+            position += 1
+            status, seconds = await target.send(path, body)
+            statuses.append(status)
+            latencies.append(seconds)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started, f"concurrency={concurrency}")
+
+
+async def run_rate(target, payloads, qps, duration, max_in_flight=1000):
+    """
+    Open loop: requests are started on a fixed schedule of qps per second, whether or not earlier ones were
+    answered. Latency is measured from the scheduled start, so a server that falls behind is not hidden by
+    the client slowing down (coordinated omission). Requests that would exceed max_in_flight are counted as
+    client-side drops (status None).
+    """
+    latencies, statuses, tasks = [], [], []
+    in_flight = 0
+    n_requests = int(qps * duration)
+    started = time.perf_counter()
+
+    async def fire(path, body, scheduled):
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            status, _ = await target.send(path, body)
+        finally:
+            in_flight -= 1
+        statuses.append(status)
+        latencies.append(time.perf_counter() - scheduled)
+
+    for i in range(n_requests):
+        scheduled = started + i / qps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if in_flight >= max_in_flight:
+            statuses.append(None)
+            latencies.append(time.perf_counter() - scheduled)
+            continue
+        path, body = payloads[i % len(payloads)]
+        tasks.append(asyncio.create_task(fire(path, body, scheduled)))
+    await asyncio.gather(*tasks)
+    return summarize(latencies, statuses, time.perf_counter() - started, f"qps={qps:g}")
+
+
+async def find_saturation(target, payloads, levels, duration, min_gain, slo_p99_ms):
+    """
+    Step the concurrency through levels and stop once throughput grows by less than min_gain (a fraction)
+    over the previous step, or p99 latency exceeds slo_p99_ms.
+
+    Returns:
+        tuple: (summaries of every step, the step with the highest throughput within the SLO, or None).
+    """
+    steps, best = [], None
+    for level in levels:
+        summary = await run_concurrency(target, payloads, level, duration)
+        steps.append(summary)
+        print_summary(summary)
+        within_slo = slo_p99_ms is None or summary["p99_ms"] <= slo_p99_ms
+        if within_slo and summary["error_rate"] == 0 and (best is None or summary["throughput_rps"] > best["throughput_rps"]):
+            best = summary
+        if not within_slo:
+            break
+        if len(steps) > 1 and summary["throughput_rps"] < steps[-2]["throughput_rps"] * (1 + min_gain):
+            break
+    return steps, best
+
+
+def print_summary(summary):
+    print(f"{summary['run']:>16}: {summary['throughput_rps']:8.1f} req/s, p50 {summary['p50_ms']:.2f} ms, "
+          f"p95 {summary['p95_ms']:.2f} ms, p99 {summary['p99_ms']:.2f} ms, p999 {summary['p999_ms']:.2f} ms, "
+          f"errors {summary['error_rate']:.2%} ({summary['requests']} requests)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay or synthesize /check-status traffic and measure the API.")
+    parser.add_argument("--url", default=None, help="Base URL of a running server; in-process ASGI if omitted")
+    parser.add_argument("--payloads", default=None, help="Captured requests as JSONL (or a JSON array)")
+    parser.add_argument("--synthetic", type=int, default=1000, help="Payloads to synthesize without --payloads")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=None, help="Closed loop with this many clients")
+    load.add_argument("--qps", type=float, default=None, help="Open loop at this request rate")
+    load.add_argument("--step", type=int, nargs="+", default=None,
+                      help="Concurrency levels to step through until the API saturates")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run (or per step)")
+    parser.add_argument("--requests", type=int, default=None, help="Stop a closed-loop run after this many requests")
+    parser.add_argument("--min-gain", type=float, default=0.05,
+                        help="Saturation: stop stepping when throughput grows by less than this fraction")
+    parser.add_argument("--slo-p99-ms", type=float, default=None, help="Saturation: stop when p99 exceeds this")
+    parser.add_argument("--warmup", type=int, default=50, help="Requests sent before measuring")
+    parser.add_argument("--output", default=None, help="Write the summaries as JSON to this file")
+    parser.add_argument("--max-error-rate", type=float, default=None,
+                        help="Exit with status 1 if a run's error rate exceeds this")
+    return parser.parse_args()
+
+
+async def main(args):
+    payloads = load_payloads(args.payloads) if args.payloads else synthesize_payloads(args.synthetic)
+    report = {"target": args.url or "in-process", "payloads": len(payloads)}
+    async with Target(args.url) as target:
+        for path, body in payloads[:args.warmup]:
+            await target.send(path, body)
+
+        if args.step:
+            steps, best = await find_saturation(target, payloads, args.step, args.duration, args.min_gain,
+                                                args.slo_p99_ms)
+            report.update(runs=steps, saturation=best)
+            if best is not None:
+                print(f"Capacity: {best['throughput_rps']:.1f} req/s at {best['run']} "
+                      f"(p99 {best['p99_ms']:.2f} ms)")
+        elif args.qps:
+            report["runs"] = [await run_rate(target, payloads, args.qps, args.duration)]
+            print_summary(report["runs"][0])
+        else:
+            report["runs"] = [await run_concurrency(target, payloads, args.concurrency or 1, args.duration,
+                                                    args.requests)]
+            print_summary(report["runs"][0])
+    return report
+
+
+if __name__=="__main__":
+    args = parse_args()
+    logging.info("Load test has started")
+
+    report = asyncio.run(main(args))
+    if args.output:
+        with open(args.output, "w") as file_obj:
+            json.dump(report, file_obj, indent=2)
+
+    if args.max_error_rate is not None and any(run["error_rate"] > args.max_error_rate for run in report["runs"]):
+        print(f"Error rate above {args.max_error_rate:.2%}")
+        sys.exit(1)
@@ -0,0 +1,50 @@
+from src.logger import logging
+from src.exception import CustomException
+from src.model_registry import ModelRegistry, ModelRegistryConfig
+
+import argparse
+import json
+import sys
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Manage the local model registry served by the API.")
+    parser.add_argument("--registry-dir", default=ModelRegistryConfig().registry_dir)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List the published versions")
+    commands.add_parser("current", help="Print the active version")
+    publish = commands.add_parser("publish", help="Publish a new version and activate it")
+    publish.add_argument("--preprocessor", default="artifacts/preprocessor.pkl")
+    publish.add_argument("--model", default="artifacts/model.pkl")
+    publish.add_argument("--serving-artifact", default=None)
+    publish.add_argument("--no-activate", action="store_true")
+    activate = commands.add_parser("activate", help="Activate a published version")
+    activate.add_argument("version")
+    commands.add_parser("rollback", help="Reactivate the version that was active before the current one and "
+                                         "keep it until a version is activated explicitly")
+    return parser.parse_args()
+
+
+if __name__=="__main__":
+    args = parse_args()
+
+    try:
+        registry = ModelRegistry(ModelRegistryConfig(registry_dir=args.registry_dir))
+        if args.command == "list":
+            for metadata in registry.versions():
+                print(json.dumps(metadata))
+        elif args.command == "current":
+            print(f"{registry.current()} (pinned by rollback)" if registry.pinned() else registry.current())
+        elif args.command == "publish":
+            files = {"preprocessor": args.preprocessor, "model": args.model}
+            if args.serving_artifact:
+                files["serving_artifact"] = args.serving_artifact
+            print(registry.publish(files, metadata={"source": "cli"}, activate=not args.no_activate, override_pin=True))
+        elif args.command == "activate":
+            print(registry.activate(args.version))
+        elif args.command == "rollback":
+            print(registry.rollback())
+
+    except Exception as e:
+        logging.info("Custom Exception")
+        raise CustomException(e, sys)
@@ -0,0 +1,40 @@
+from src.logger import logging
+from src.exception import CustomException
+from src.pipelines.prediction_pipeline import PredictionPipelineConfig
+from src.pipelines.bulk_scoring import BulkScoringConfig, score_file
+
+import argparse
+import sys
+
+
+def parse_args():
+    defaults = BulkScoringConfig()
+    pipeline_defaults = PredictionPipelineConfig()
+    parser = argparse.ArgumentParser(description="Score a CSV or JSONL file of loan applications.")
+    parser.add_argument("input", help="CSV (data/loan_dataset.csv schema) or JSONL file of applications")
+    parser.add_argument("output", help="Output file; .jsonl writes JSON lines, anything else CSV")
+    parser.add_argument("--chunk-size", type=int, default=defaults.chunk_size)
+    parser.add_argument("--workers", type=int, default=defaults.workers)
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--preprocessor", default=pipeline_defaults.preprocessor_file_path)
+    parser.add_argument("--model", default=pipeline_defaults.model_file_path)
+    return parser.parse_args()
+
+
+if __name__=="__main__":
+    args = parse_args()
+    logging.info("Bulk scoring has started")
+
+    try:
+        summary = score_file(
+            args.input,
+            args.output,
+            config=BulkScoringConfig(chunk_size=args.chunk_size, workers=args.workers),
+            pipeline_config=PredictionPipelineConfig(preprocessor_file_path=args.preprocessor, model_file_path=args.model),
+            input_format=args.input_format,
+        )
+        print(summary)
+
+    except Exception as e:
+        logging.info("Custom Exception")
+        raise CustomException(e, sys)
@@ -0,0 +1,276 @@
+from src.logger import logging, stop_logging
+
+import argparse
+import gc
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import time
+
+
+def read_memory(pid):
+    """
+    Return the resident memory of a process in MB, split into pages shared with other processes and private
+    pages, from /proc/<pid>/smaps_rollup (Linux). PSS charges each shared page to its sharers proportionally,
+    so the PSS of all workers adds up to the memory they really use. Returns {} where it is unavailable.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as file_obj:
+            for line in file_obj:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    except OSError:
+        return {}
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "shared_mb": fields.get("Shared_Clean", 0.0) + fields.get("Shared_Dirty", 0.0),
+        "private_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def load_app():
+    # Importing the API loads the serving artifact (or the pickles) into module globals.
+    from api.main import app
+    return app
+
+
+def run_worker(sock, report_fd, forked_at, app, log_level, run_jobs):
+    """
+    Serve the app on the inherited listening socket, and report the worker's startup time once it accepts
+    connections. Without a preloaded app the worker loads its own copy, like `uvicorn --workers`.
+    Only a worker started with run_jobs starts the bulk-scoring job workers (see api/jobs.py).
+    """
+    import uvicorn
+
+    if app is None:
+        app = load_app()
+    if not run_jobs:
+        from api.main import job_runner
+        job_runner.enabled = False
+
+    class ReportingServer(uvicorn.Server):
+        async def startup(self, sockets=None):
+            await super().startup(sockets=sockets)
+            report = {"pid": os.getpid(), "startup_seconds": time.time() - forked_at}
+            try:
+                os.write(report_fd, (json.dumps(report) + "\n").encode())
+            except OSError:
+                # The launcher only listens for the first generation of workers.
+                pass
+
+    ReportingServer(uvicorn.Config(app, log_level=log_level, lifespan="on")).run(sockets=[sock])
+
+
+def warm_up(host, port, requests):
+    """
+    Send a few /check-status requests, so that the memory report includes pages touched while scoring.
+    """
+    import http.client
+    from api.schemas import LoanData
+
+    body = json.dumps(LoanData.Config.schema_extra["example"])
+    for _ in range(requests):
+        connection = http.client.HTTPConnection(host, port, timeout=10)
+        connection.request("POST", "/check-status", body=body, headers={"Content-Type": "application/json"})
+        connection.getresponse().read()
+        connection.close()
+
+
+class PreforkServer:
+    """
+    Pre-fork launcher for api.main:app.
+
+    The parent loads the app (and with it the model and preprocessor) once, moves every object it allocated
+    into the garbage collector's permanent generation, binds the listening socket and forks the workers.
+    Workers start with the parent's memory mapped copy-on-write, so the loaded arrays and tables stay
+    shared instead of being unpickled once per worker; freezing the objects keeps the collector from writing
+    to their headers and un-sharing the pages. Workers that exit are replaced with fresh forks of the parent.
+
+    A model hot-swapped from the registry (see api/model_watcher.py) is loaded by each worker on its own
+    and is no longer shared until the launcher is restarted.
+
+    The bulk-scoring job workers are started by the first worker only (and by its replacement), so the server
+    runs ServingConfig.job_workers job processes in total rather than that many per worker. Every worker
+    polls the registry for its own copy of the model.
+
+    Example:
+    server = PreforkServer(workers=4, port=8000)
+    server.start()
+    print(server.report())
+    server.serve_forever()
+    """
+    def __init__(self, workers=2, host="127.0.0.1", port=8000, preload=True, log_level="warning"):
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.preload = preload
+        self.log_level = log_level
+        self.app = None
+        self.load_seconds = None
+        self.startup = {}
+        self.pids = set()
+        self.slots = {}
+        self._stopping = False
+        self._sock = None
+        self._report_fd = None
+
+    def _bind(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def _spawn(self, slot):
+        forked_at = time.time()
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                run_worker(self._sock, self._report_fd, forked_at, self.app, self.log_level, run_jobs=slot == 0)
+            except BaseException:
+                logging.exception("Worker failed")
+                status = 1
+            finally:
+                # os._exit skips the exit handlers, so write out the worker's queued log records first.
+                stop_logging()
+                os._exit(status)
+        self.pids.add(pid)
+        self.slots[pid] = slot
+        return pid
+
+    def start(self, timeout=120.0):
+        """
+        Load the app (when preloading), fork the workers and wait until every worker accepts connections.
+        """
+        if self.preload:
+            started = time.perf_counter()
+            self.app = load_app()
+            self.load_seconds = time.perf_counter() - started
+            gc.collect()
+            gc.freeze()
+
+        self._sock = self._bind()
+        read_fd, self._report_fd = os.pipe()
+        for slot in range(self.workers):
+            self._spawn(slot)
+
+        buffer = b""
+        deadline = time.time() + timeout
+        while len(self.startup) < self.workers:
+            ready, _, _ = select.select([read_fd], [], [], max(0.0, deadline - time.time()))
+            if not ready:
+                self.stop()
+                raise RuntimeError(f"Only {len(self.startup)} of {self.workers} workers started within {timeout}s")
+            buffer += os.read(read_fd, 65536)
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                report = json.loads(line)
+                self.startup[report["pid"]] = report["startup_seconds"]
+        os.close(read_fd)
+        logging.info(f"Started {self.workers} workers on {self.host}:{self.port} (preload={self.preload})")
+
+    def report(self):
+        """
+        Return the startup time and memory (see read_memory) of the parent and every worker.
+        """
+        workers = [{"pid": pid, "startup_seconds": self.startup.get(pid), "runs_jobs": self.slots.get(pid) == 0,
+                    **read_memory(pid)}
+                   for pid in sorted(self.pids)]
+        report = {
+            "preload": self.preload,
+            "parent": {"pid": os.getpid(), "load_seconds": self.load_seconds, **read_memory(os.getpid())},
+            "workers": workers,
+        }
+        if workers and "pss_mb" in workers[0]:
+            report["workers_rss_mb"] = sum(worker["rss_mb"] for worker in workers)
+            report["workers_pss_mb"] = sum(worker["pss_mb"] for worker in workers)
+        return report
+
+    def stop(self):
+        self._stopping = True
+        for pid in list(self.pids):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.pids.discard(pid)
+
+    def wait(self):
+        """
+        Wait for the workers to exit, replacing those that exit unexpectedly until stop() is called.
+        """
+        while self.pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            self.pids.discard(pid)
+            slot = self.slots.pop(pid, None)
+            if not self._stopping and slot is not None:
+                logging.info(f"Worker {pid} exited with status {status}, starting a new one")
+                self._spawn(slot)
+
+    def serve_forever(self):
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stop())
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        self.wait()
+
+
+def print_report(report):
+    parent = report["parent"]
+    if report["preload"]:
+        print(f"parent {parent['pid']}: loaded the app in {parent['load_seconds']:.3f}s, "
+              f"RSS {parent.get('rss_mb', 0.0):.1f} MB")
+    for worker in report["workers"]:
+        print(f"worker {worker['pid']}: ready {worker['startup_seconds']:.3f}s after fork, "
+              f"RSS {worker.get('rss_mb', 0.0):.1f} MB (shared {worker.get('shared_mb', 0.0):.1f} MB, "
+              f"private {worker.get('private_mb', 0.0):.1f} MB, PSS {worker.get('pss_mb', 0.0):.1f} MB)")
+    if "workers_pss_mb" in report:
+        print(f"workers: RSS {report['workers_rss_mb']:.1f} MB summed, {report['workers_pss_mb']:.1f} MB PSS "
+              f"(memory actually used)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the API with pre-forked workers that share the loaded model.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--no-preload", action="store_true",
+                        help="Load the app in every worker instead of the parent, for comparison")
+    parser.add_argument("--warmup", type=int, default=0, help="Requests to send before reporting memory")
+    parser.add_argument("--report", default=None, help="Write the startup and memory report as JSON to this file")
+    parser.add_argument("--check", action="store_true", help="Stop the workers after reporting instead of serving")
+    parser.add_argument("--log-level", default="warning")
+    return parser.parse_args()
+
+
+if __name__=="__main__":
+    args = parse_args()
+    logging.info("Pre-fork server is starting")
+
+    server = PreforkServer(workers=args.workers, host=args.host, port=args.port,
+                           preload=not args.no_preload, log_level=args.log_level)
+    server.start()
+    if args.warmup:
+        warm_up(args.host, server.port, args.warmup)
+
+    report = server.report()
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as file_obj:
+            json.dump(report, file_obj, indent=2)
+
+    if args.check:
+        server.stop()
+        server.wait()
+        sys.exit(0)
+    server.serve_forever()
@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class StageCacheConfig:
+    """
+    Configuration class for the pipeline stage cache.
+
+    Attributes:
+        cache_dir (str): Directory holding one sub-directory per stage and fingerprint.
+        enabled (bool): Set to False to always run every stage.
+    """
+    cache_dir: str = os.path.join('artifacts', 'cache')
+    enabled: bool = True
+
+
+def hash_file(file_path, block_size=1 << 20):
+    """
+    Return the SHA-256 hex digest of a file's content, read in blocks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file_obj:
+        for block in iter(lambda: file_obj.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_array(array):
+    """
+    Return the SHA-256 hex digest of a NumPy array's shape, dtype and data.
+    """
+    array = np.ascontiguousarray(array)
+    digest = hashlib.sha256(f"{array.shape}{array.dtype}".encode())
+    digest.update(array.data)
+    return digest.hexdigest()
+
+
+def fingerprint(*parts):
+    """
+    Combine strings, numbers and JSON-serializable configs into one SHA-256 hex digest.
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def source_fingerprint(*file_paths):
+    """
+    Fingerprint the source files of a stage, so that code changes invalidate its cached outputs.
+    """
+    return fingerprint(*[hash_file(file_path) for file_path in file_paths])
+
+
+class StageCache:
+    """
+    Content-addressed cache of pipeline stage outputs.
+
+    Each stage computes a fingerprint from the hashes of its inputs, its config and its source code. The
+    output files of a run are stored under <cache_dir>/<stage>/<fingerprint>/ together with a manifest,
+    and a later run with the same fingerprint copies them back into place instead of recomputing them.
+    Hits and misses are recorded with the time they took, so that the time saved can be reported.
+
+    Example:
+    stage_cache = StageCache()
+    key = stage_cache.key("data_ingestion", hash_file("data/loan_dataset.csv"))
+    entry = stage_cache.load("data_ingestion", key)
+    """
+    def __init__(self, config=None):
+        self.cache_config = config or StageCacheConfig()
+        self.events = []
+
+    def key(self, stage, *parts):
+        return fingerprint(stage, *parts)
+
+    def _entry_dir(self, stage, key):
+        return os.path.join(self.cache_config.cache_dir, stage, key)
+
+    def load(self, stage, key):
+        """
+        Return the manifest of a cached stage run, or None on a miss.
+        """
+        if not self.cache_config.enabled:
+            return None
+        manifest_path = os.path.join(self._entry_dir(stage, key), 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r') as file_obj:
+            manifest = json.load(file_obj)
+        manifest['dir'] = self._entry_dir(stage, key)
+        return manifest
+
+    def path(self, manifest, name):
+        """
+        Return the path of a cached output file.
+        """
+        return os.path.join(manifest['dir'], manifest['files'][name])
+
+    def restore(self, manifest, destinations):
+        """
+        Copy cached output files back to their destinations, given as {name: destination_path}.
+        """
+        for name, destination in destinations.items():
+            dir_path = os.path.dirname(destination)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            shutil.copyfile(self.path(manifest, name), destination)
+
+    def store(self, stage, key, files, duration, metadata=None):
+        """
+        Store the output files of a stage run, given as {name: path}, under its fingerprint.
+
+        The entry is written to a temporary directory and renamed into place, so that a crashed run never
+        leaves a partial entry behind.
+        """
+        if not self.cache_config.enabled:
+            return
+        try:
+            entry_dir = self._entry_dir(stage, key)
+            os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(entry_dir))
+            manifest = {'stage': stage, 'key': key, 'duration': duration, 'created': time.time(),
+                        'files': {}, 'metadata': metadata or {}}
+            for name, file_path in files.items():
+                file_name = f"{name}{os.path.splitext(file_path)[1]}"
+                shutil.copyfile(file_path, os.path.join(tmp_dir, file_name))
+                manifest['files'][name] = file_name
+            with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as file_obj:
+                json.dump(manifest, file_obj)
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir)
+            os.rename(tmp_dir, entry_dir)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def record(self, stage, hit, seconds, manifest=None):
+        """
+        Record a hit or miss of a stage and log it, including the time saved on a hit.
+        """
+        saved = max(manifest['duration'] - seconds, 0.0) if hit and manifest else 0.0
+        self.events.append({'stage': stage, 'hit': hit, 'seconds': seconds, 'saved': saved})
+        if hit:
+            logging.info(f"Stage {stage}: cache hit in {seconds:.2f}s, saved {saved:.2f}s")
+        else:
+            logging.info(f"Stage {stage}: cache miss, ran in {seconds:.2f}s")
+
+    def summary(self):
+        """
+        Summarize the hits, misses and total time saved of this run.
+        """
+        return {
+            'hits': [event['stage'] for event in self.events if event['hit']],
+            'misses': [event['stage'] for event in self.events if not event['hit']],
+            'saved_seconds': sum(event['saved'] for event in self.events),
+        }
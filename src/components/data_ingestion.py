@@ -1,9 +1,13 @@
 import os
 import sys
+import time
+from src.cache import StageCache, hash_file, source_fingerprint
+from src.components.data_transformation import NUMERICAL_COLUMNS
 from src.exception import CustomException
 from src.logger import logging
+from src.utils import save_frame, FrameWriter
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from sklearn.model_selection import train_test_split
 
 
@@ -11,19 +15,35 @@ from sklearn.model_selection import train_test_split
 class DataIngestionConfig:
     """
     Configuration class for data ingestion, specifying default paths for training, testing, and raw data files.
+    The file extension selects the artifact format (.feather, .parquet or .csv); see src.utils.save_frame.
 
     Attributes:
         train_data_path (str): path for the training data file.
         test_data_path (str): path for the testing data file.
         raw_data_path (str): path for the raw data file.
+        export_csv (bool): also write CSV copies of the raw, train and test data next to them.
+        streaming (bool): read the source in chunks and split rows by a hash of id_column instead of
+            loading it whole and calling train_test_split, so that memory stays flat as the file grows.
+        chunk_size (int): number of rows per chunk in streaming mode.
+        id_column (str): column whose hash assigns a row to the train or test split in streaming mode.
+        source_data_path (str): path of the source dataset.
+        test_size (float): fraction of the rows assigned to the test split.
+        random_state (int): seed of the train/test split.
 
     Example:
     config = DataIngestionConfig()
     train_path = config.train_data_path
     """
-    train_data_path: str = os.path.join('artifacts', "train.csv")
-    test_data_path: str = os.path.join('artifacts', "test.csv")
-    raw_data_path: str = os.path.join('artifacts', "loan.csv")
+    train_data_path: str = os.path.join('artifacts', "train.feather")
+    test_data_path: str = os.path.join('artifacts', "test.feather")
+    raw_data_path: str = os.path.join('artifacts', "loan.feather")
+    export_csv: bool = False
+    streaming: bool = False
+    chunk_size: int = 100_000
+    id_column: str = "Loan_ID"
+    source_data_path: str = os.path.join('data', "loan_dataset.csv")
+    test_size: float = 0.2
+    random_state: int = 42
 
 
 class DataIngestion:
@@ -40,33 +60,71 @@ class DataIngestion:
     data_ingestion = DataIngestion()
     config = data_ingestion.ingestion_config
     """
-    def __init__(self):
+    def __init__(self, stage_cache=None):
         self.ingestion_config = DataIngestionConfig()
+        self.stage_cache = stage_cache or StageCache()
 
     def initiate_data_ingestion(self):
         # Log a message indicating the entry into the data ingestion method or component.
         logging.info("Entered the data ingestion method or component")
         try:
-            # Read the dataset from a CSV file into a Pandas DataFrame.
-            df = pd.read_csv(os.path.join("data/loan_dataset.csv"))
-            logging.info("Read the dataset as a DataFrame")
-
-            # Create directories for data storage if they don't exist.
-            os.makedirs(os.path.dirname(self.ingestion_config.train_data_path), exist_ok=True)
-
-            # Save the entire dataset as raw data.
-            df.to_csv(self.ingestion_config.raw_data_path, index=False, header=True)
-
-            # Split the dataset into training and testing sets.
-            logging.info("Train test split initiated")
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
-
-            # Save the training and testing sets as separate CSV files.
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False, header=True)
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False, header=True)
+            # Skip the stage when the source data, config and code are unchanged.
+            started = time.time()
+            outputs = {
+                "raw": self.ingestion_config.raw_data_path,
+                "train": self.ingestion_config.train_data_path,
+                "test": self.ingestion_config.test_data_path,
+            }
+            if self.ingestion_config.export_csv:
+                outputs.update({f"{name}_csv": f"{os.path.splitext(path)[0]}.csv" for name, path in list(outputs.items())})
+            cache_key = self.stage_cache.key(
+                "data_ingestion",
+                hash_file(self.ingestion_config.source_data_path),
+                asdict(self.ingestion_config),
+                source_fingerprint(__file__),
+            )
+            cached = self.stage_cache.load("data_ingestion", cache_key)
+            if cached is not None:
+                self.stage_cache.restore(cached, outputs)
+                self.stage_cache.record("data_ingestion", True, time.time() - started, cached)
+                return (
+                    self.ingestion_config.train_data_path,
+                    self.ingestion_config.test_data_path
+                )
+
+            if self.ingestion_config.streaming:
+                self.stream_data_ingestion(outputs)
+            else:
+                # Read the dataset from a CSV file into a Pandas DataFrame.
+                df = pd.read_csv(self.ingestion_config.source_data_path)
+                logging.info("Read the dataset as a DataFrame")
+
+                # Create directories for data storage if they don't exist.
+                os.makedirs(os.path.dirname(self.ingestion_config.train_data_path), exist_ok=True)
+
+                # Save the entire dataset as raw data.
+                save_frame(df, self.ingestion_config.raw_data_path)
+
+                # Split the dataset into training and testing sets.
+                logging.info("Train test split initiated")
+                train_set, test_set = train_test_split(
+                    df, test_size=self.ingestion_config.test_size, random_state=self.ingestion_config.random_state
+                )
+
+                # Save the training and testing sets as separate files.
+                save_frame(train_set, self.ingestion_config.train_data_path)
+                save_frame(test_set, self.ingestion_config.test_data_path)
+
+                # Optionally export CSV copies for tools that cannot read the columnar format.
+                if self.ingestion_config.export_csv:
+                    save_frame(df, outputs["raw_csv"])
+                    save_frame(train_set, outputs["train_csv"])
+                    save_frame(test_set, outputs["test_csv"])
 
             # Log a message indicating the completion of data ingestion.
             logging.info("Ingestion of the data is completed")
+            self.stage_cache.store("data_ingestion", cache_key, outputs, time.time() - started)
+            self.stage_cache.record("data_ingestion", False, time.time() - started)
 
             # Return the paths to the training and testing data.
             return (
@@ -75,3 +133,42 @@ class DataIngestion:
             )
         except Exception as e:
             raise CustomException(e, sys)
+
+    def is_test_row(self, ids):
+        """
+        Assign rows to the test split by a stable hash of their id, so that a row keeps its split across
+        runs and new rows never reshuffle old ones.
+
+        Args:
+            ids (pandas.Series): The id column of a chunk.
+
+        Returns:
+            numpy.ndarray: Boolean mask, True for rows in the test split.
+        """
+        buckets = pd.util.hash_pandas_object(ids.astype(str), index=False).to_numpy() % 10_000
+        return buckets < int(round(self.ingestion_config.test_size * 10_000))
+
+    def stream_data_ingestion(self, outputs):
+        """
+        Stream the source CSV in chunks, split every chunk by id hash and append it to the raw, train
+        and test files. Only one chunk is held in memory at a time.
+        """
+        logging.info(f"Streaming ingestion in chunks of {self.ingestion_config.chunk_size} rows")
+        source_path = self.ingestion_config.source_data_path
+
+        # Fix the column dtypes from the known schema, so that every chunk has the same schema; inferring them
+        # from the first chunk would read a text column that is empty there as float.
+        columns = pd.read_csv(source_path, nrows=0).columns
+        dtypes = {column: "float64" if column in NUMERICAL_COLUMNS else object for column in columns}
+
+        writers = {name: FrameWriter(path) for name, path in outputs.items()}
+        try:
+            for chunk in pd.read_csv(source_path, chunksize=self.ingestion_config.chunk_size, dtype=dtypes):
+                test_mask = self.is_test_row(chunk[self.ingestion_config.id_column])
+                parts = {"raw": chunk, "train": chunk[~test_mask], "test": chunk[test_mask]}
+                for name, writer in writers.items():
+                    writer.write(parts[name.replace("_csv", "")])
+        finally:
+            for writer in writers.values():
+                writer.close()
+        logging.info(f"Streamed {writers['raw'].rows} rows: {writers['train'].rows} train, {writers['test'].rows} test")
@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 from sklearn.preprocessing import StandardScaler, OneHotEncoder, LabelEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
@@ -9,29 +8,54 @@ from src.logger import logging
 from src.exception import CustomException
 import os
 import sys
-from dataclasses import dataclass
-from src.utils import save_object
+import time
+from dataclasses import dataclass, asdict
+from joblib import Parallel, delayed
+from src.cache import StageCache, hash_file, source_fingerprint
+from src.components.preprocessing_statistics import PreprocessingStatistics
+from src.components.drift_profile import build_drift_profile, save_drift_profile
+from src.utils import save_object, load_object, save_array, load_array, load_frame, iter_frame_chunks
 
 label_encoder = LabelEncoder()
 
+NUMERICAL_COLUMNS = ["ApplicantIncome", "CoapplicantIncome", "LoanAmount", "Loan_Amount_Term", "Credit_History"]
+CATEGORICAL_COLUMNS = ["Gender", "Married", "Dependents", "Education", "Self_Employed", "Property_Area"]
+
+
+def _chunk_statistics(chunk):
+    return PreprocessingStatistics(NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS).update(chunk)
+
 @dataclass
 class DataTransformationConfig:
     """
-    Configuration class for data transformation, specifying the path for saving the preprocessing object.
+    Configuration class for data transformation, specifying the path for saving the preprocessing object
+    and the .npy files holding the transformed train and test arrays.
     """
     preprocessing_obj_file_path = os.path.join('artifacts', 'preprocessor.pkl')
+    train_array_file_path = os.path.join('artifacts', 'train_arr.npy')
+    test_array_file_path = os.path.join('artifacts', 'test_arr.npy')
+    # "batch" fits the preprocessor with fit_transform; "incremental" fits it from mergeable statistics
+    # computed chunk by chunk, which are saved so that update_preprocessor can add new data later.
+    fitting_mode: str = "batch"
+    statistics_file_path: str = os.path.join('artifacts', 'preprocessing_stats.pkl')
+    chunk_size: int = 100_000
+    n_jobs: int = 1
+    # Reference distribution of the training features, compared with served traffic by api/drift.py.
+    drift_profile_file_path: str = os.path.join('artifacts', 'drift_profile.json')
+    drift_profile_bins: int = 10
 
 class DataTransformation:
     """
     Class responsible for data transformation tasks, including preprocessing and feature scaling.
     """
-    def __init__(self):
+    def __init__(self, stage_cache=None):
         self.data_transformation_config = DataTransformationConfig()
+        self.stage_cache = stage_cache or StageCache()
 
     def get_data_transformer_object(self):
         try:
-            numerical_columns = ["ApplicantIncome", "CoapplicantIncome", "LoanAmount", "Loan_Amount_Term", "Credit_History"]
-            categorical_columns = ["Gender", "Married", "Dependents", "Education", "Self_Employed", "Property_Area"]
+            numerical_columns = NUMERICAL_COLUMNS
+            categorical_columns = CATEGORICAL_COLUMNS
 
             # Define a numerical data processing pipeline with imputation and standard scaling.
             num_pipeline = Pipeline(steps=[
@@ -57,12 +81,117 @@ class DataTransformation:
             
         except Exception as e:
             raise CustomException(e, sys)
-        
+
+    def compute_statistics(self, data_path):
+        """
+        Compute the preprocessing statistics of a data file chunk by chunk, without loading it whole.
+        Chunks are summarized by n_jobs workers and the partial statistics are merged as they arrive.
+
+        Args:
+            data_path (str): A .feather, .parquet or .csv file with the training columns.
+
+        Returns:
+            PreprocessingStatistics: The merged statistics.
+        """
+        try:
+            statistics = PreprocessingStatistics(NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS)
+            chunks = iter_frame_chunks(data_path, self.data_transformation_config.chunk_size)
+            partials = Parallel(n_jobs=self.data_transformation_config.n_jobs, return_as="generator")(
+                delayed(_chunk_statistics)(chunk) for chunk in chunks
+            )
+            for partial in partials:
+                statistics.merge(partial)
+            logging.info(f"Computed preprocessing statistics over {statistics.rows} rows of {data_path}")
+            return statistics
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def fit_incremental_preprocessor(self, statistics):
+        """
+        Build a fitted preprocessor from statistics and save both the statistics and the preprocessor.
+        """
+        try:
+            preprocessing_obj = statistics.build_preprocessor(self.get_data_transformer_object())
+            save_object(file_path=self.data_transformation_config.statistics_file_path, object=statistics)
+            save_object(
+                file_path=self.data_transformation_config.preprocessing_obj_file_path,
+                object=preprocessing_obj
+            )
+            return preprocessing_obj
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def update_preprocessor(self, new_data_path):
+        """
+        Refit the preprocessor after new applications were added, reading only the new rows.
+
+        The saved statistics of the previous fit are merged with the statistics of new_data_path and the
+        preprocessor is rebuilt from them, which matches a batch fit on all rows within the tolerance of the
+        median sketch.
+
+        Args:
+            new_data_path (str): A .feather, .parquet or .csv file with only the new rows.
+
+        Returns:
+            str: The path of the updated preprocessor.
+
+        Example:
+            DataTransformation().update_preprocessor('data/new_applications.csv')
+        """
+        try:
+            statistics_path = self.data_transformation_config.statistics_file_path
+            if not os.path.exists(statistics_path):
+                raise FileNotFoundError(
+                    f"{statistics_path} not found; run the data transformation with fitting_mode='incremental' first"
+                )
+            statistics = load_object(statistics_path)
+            statistics.merge(self.compute_statistics(new_data_path))
+            self.fit_incremental_preprocessor(statistics)
+            logging.info(f"Updated the preprocessor with {new_data_path}, now fitted on {statistics.rows} rows")
+            return self.data_transformation_config.preprocessing_obj_file_path
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
     def initiate_data_transformation(self, train_path, test_path):
         try:
-            # Read the training and testing data from CSV files.
-            train_df = pd.read_csv(train_path)
-            test_df = pd.read_csv(test_path)
+            # Skip the stage when the train/test files and code are unchanged.
+            started = time.time()
+            cache_key = self.stage_cache.key(
+                "data_transformation",
+                hash_file(train_path),
+                hash_file(test_path),
+                self.data_transformation_config.preprocessing_obj_file_path,
+                asdict(self.data_transformation_config),
+                source_fingerprint(__file__, sys.modules[PreprocessingStatistics.__module__].__file__,
+                                   sys.modules[build_drift_profile.__module__].__file__),
+            )
+            outputs = {
+                "preprocessor": self.data_transformation_config.preprocessing_obj_file_path,
+                "train_arr": self.data_transformation_config.train_array_file_path,
+                "test_arr": self.data_transformation_config.test_array_file_path,
+                "drift_profile": self.data_transformation_config.drift_profile_file_path,
+            }
+            incremental = self.data_transformation_config.fitting_mode == "incremental"
+            if incremental:
+                outputs["statistics"] = self.data_transformation_config.statistics_file_path
+            cached = self.stage_cache.load("data_transformation", cache_key)
+            if cached is not None:
+                self.stage_cache.restore(cached, outputs)
+                train_arr = load_array(self.data_transformation_config.train_array_file_path)
+                test_arr = load_array(self.data_transformation_config.test_array_file_path)
+                self.stage_cache.record("data_transformation", True, time.time() - started, cached)
+                return (
+                    train_arr,
+                    test_arr,
+                    self.data_transformation_config.preprocessing_obj_file_path
+                )
+
+            # Read the training and testing data (Arrow and Parquet files are memory-mapped).
+            train_df = load_frame(train_path)
+            test_df = load_frame(test_path)
 
             logging.info("Reading the train and test files")
 
@@ -70,16 +199,22 @@ class DataTransformation:
             preprocessing_obj = self.get_data_transformer_object()
 
             target_column_name = "Loan_Status"
-            numerical_columns = ["ApplicantIncome", "CoapplicantIncome", "LoanAmount", "Loan_Amount_Term", "Credit_History"]
-            categorical_columns = ["Gender", "Married", "Dependents", "Education", "Self_Employed", "Property_Area"]
 
             # Divide the datasets into independent and dependent features.
-            input_features_train_df = train_df.drop(columns=[target_column_name, 'Loan_ID'], axis=1)
+            input_features_train_df = train_df.drop(columns=[target_column_name, 'Loan_ID'])
             target_feature_train_df = train_df[target_column_name]
 
-            input_feature_test_df = test_df.drop(columns=[target_column_name], axis=1)
+            input_feature_test_df = test_df.drop(columns=[target_column_name])
             target_feature_test_df = test_df[target_column_name]
 
+            # Save the reference profile of the training features for the serving drift monitor.
+            save_drift_profile(
+                build_drift_profile(input_features_train_df, NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS,
+                                    n_bins=self.data_transformation_config.drift_profile_bins),
+                self.data_transformation_config.drift_profile_file_path
+            )
+            logging.info("Saved the drift reference profile")
+
             # Fit and transform the target feature for both train and test datasets
             target_feature_train_encoded = label_encoder.fit_transform(target_feature_train_df)
             target_feature_test_encoded = label_encoder.transform(target_feature_test_df)
@@ -87,19 +222,32 @@ class DataTransformation:
             logging.info("Applying preprocessing on training and test dataframes")
 
             # Apply preprocessing to the training and testing dataframes.
-            input_feature_train_arr = preprocessing_obj.fit_transform(input_features_train_df)
+            if incremental:
+                preprocessing_obj = self.fit_incremental_preprocessor(self.compute_statistics(train_path))
+                input_feature_train_arr = preprocessing_obj.transform(input_features_train_df)
+            else:
+                input_feature_train_arr = preprocessing_obj.fit_transform(input_features_train_df)
             input_feature_test_arr = preprocessing_obj.transform(input_feature_test_df)
 
             # Combine the preprocessed features with the encoded target feature.
             train_arr = np.c_[input_feature_train_arr, np.array(target_feature_train_encoded)]
             test_arr = np.c_[input_feature_test_arr, np.array(target_feature_test_encoded)]
 
-            # Save the preprocessing object.
-            logging.info("Saved preprocessing object")
-            save_object(
-                file_path=self.data_transformation_config.preprocessing_obj_file_path,
-                object=preprocessing_obj
-            )
+            # Save the preprocessing object (fit_incremental_preprocessor has saved it already).
+            if not incremental:
+                logging.info("Saved preprocessing object")
+                save_object(
+                    file_path=self.data_transformation_config.preprocessing_obj_file_path,
+                    object=preprocessing_obj
+                )
+
+            # Persist the transformed arrays so that later stages and experiments can memory-map them.
+            save_array(train_arr, self.data_transformation_config.train_array_file_path)
+            save_array(test_arr, self.data_transformation_config.test_array_file_path)
+
+            # Cache the preprocessor and the transformed arrays under the stage fingerprint.
+            self.stage_cache.store("data_transformation", cache_key, outputs, time.time() - started)
+            self.stage_cache.record("data_transformation", False, time.time() - started)
 
             return (
                 train_arr,
@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.utils import atomic_write
+
+
+def _category_label(value):
+    # Same normalization as the serving lookup tables: 1.0 and "1" are one category, missing values are None.
+    if value is None or (isinstance(value, float) and value != value) or value == "":
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def build_drift_profile(df, numerical_columns, categorical_columns, n_bins=10):
+    """
+    Summarize the training features into the reference profile of the serving drift monitor
+    (see api/drift.py).
+
+    Numerical columns are split into up to n_bins bins at the quantiles of their non-missing values, and
+    the share of values in every bin is recorded; columns with few distinct values get fewer bins.
+    Categorical columns record the share of every category. Both record the share of missing values.
+
+    Args:
+        df (pd.DataFrame): The training features.
+        numerical_columns (list): Columns profiled with quantile bins.
+        categorical_columns (list): Columns profiled with category shares.
+        n_bins (int): Maximum number of bins per numerical column.
+
+    Returns:
+        dict: {"rows": int, "numerical": {column: {"edges", "proportions", "missing"}},
+            "categorical": {column: {"proportions", "missing"}}}. A numerical value x falls into bin
+            bisect_right(edges, x), so there is one more proportion than there are edges.
+    """
+    profile = {"rows": len(df), "numerical": {}, "categorical": {}}
+    for column in numerical_columns:
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+        missing = np.isnan(values)
+        values = values[~missing]
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])) if values.size else np.array([])
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        profile["numerical"][column] = {
+            "edges": edges.tolist(),
+            "proportions": (counts / max(values.size, 1)).tolist(),
+            "missing": float(missing.mean()) if len(missing) else 0.0,
+        }
+
+    for column in categorical_columns:
+        labels = df[column].astype(object).map(_category_label)
+        missing = labels.isna()
+        shares = labels[~missing].value_counts(normalize=True)
+        profile["categorical"][column] = {
+            "proportions": {str(label): float(share) for label, share in shares.items()},
+            "missing": float(missing.mean()) if len(missing) else 0.0,
+        }
+    return profile
+
+
+def save_drift_profile(profile, file_path):
+    with atomic_write(file_path, mode='w') as file_obj:
+        json.dump(profile, file_obj)
+
+
+def load_drift_profile(file_path):
+    with open(file_path, 'r') as file_obj:
+        return json.load(file_obj)
@@ -1,40 +1,95 @@
 import os
 import sys
-from dataclasses import dataclass
-
-from sklearn.ensemble import (
-    AdaBoostClassifier,
-    GradientBoostingClassifier,
-    RandomForestClassifier,
-)
-from sklearn.linear_model import LogisticRegression
+import copy
+import time
+import tempfile
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+import numpy as np
+
+from sklearn.base import clone
 from sklearn.metrics import accuracy_score, classification_report
-from sklearn.tree import DecisionTreeClassifier
-from xgboost import XGBClassifier
-from catboost import CatBoostClassifier
 
 from src.exception import CustomException
 from src.logger import logging
 
-from src.utils import save_object
+import src.evaluate
+import src.pipelines.compiled_model
+import src.pipelines.prediction_pipeline
+from src.cache import StageCache, hash_array, hash_file, source_fingerprint
+from src.cv_store import CVResultStore, CVResultStoreConfig
+from src.model_registry import ModelRegistry, ModelRegistryConfig
+from src.components.data_transformation import DataTransformationConfig
+from src.pipelines.compiled_model import export_compiled_model
+from src.pipelines.prediction_pipeline import PredictionPipeline, PredictionPipelineConfig
+from src.utils import save_object, load_object, load_array, load_frame
 from src.evaluate import evaluate_models
 
 @dataclass
 class ModelTrainerConfig:
     """
-    Configuration class for the ModelTrainer, specifying the path for saving the trained model.
+    Configuration class for the ModelTrainer, specifying the path for saving the trained model
+    and how the hyperparameter search is parallelized and time-limited. Past cross-validation results are
+    kept in the SQLite store at cv_results_db_path (None disables it). Tree ensembles are also exported
+    in compiled form to compiled_model_file_path, and together with the preprocessor tables to
+    serving_artifact_file_path, for serving.
+
+    Every trained or promoted model is published to the model registry at registry_dir (None disables it),
+    from which the API hot-swaps it.
+
+    update_model updates the active registry version with update_rounds trees or boosting rounds, publishes
+    every candidate to the registry and activates it only if its holdout accuracy is at least the deployed
+    model's minus promotion_tolerance.
     """
     trained_model_file_path = os.path.join("artifacts", "model.pkl")
+    compiled_model_file_path = os.path.join("artifacts", "model_compiled.npz")
+    serving_artifact_file_path = os.path.join("artifacts", "serving_model.npz")
+    search_n_jobs: int = -1
+    search_time_budget: Optional[float] = None
+    search_strategy: str = "grid"
+    cv_results_db_path: Optional[str] = os.path.join("artifacts", "cv_results.sqlite")
+    registry_dir: Optional[str] = ModelRegistryConfig().registry_dir
+    update_rounds: int = 50
+    promotion_tolerance: float = 0.0
 
 class ModelTrainer:
     """
     Class responsible for training and evaluating classification models.
     """
-    def __init__(self):
+    def __init__(self, stage_cache=None):
         self.model_trainer_config = ModelTrainerConfig()
+        self.stage_cache = stage_cache or StageCache()
 
     def initiate_model_trainer(self, train_array, test_array):
         try:
+            # Skip the search when the training data, config, grids, search and export code are unchanged.
+            started = time.time()
+            cache_key = self.stage_cache.key(
+                "model_trainer",
+                hash_array(train_array),
+                hash_array(test_array),
+                asdict(self.model_trainer_config),
+                self.model_trainer_config.trained_model_file_path,
+                # The cached outputs include the compiled model and the serving artifact exported by these modules.
+                source_fingerprint(__file__, src.evaluate.__file__, src.pipelines.compiled_model.__file__,
+                                   src.pipelines.prediction_pipeline.__file__),
+            )
+            cached = self.stage_cache.load("model_trainer", cache_key)
+            if cached is not None:
+                outputs = {"model": self.model_trainer_config.trained_model_file_path}
+                optional_outputs = {"compiled_model": self.model_trainer_config.compiled_model_file_path,
+                                    "serving_artifact": self.model_trainer_config.serving_artifact_file_path}
+                for name, file_path in optional_outputs.items():
+                    if name in cached["files"]:
+                        outputs[name] = file_path
+                    elif os.path.exists(file_path):
+                        os.remove(file_path)
+                self.stage_cache.restore(cached, outputs)
+                # The cached model was published when it was trained; publishing it again could undo a rollback.
+                self.stage_cache.record("model_trainer", True, time.time() - started, cached)
+                return cached["metadata"]["result"]
+
             logging.info("Split training and test input data")
             X_train, y_train, X_test, y_test = (
                 train_array[:, :-1],
@@ -42,6 +97,18 @@ class ModelTrainer:
                 test_array[:, :-1],
                 test_array[:, -1]
             )
+            results_store = None
+            if self.model_trainer_config.cv_results_db_path is not None:
+                results_store = CVResultStore(CVResultStoreConfig(db_path=self.model_trainer_config.cv_results_db_path))
+
+            # The model libraries are imported here rather than at module level, so that importing this
+            # module (e.g. for update_model) does not load XGBoost and CatBoost.
+            from sklearn.ensemble import AdaBoostClassifier, GradientBoostingClassifier, RandomForestClassifier
+            from sklearn.linear_model import LogisticRegression
+            from sklearn.tree import DecisionTreeClassifier
+            from xgboost import XGBClassifier
+            from catboost import CatBoostClassifier
+
             models = {
                 "Random Forest": RandomForestClassifier(),
                 "Decision Tree": DecisionTreeClassifier(),
@@ -85,14 +152,17 @@ class ModelTrainer:
             }
 
             model_report = evaluate_models(X_train=X_train, y_train=y_train, X_test=X_test, y_test=y_test,
-                                           models=models, params=params)
+                                           models=models, params=params,
+                                           n_jobs=self.model_trainer_config.search_n_jobs,
+                                           time_budget=self.model_trainer_config.search_time_budget,
+                                           strategy=self.model_trainer_config.search_strategy,
+                                           results_store=results_store)
 
             logging.info("Model evaluation complete")
 
             best_accuracy = 0
             best_model_name = None
-            for model_name, metrics in model_report.items():
-                accuracy = metrics['accuracy']
+            for model_name, accuracy in model_report.items():
                 if accuracy > best_accuracy:
                     best_accuracy = accuracy
                     best_model_name = model_name
@@ -106,15 +176,232 @@ class ModelTrainer:
 
             save_object(
                 file_path=self.model_trainer_config.trained_model_file_path,
-                obj=best_model
+                object=best_model
             )
 
+            # Export the array-backed forms of the model, which the API serves instead of the pickles.
+            outputs = {"model": self.model_trainer_config.trained_model_file_path}
+            outputs.update(self.export_serving_artifacts(best_model))
+
             predicted = best_model.predict(X_test)
 
             accuracy = accuracy_score(y_test, predicted)
             classification_report_str = classification_report(y_test, predicted)
 
+            self.stage_cache.store("model_trainer", cache_key, outputs, time.time() - started,
+                                   metadata={"result": [accuracy, classification_report_str],
+                                             "best_model": best_model_name})
+            self.stage_cache.record("model_trainer", False, time.time() - started)
+            self.publish_model({"source": "search", "model_name": best_model_name, "accuracy": accuracy})
+
             return [accuracy, classification_report_str]
 
         except Exception as e:
             raise CustomException(e, sys)
+
+    def export_serving_artifacts(self, model, model_file_path=None, preprocessor_file_path=None, output_dir=None):
+        """
+        Export the compiled model and the serving artifact (preprocessor tables plus compiled model) for the
+        model saved at model_file_path (trained_model_file_path by default). Models that cannot be compiled
+        are served from the pickles. The files are written to the configured paths, or into output_dir.
+
+        Returns:
+            dict: Name -> path of the files that were written.
+        """
+        model_file_path = model_file_path or self.model_trainer_config.trained_model_file_path
+        compiled_model_file_path = self.model_trainer_config.compiled_model_file_path
+        serving_artifact_file_path = self.model_trainer_config.serving_artifact_file_path
+        if output_dir is not None:
+            compiled_model_file_path = os.path.join(output_dir, os.path.basename(compiled_model_file_path))
+            serving_artifact_file_path = os.path.join(output_dir, os.path.basename(serving_artifact_file_path))
+
+        outputs = {}
+        if export_compiled_model(model, model_file_path, compiled_model_file_path):
+            outputs["compiled_model"] = compiled_model_file_path
+
+        pipeline_config = PredictionPipelineConfig(
+            preprocessor_file_path=preprocessor_file_path or DataTransformationConfig().preprocessing_obj_file_path,
+            model_file_path=model_file_path,
+            serving_artifact_file_path=serving_artifact_file_path,
+        )
+        pipeline = PredictionPipeline(preprocessor=load_object(pipeline_config.preprocessor_file_path),
+                                      model=model, config=pipeline_config)
+        if pipeline.export_serving_artifact():
+            outputs["serving_artifact"] = serving_artifact_file_path
+        return outputs
+
+    def publish_model(self, metadata):
+        """
+        Publish the saved preprocessor, model and serving artifact as a new registry version and activate it,
+        unless the registry already holds these files or a rollback is pinned (see ModelRegistry.publish).
+
+        Returns:
+            str: The registry version, or None when the registry is disabled.
+        """
+        if self.model_trainer_config.registry_dir is None:
+            return None
+        files = {
+            "preprocessor": DataTransformationConfig().preprocessing_obj_file_path,
+            "model": self.model_trainer_config.trained_model_file_path,
+        }
+        if os.path.exists(self.model_trainer_config.serving_artifact_file_path):
+            files["serving_artifact"] = self.model_trainer_config.serving_artifact_file_path
+        registry = ModelRegistry(ModelRegistryConfig(registry_dir=self.model_trainer_config.registry_dir))
+        return registry.publish(files, metadata={**metadata, "model": type(load_object(files["model"])).__name__})
+
+    def _featurize_labeled(self, data_path, preprocessor):
+        """
+        Transform a labeled file (data/loan_dataset.csv schema) into features and encoded targets.
+        """
+        df = load_frame(data_path)
+        X = preprocessor.transform(df.drop(columns=["Loan_Status", "Loan_ID"], errors="ignore"))
+        # Same encoding as the LabelEncoder of DataTransformation: N -> 0, Y -> 1.
+        y = (df["Loan_Status"] == "Y").to_numpy(dtype=np.float64)
+        return X, y
+
+    def _continue_training(self, model, X_new, y_new, training_arrays_match=True):
+        """
+        Return an updated copy of the model and the update strategy used.
+
+        XGBoost and CatBoost continue boosting from the current model on the new rows, Gradient Boosting and
+        Random Forest grow update_rounds more stages or trees with warm_start, learners with partial_fit are
+        updated in place, and the remaining models are refit with their tuned hyperparameters on the saved
+        training array plus the new rows (no hyperparameter search).
+        """
+        rounds = self.model_trainer_config.update_rounds
+        model_type = type(model).__name__
+        if model_type == "XGBClassifier":
+            updated = copy.deepcopy(model)
+            updated.set_params(n_estimators=rounds)
+            updated.fit(X_new, y_new, xgb_model=model.get_booster())
+            return updated, "boosting continuation"
+        if model_type == "CatBoostClassifier":
+            updated = type(model)(**{**model.get_params(), "iterations": rounds})
+            updated.fit(X_new, y_new, init_model=model)
+            return updated, "boosting continuation"
+        if hasattr(model, "partial_fit"):
+            updated = copy.deepcopy(model)
+            updated.partial_fit(X_new, y_new, classes=model.classes_)
+            return updated, "partial_fit"
+        if model_type in ("GradientBoostingClassifier", "RandomForestClassifier"):
+            updated = copy.deepcopy(model)
+            updated.set_params(warm_start=True, n_estimators=model.n_estimators + rounds)
+            updated.fit(X_new, y_new)
+            updated.set_params(warm_start=False)
+            return updated, "warm start"
+
+        if not training_arrays_match:
+            raise ValueError(f"{model_type} is refit on the saved training array, which was transformed by a "
+                             "different preprocessor than the active registry version's")
+        train_arr = load_array(DataTransformationConfig().train_array_file_path)
+        X_all = np.vstack([train_arr[:, :-1], X_new])
+        y_all = np.concatenate([train_arr[:, -1], y_new])
+        updated = clone(model).fit(X_all, y_all)
+        return updated, "refit"
+
+    def _deployed_files(self):
+        """
+        Return the registry version being served and its files, or (None, default artifact paths) when the
+        registry is disabled or empty.
+        """
+        if self.model_trainer_config.registry_dir is not None:
+            registry = ModelRegistry(ModelRegistryConfig(registry_dir=self.model_trainer_config.registry_dir))
+            version = registry.current()
+            if version is not None:
+                return version, registry.files(version)
+        return None, {"preprocessor": DataTransformationConfig().preprocessing_obj_file_path,
+                      "model": self.model_trainer_config.trained_model_file_path}
+
+    def update_model(self, new_data_path, holdout_path=None):
+        """
+        Update the deployed model with a batch of newly labeled applications, without rerunning ingestion,
+        transformation or the hyperparameter search.
+
+        The model and preprocessor of the active registry version (the default artifacts without a registry)
+        are loaded and the model is updated on the new rows (see _continue_training). The candidate is
+        published to the registry with its holdout accuracy, and activated only if that accuracy is not worse
+        than the deployed model's by more than promotion_tolerance (and no rollback is pinned). The
+        preprocessor is kept as it is, so the features of the new rows match the ones the model was trained on.
+
+        Args:
+            new_data_path (str): Labeled applications (.csv, .feather or .parquet with Loan_Status).
+            holdout_path (str): Labeled applications to compare the models on. Defaults to the test array
+                saved by DataTransformation, if it was transformed by the deployed preprocessor.
+
+        Returns:
+            dict: The update record: base and candidate registry versions, strategy, rows, previous and new
+                holdout accuracy, promoted and active.
+
+        Example:
+            ModelTrainer().update_model('data/new_applications.csv')
+        """
+        try:
+            started = time.time()
+            transformation_config = DataTransformationConfig()
+            base_version, files = self._deployed_files()
+            preprocessor = load_object(files["preprocessor"])
+            model = load_object(files["model"])
+            # The arrays saved by DataTransformation are only valid features for the preprocessor they came from.
+            training_arrays_match = (os.path.exists(transformation_config.preprocessing_obj_file_path)
+                                     and hash_file(files["preprocessor"])
+                                     == hash_file(transformation_config.preprocessing_obj_file_path))
+
+            X_new, y_new = self._featurize_labeled(new_data_path, preprocessor)
+            if holdout_path is not None:
+                X_holdout, y_holdout = self._featurize_labeled(holdout_path, preprocessor)
+            elif training_arrays_match:
+                test_arr = load_array(transformation_config.test_array_file_path)
+                X_holdout, y_holdout = test_arr[:, :-1], test_arr[:, -1]
+            else:
+                raise ValueError("The saved test array was transformed by a different preprocessor than the "
+                                 "active registry version's; pass a holdout file")
+
+            logging.info(f"Updating {type(model).__name__} (version {base_version}) with {len(y_new)} new rows "
+                         f"from {new_data_path}")
+            updated, strategy = self._continue_training(model, X_new, y_new, training_arrays_match)
+
+            previous_accuracy = accuracy_score(y_holdout, model.predict(X_holdout))
+            accuracy = accuracy_score(y_holdout, updated.predict(X_holdout))
+            promoted = bool(accuracy >= previous_accuracy - self.model_trainer_config.promotion_tolerance)
+            record = {
+                "base_version": base_version,
+                "model": type(updated).__name__,
+                "strategy": strategy,
+                "new_data": new_data_path,
+                "rows": int(len(y_new)),
+                "previous_accuracy": float(previous_accuracy),
+                "accuracy": float(accuracy),
+                "promoted": promoted,
+            }
+
+            if self.model_trainer_config.registry_dir is None:
+                # Without a registry, the promoted model replaces the default artifacts.
+                if promoted:
+                    save_object(file_path=self.model_trainer_config.trained_model_file_path, object=updated)
+                    self.export_serving_artifacts(updated)
+                record["seconds"] = time.time() - started
+                return record
+
+            # Publish every candidate, promoted or not, so that updates can be inspected and compared.
+            registry = ModelRegistry(ModelRegistryConfig(registry_dir=self.model_trainer_config.registry_dir))
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                model_path = os.path.join(tmp_dir, os.path.basename(self.model_trainer_config.trained_model_file_path))
+                save_object(file_path=model_path, object=updated)
+                candidate_files = {"preprocessor": files["preprocessor"], "model": model_path}
+                exported = self.export_serving_artifacts(updated, model_path, files["preprocessor"], tmp_dir)
+                if "serving_artifact" in exported:
+                    candidate_files["serving_artifact"] = exported["serving_artifact"]
+                record["seconds"] = time.time() - started
+                record["version"] = registry.publish(candidate_files, metadata={"source": "update", **record},
+                                                     activate=promoted)
+            record["active"] = registry.current() == record["version"]
+
+            if promoted:
+                logging.info(f"Promoted {record['version']}: holdout accuracy {previous_accuracy:.4f} -> {accuracy:.4f}")
+            else:
+                logging.info(f"Kept the deployed model: {record['version']} holdout accuracy {accuracy:.4f} "
+                             f"is below {previous_accuracy:.4f}")
+            return record
+
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -0,0 +1,261 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+class QuantileSketch:
+    """
+    Mergeable streaming quantile sketch used for the median imputation statistics.
+
+    Values are counted exactly while a column has at most max_exact distinct values. Beyond that they
+    are moved into logarithmic buckets (as in DDSketch), so that any quantile is returned within
+    relative_accuracy of the true value using memory that only grows with the log of the value range.
+    Two sketches are merged by adding their counts, so partial sketches from parallel workers or from
+    new data can be combined.
+    """
+    def __init__(self, relative_accuracy=0.001, max_exact=10_000):
+        self.relative_accuracy = relative_accuracy
+        self.max_exact = max_exact
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.exact = Counter()
+        self.positive = None
+        self.negative = None
+        self.zero_count = 0
+
+    @property
+    def is_exact(self):
+        return self.positive is None
+
+    def _bucket(self, values):
+        keys, counts = np.unique(np.ceil(np.log(values) / self.log_gamma).astype(np.int64), return_counts=True)
+        return Counter(dict(zip(keys.tolist(), counts.tolist())))
+
+    def _to_buckets(self):
+        values = np.array(list(self.exact.keys()), dtype=np.float64)
+        counts = np.array(list(self.exact.values()), dtype=np.int64)
+        self.positive, self.negative = Counter(), Counter()
+        self.zero_count = int(counts[values == 0].sum())
+        for store, mask, sign in ((self.positive, values > 0, 1), (self.negative, values < 0, -1)):
+            for value, count in zip(values[mask] * sign, counts[mask]):
+                store[int(math.ceil(math.log(value) / self.log_gamma))] += int(count)
+        self.exact = Counter()
+
+    def update(self, values):
+        """
+        Add a chunk of values; NaNs are ignored.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.count += values.size
+        if self.is_exact:
+            unique, counts = np.unique(values, return_counts=True)
+            self.exact.update(dict(zip(unique.tolist(), counts.tolist())))
+            if len(self.exact) > self.max_exact:
+                self._to_buckets()
+            return
+        self.zero_count += int((values == 0).sum())
+        if (values > 0).any():
+            self.positive.update(self._bucket(values[values > 0]))
+        if (values < 0).any():
+            self.negative.update(self._bucket(-values[values < 0]))
+
+    def merge(self, other):
+        """
+        Merge another sketch into this one.
+        """
+        self.count += other.count
+        if self.is_exact and other.is_exact:
+            self.exact.update(other.exact)
+            if len(self.exact) > self.max_exact:
+                self._to_buckets()
+            return self
+        if self.is_exact:
+            self._to_buckets()
+        if other.is_exact:
+            other = QuantileSketch(self.relative_accuracy, self.max_exact).merge(other)
+            other._to_buckets()
+        self.positive.update(other.positive)
+        self.negative.update(other.negative)
+        self.zero_count += other.zero_count
+        return self
+
+    def _value_at_rank(self, rank):
+        """
+        Return the value of the given 0-based rank in sorted order.
+        """
+        if self.is_exact:
+            seen = 0
+            for value in sorted(self.exact):
+                seen += self.exact[value]
+                if seen > rank:
+                    return value
+            return value
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -2 * self.gamma ** key / (self.gamma + 1)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.positive) / (self.gamma + 1)
+
+    def median(self):
+        """
+        Return the median, averaging the two middle values for an even count like numpy.median.
+        """
+        if self.count == 0:
+            return np.nan
+        lower, upper = (self.count - 1) // 2, self.count // 2
+        return (self._value_at_rank(lower) + self._value_at_rank(upper)) / 2
+
+
+class RunningMoments:
+    """
+    Mergeable count, mean and sum of squared deviations (Chan et al.), for the scaling statistics.
+    """
+    def __init__(self, count=0, mean=0.0, m2=0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, values):
+        """
+        Add a chunk of values; NaNs are ignored.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size:
+            chunk_mean = values.mean()
+            self.merge(RunningMoments(values.size, chunk_mean, float(((values - chunk_mean) ** 2).sum())))
+
+    def merge(self, other):
+        """
+        Merge another set of moments into this one.
+        """
+        count = self.count + other.count
+        if count == 0:
+            return self
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        return self
+
+
+class PreprocessingStatistics:
+    """
+    Mergeable sufficient statistics of the preprocessor built by DataTransformation.get_data_transformer_object:
+    a quantile sketch and running moments per numerical column (median imputation and standard scaling),
+    and value counts per categorical column (most-frequent imputation and one-hot categories).
+
+    Statistics are updated chunk by chunk and merged across workers, and can be kept on disk so that
+    new applications update them without a pass over the old data.
+
+    Example:
+    statistics = PreprocessingStatistics(numerical_columns, categorical_columns)
+    for chunk in chunks:
+        statistics.update(chunk)
+    """
+    def __init__(self, numerical_columns, categorical_columns, relative_accuracy=0.001):
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.sketches = {column: QuantileSketch(relative_accuracy) for column in self.numerical_columns}
+        self.moments = {column: RunningMoments() for column in self.numerical_columns}
+        self.missing = Counter()
+        self.category_counts = {column: Counter() for column in self.categorical_columns}
+        self.rows = 0
+
+    def update(self, df):
+        """
+        Update the statistics from a chunk of rows.
+        """
+        self.rows += len(df)
+        for column in self.numerical_columns:
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+            self.missing[column] += int(np.isnan(values).sum())
+            self.sketches[column].update(values)
+            self.moments[column].update(values)
+        for column in self.categorical_columns:
+            values = df[column]
+            self.missing[column] += int(values.isna().sum())
+            self.category_counts[column].update(values.dropna().astype(str).value_counts().to_dict())
+        return self
+
+    def merge(self, other):
+        """
+        Merge the statistics of another chunk or worker into these.
+        """
+        self.rows += other.rows
+        self.missing.update(other.missing)
+        for column in self.numerical_columns:
+            self.sketches[column].merge(other.sketches[column])
+            self.moments[column].merge(other.moments[column])
+        for column in self.categorical_columns:
+            self.category_counts[column].update(other.category_counts[column])
+        return self
+
+    def medians(self):
+        return np.array([self.sketches[column].median() for column in self.numerical_columns])
+
+    def scaling(self, medians):
+        """
+        Return the mean and variance of each numerical column after median imputation, as StandardScaler sees it.
+        """
+        means, variances = [], []
+        for column, median in zip(self.numerical_columns, medians):
+            # The imputed rows form a group of n_missing copies of the median, with zero variance.
+            moments = RunningMoments(self.moments[column].count, self.moments[column].mean, self.moments[column].m2)
+            moments.merge(RunningMoments(self.missing[column], median, 0.0))
+            means.append(moments.mean)
+            variances.append(moments.m2 / moments.count if moments.count else 0.0)
+        return np.array(means), np.array(variances)
+
+    def modes(self):
+        """
+        Return the most frequent value of each categorical column, breaking ties by the smallest value like SimpleImputer.
+        """
+        modes = []
+        for column in self.categorical_columns:
+            counts = self.category_counts[column]
+            top = max(counts.values())
+            modes.append(min(value for value, count in counts.items() if count == top))
+        return np.array(modes, dtype=object)
+
+    def build_preprocessor(self, preprocessor):
+        """
+        Turn an unfitted preprocessor from get_data_transformer_object into a fitted one that uses these statistics.
+
+        The preprocessor is first fitted on a small synthetic frame that contains exactly the observed categories,
+        so that every fitted attribute exists for the installed scikit-learn version, and the imputation and
+        scaling statistics are then replaced by the ones computed here.
+        """
+        categories = {column: sorted(counts) for column, counts in self.category_counts.items()}
+        n_rows = max([len(values) for values in categories.values()] + [2])
+        frame = pd.DataFrame({column: np.arange(n_rows, dtype=np.float64) for column in self.numerical_columns})
+        for column, values in categories.items():
+            frame[column] = np.array([values[i % len(values)] for i in range(n_rows)], dtype=object)
+        preprocessor.fit(frame)
+
+        medians = self.medians()
+        means, variances = self.scaling(medians)
+        num_pipeline = preprocessor.named_transformers_["num_pipeline"]
+        num_pipeline.named_steps["imputer"].statistics_ = medians
+        scaler = num_pipeline.named_steps["scalar"]
+        scaler.mean_ = means
+        scaler.var_ = variances
+        # Constant columns are not scaled, like StandardScaler does.
+        scaler.scale_ = np.where(variances > 0, np.sqrt(variances), 1.0)
+        scaler.n_samples_seen_ = self.rows
+
+        cat_pipeline = preprocessor.named_transformers_["cat_pipeline"]
+        cat_pipeline.named_steps["imputer"].statistics_ = self.modes()
+        return preprocessor
@@ -0,0 +1,125 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import pandas as pd
+from sklearn.base import clone
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class CVResultStoreConfig:
+    """
+    Configuration class for the cross-validation results store.
+    """
+    db_path: str = os.path.join('artifacts', 'cv_results.sqlite')
+
+
+def canonical_params(estimator, candidate_params):
+    """
+    Return the full hyperparameter set of an estimator with the candidate applied, as canonical JSON.
+    Nested estimators and other objects are represented by their repr.
+    """
+    params = clone(estimator).set_params(**candidate_params).get_params(deep=False)
+    return json.dumps(params, sort_keys=True, default=repr)
+
+
+class CVResultStore:
+    """
+    Local SQLite store of cross-validation results, keyed by (model name, estimator class, full
+    hyperparameter set, training-data fingerprint, CV scheme).
+
+    evaluate_models looks candidates up before fitting and only fits the ones that are not known yet, so
+    widening a grid costs only the new cells. The table doubles as a queryable history of tuning runs.
+
+    Example:
+    store = CVResultStore()
+    history = store.history(model_name="Random Forest")
+    """
+    def __init__(self, config=None):
+        try:
+            self.store_config = config or CVResultStoreConfig()
+            dir_path = os.path.dirname(self.store_config.db_path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            with self._connect() as connection:
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS cv_results (
+                        model_name TEXT NOT NULL,
+                        estimator TEXT NOT NULL,
+                        params TEXT NOT NULL,
+                        data_hash TEXT NOT NULL,
+                        cv_scheme TEXT NOT NULL,
+                        mean_score REAL NOT NULL,
+                        fold_scores TEXT NOT NULL,
+                        mean_fit_time REAL NOT NULL,
+                        fit_times TEXT NOT NULL,
+                        created REAL NOT NULL,
+                        PRIMARY KEY (model_name, estimator, params, data_hash, cv_scheme)
+                    )
+                """)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.store_config.db_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def lookup(self, model_name, estimator, candidates, data_hash, cv_scheme):
+        """
+        Return the stored fold results of the given candidates.
+
+        Returns:
+            dict: candidate index -> list of (score, fit time) per fold, only for known candidates.
+        """
+        keys = {canonical_params(estimator, candidate): i for i, candidate in enumerate(candidates)}
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT params, fold_scores, fit_times FROM cv_results "
+                "WHERE model_name = ? AND estimator = ? AND data_hash = ? AND cv_scheme = ?",
+                (model_name, type(estimator).__name__, data_hash, cv_scheme),
+            ).fetchall()
+        known = {}
+        for params, fold_scores, fit_times in rows:
+            if params in keys:
+                known[keys[params]] = list(zip(json.loads(fold_scores), json.loads(fit_times)))
+        return known
+
+    def save(self, model_name, estimator, candidates, fold_results, data_hash, cv_scheme):
+        """
+        Store the fold results of completed candidates, given as {candidate index: [(score, fit time), ...]}.
+        """
+        rows = []
+        for candidate_index, results in fold_results.items():
+            scores = [score for score, _ in results]
+            fit_times = [fit_time for _, fit_time in results]
+            rows.append((
+                model_name, type(estimator).__name__, canonical_params(estimator, candidates[candidate_index]),
+                data_hash, cv_scheme, sum(scores) / len(scores), json.dumps(scores),
+                sum(fit_times) / len(fit_times), json.dumps(fit_times), time.time(),
+            ))
+        if not rows:
+            return
+        with self._connect() as connection:
+            connection.executemany("INSERT OR REPLACE INTO cv_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        logging.info(f"Stored {len(rows)} cross-validation results for {model_name}")
+
+    def history(self, model_name=None, data_hash=None):
+        """
+        Return past tuning results as a DataFrame, best first.
+        """
+        query = "SELECT * FROM cv_results WHERE (? IS NULL OR model_name = ?) AND (? IS NULL OR data_hash = ?) " \
+                "ORDER BY mean_score DESC, created"
+        with self._connect() as connection:
+            return pd.read_sql_query(query, connection, params=(model_name, model_name, data_hash, data_hash))
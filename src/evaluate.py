@@ -1,13 +1,317 @@
 import sys
+import time
+import numpy as np
+from src.cache import hash_array
 from src.exception import CustomException
+from src.logger import logging
 
+from joblib import Parallel, delayed
+from sklearn.base import clone
 from sklearn.metrics import accuracy_score
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
 
-def evaluate_models(models, params, X_train, y_train, X_test, y_test):
+
+# Hyperparameters that set the number of ensemble members. A single fit at the largest value can score
+# every smaller value by prefixes, through staged predictions, truncated boosting or warm starts.
+ENSEMBLE_SIZE_PARAMS = ("n_estimators", "iterations")
+
+
+def _ensemble_size_param(estimator, candidate_params):
+    """
+    Return the ensemble-size hyperparameter of the candidate if the estimator can score its prefixes, else None.
+    """
+    for size_param in ENSEMBLE_SIZE_PARAMS:
+        if size_param not in candidate_params:
+            continue
+        # Without a learning rate CatBoost derives one from the number of iterations, so a shorter model is
+        # not a prefix of a longer one.
+        if size_param == "iterations" and candidate_params.get(
+                "learning_rate", estimator.get_params().get("learning_rate")) is None:
+            return None
+        if hasattr(estimator, "staged_predict") or hasattr(estimator, "get_booster") \
+                or "warm_start" in estimator.get_params():
+            return size_param
+    return None
+
+
+def _fit_and_score(estimator, candidate_params, X, y, train, test, deadline):
+    """
+    Fit a fresh clone of the estimator on one CV fold and return its (validation accuracy, fit time).
+    Returns None without fitting once the search deadline has passed.
+    """
+    if deadline is not None and time.time() >= deadline:
+        return None
+    estimator = clone(estimator).set_params(**candidate_params)
+    start = time.time()
+    estimator.fit(X[train], y[train])
+    fit_time = time.time() - start
+    return accuracy_score(y[test], estimator.predict(X[test])), fit_time
+
+
+def _fit_and_score_path(estimator, base_params, size_param, sizes, X, y, train, test, deadline):
+    """
+    Grow one ensemble on a CV fold and return the (validation accuracy, fit time) of each requested size.
+
+    Boosting models with staged predictions (Gradient Boosting, AdaBoost, CatBoost) are fit once at the
+    largest size and every prefix is scored from the stages. XGBoost is fit once and scored with truncated
+    iteration ranges. Other ensembles (Random Forest) are grown with warm_start, adding trees between sizes.
+    Returns a list of None without fitting once the search deadline has passed.
+    """
+    if deadline is not None and time.time() >= deadline:
+        return [None] * len(sizes)
+    estimator = clone(estimator).set_params(**base_params)
+    X_fit, y_fit, X_val, y_val = X[train], y[train], X[test], y[test]
+    ordered_sizes = sorted(set(sizes))
+    scores = {}
+    start = time.time()
+
+    if hasattr(estimator, "staged_predict"):
+        estimator.set_params(**{size_param: ordered_sizes[-1]}).fit(X_fit, y_fit)
+        fit_time = time.time() - start
+        y_pred = None
+        for n_members, y_pred in enumerate(estimator.staged_predict(X_val), start=1):
+            if n_members in ordered_sizes:
+                scores[n_members] = (accuracy_score(y_val, y_pred), fit_time)
+        # A boosting run that stopped early (e.g. AdaBoost on a perfect fit) predicts like its last stage.
+        for n_members in ordered_sizes:
+            scores.setdefault(n_members, (accuracy_score(y_val, y_pred), fit_time))
+    elif hasattr(estimator, "get_booster"):
+        estimator.set_params(**{size_param: ordered_sizes[-1]}).fit(X_fit, y_fit)
+        fit_time = time.time() - start
+        for n_members in ordered_sizes:
+            scores[n_members] = (accuracy_score(y_val, estimator.predict(X_val, iteration_range=(0, n_members))), fit_time)
+    else:
+        estimator.set_params(warm_start=True)
+        for n_members in ordered_sizes:
+            estimator.set_params(**{size_param: n_members}).fit(X_fit, y_fit)
+            scores[n_members] = (accuracy_score(y_val, estimator.predict(X_val)), time.time() - start)
+
+    return [scores[n_members] for n_members in sizes]
+
+
+def _score_task(task, X, y, deadline):
+    """
+    Run one fit task and return a result per candidate of the task.
+    """
+    _, candidate_indices, estimator, base_params, size_param, sizes, train, test = task
+    if size_param is None:
+        return [_fit_and_score(estimator, base_params, X, y, train, test, deadline)]
+    return _fit_and_score_path(estimator, base_params, size_param, sizes, X, y, train, test, deadline)
+
+
+def _refit(estimator, best_params, X, y):
+    """
+    Fit the estimator with its best hyperparameters on the whole training set.
+    """
+    return clone(estimator).set_params(**best_params).fit(X, y)
+
+
+def _build_tasks(models, candidates, alive, folds, n_samples=None, warm_start=True):
+    """
+    Build the fit tasks for the alive candidates of each model on every fold.
+
+    A task is (model_name, candidate_indices, estimator, base_params, size_param, sizes, train, test). With
+    warm_start, candidates that only differ in their ensemble size are grouped into a single task, otherwise
+    every task holds one candidate. Tasks of all models are interleaved so that a time budget cuts every
+    model's search evenly.
+    """
+    model_groups = {}
+    for model_name, candidate_indices in alive.items():
+        groups = {}
+        for candidate_index in candidate_indices:
+            candidate_params = candidates[model_name][candidate_index]
+            size_param = _ensemble_size_param(models[model_name], candidate_params) if warm_start else None
+            if size_param is None:
+                groups[("candidate", candidate_index)] = [[candidate_index], candidate_params, None, None]
+                continue
+            base_params = {k: v for k, v in candidate_params.items() if k != size_param}
+            group = groups.setdefault(
+                (size_param, repr(sorted(base_params.items()))), [[], base_params, size_param, []]
+            )
+            group[0].append(candidate_index)
+            group[3].append(candidate_params[size_param])
+        model_groups[model_name] = list(groups.values())
+
+    tasks = []
+    for group_index in range(max((len(groups) for groups in model_groups.values()), default=0)):
+        for model_name, groups in model_groups.items():
+            if group_index < len(groups):
+                candidate_indices, base_params, size_param, sizes = groups[group_index]
+                for train, test in folds:
+                    tasks.append((model_name, candidate_indices, models[model_name], base_params, size_param, sizes,
+                                  train if n_samples is None else train[:n_samples], test))
+    return tasks
+
+
+def _run_fits(tasks, X, y, deadline, n_jobs):
+    """
+    Run the fit tasks in parallel and collect the fold results of every (model_name, candidate_index).
+
+    Returns:
+        tuple: (list of (score, fit time) per fold for each candidate, number of completed fit tasks)
+    """
+    results = Parallel(n_jobs=n_jobs)(delayed(_score_task)(task, X, y, deadline) for task in tasks)
+    fold_results = {}
+    completed = 0
+    for (model_name, candidate_indices, _, _, _, _, _, _), task_results in zip(tasks, results):
+        completed += task_results[0] is not None
+        for candidate_index, result in zip(candidate_indices, task_results):
+            if result is not None:
+                fold_results.setdefault((model_name, candidate_index), []).append(result)
+    return fold_results, completed
+
+
+def _score_candidates(models, candidates, alive, X, y, folds, deadline, n_jobs, warm_start,
+                      results_store, data_hash, cv_scheme, n_samples=None):
+    """
+    Score the alive candidates on every fold, reusing the results store for candidates that are known.
+
+    Returns:
+        tuple: (mean score per completed (model_name, candidate_index), number of completed fit tasks)
+    """
+    known = {}
+    if results_store is not None:
+        for model_name, candidate_indices in alive.items():
+            stored = results_store.lookup(model_name, models[model_name], candidates[model_name], data_hash, cv_scheme)
+            known.update({(model_name, i): stored[i] for i in candidate_indices if i in stored})
+        if known:
+            logging.info(f"Reusing {len(known)} stored cross-validation results ({cv_scheme})")
+    to_fit = {model_name: [i for i in candidate_indices if (model_name, i) not in known]
+              for model_name, candidate_indices in alive.items()}
+
+    tasks = _build_tasks(models, candidates, to_fit, folds, n_samples=n_samples, warm_start=warm_start)
+    logging.info(f"Launching {len(tasks)} cross-validation fits")
+    fold_results, completed = _run_fits(tasks, X, y, deadline, n_jobs)
+    # Only candidates with every fold completed are considered (and stored).
+    fold_results = {key: results for key, results in fold_results.items() if len(results) == len(folds)}
+
+    if results_store is not None:
+        for model_name in to_fit:
+            new_results = {i: results for (name, i), results in fold_results.items() if name == model_name}
+            results_store.save(model_name, models[model_name], candidates[model_name], new_results, data_hash, cv_scheme)
+
+    fold_results.update(known)
+    mean_scores = {key: np.mean([score for score, _ in results]) for key, results in fold_results.items()}
+    return mean_scores, completed
+
+
+def _grid_search(models, candidates, X, y, folds, deadline, n_jobs, warm_start, results_store, data_hash, cv_scheme):
+    """
+    Exhaustive search: every candidate of every model is scored on every fold.
+
+    Returns:
+        tuple: (best hyperparameters per model, number of fits performed, number of fits in full-fold equivalents)
+    """
+    alive = {model_name: list(range(len(candidates[model_name]))) for model_name in models}
+    mean_scores, n_fits = _score_candidates(models, candidates, alive, X, y, folds, deadline, n_jobs, warm_start,
+                                            results_store, data_hash, cv_scheme)
+
+    best_params = {}
+    for model_name in models:
+        scores = [mean_scores.get((model_name, i), -np.inf) for i in range(len(candidates[model_name]))]
+        if scores and np.max(scores) > -np.inf:
+            best_params[model_name] = candidates[model_name][int(np.argmax(scores))]
+    return best_params, n_fits, float(n_fits)
+
+
+def _halving_search(models, candidates, X, y, folds, deadline, n_jobs, warm_start, results_store, data_hash,
+                    cv_scheme, factor, min_resources, family_prune_margin):
+    """
+    Successive halving: all candidates are scored on small subsamples of each training fold, and only the
+    best 1/factor of every model's candidates is promoted to the next round, which uses factor times more
+    samples. The last round uses the full folds. As in HalvingGridSearchCV, the number of rounds is capped by
+    the samples available (at least min_resources per fold in the first round); the eliminations of the
+    rounds that do not fit are made at once after the first round. Whole models whose best score trails the
+    leading model by more than family_prune_margin are dropped after each intermediate round.
+
+    Returns:
+        tuple: (best hyperparameters per model, number of fits performed, fits weighted by subsample size
+            as a fraction of the full fold)
+    """
+    # Nested subsamples: round r trains on the first n_r rows of a fixed permutation of each training fold.
+    rng = np.random.RandomState(0)
+    folds = [(rng.permutation(train), test) for train, test in folds]
+    n_full = min(len(train) for train, _ in folds)
+    min_resources = max(min(min_resources, n_full), 1)
+    # The rounds needed to narrow the candidates down to one are capped by the rounds the samples allow, so
+    # that every round trains on factor times more samples than the previous one.
+    n_candidate_rounds = int(np.ceil(np.log(max(max(len(c) for c in candidates.values()), 1)) / np.log(factor))) + 1
+    n_resource_rounds = int(np.floor(np.log(n_full / min_resources) / np.log(factor))) + 1
+    n_rounds = min(n_candidate_rounds, n_resource_rounds)
+    first_round_eliminations = n_candidate_rounds - n_rounds + 1
+
+    alive = {model_name: list(range(len(candidates[model_name]))) for model_name in models}
+    best_seen = {}
+    n_fits = 0
+    full_fit_equivalents = 0.0
+    for round_index in range(n_rounds):
+        n_samples = int(max(min_resources, n_full / factor ** (n_rounds - 1 - round_index)))
+        logging.info(f"Halving round {round_index + 1}/{n_rounds} on {n_samples} samples per fold")
+        round_scores, completed = _score_candidates(
+            models, candidates, alive, X, y, folds, deadline, n_jobs, warm_start,
+            results_store, data_hash, f"{cv_scheme}, halving subsample {n_samples}", n_samples=n_samples
+        )
+        n_fits += completed
+        full_fit_equivalents += completed * n_samples / n_full
+
+        for (model_name, candidate_index), score in sorted(round_scores.items(), key=lambda item: item[0][1]):
+            # Results from later rounds (more samples) take precedence over earlier ones.
+            best = best_seen.get(model_name)
+            if best is None or (n_samples, score) > (best[0], best[1]):
+                best_seen[model_name] = (n_samples, score, candidate_index)
+
+        if deadline is not None and time.time() >= deadline:
+            logging.info("Time budget exhausted during successive halving")
+            break
+        if round_index == n_rounds - 1:
+            break
+
+        # Promote the top 1/factor of each model's candidates (1/factor^k after the first round).
+        keep_factor = factor ** (first_round_eliminations if round_index == 0 else 1)
+        for model_name, candidate_indices in alive.items():
+            scored = sorted(candidate_indices, key=lambda i: -round_scores.get((model_name, i), -np.inf))
+            alive[model_name] = sorted(scored[:max(1, int(np.ceil(len(scored) / keep_factor)))])
+
+        # Drop whole models that trail the leader.
+        if family_prune_margin is not None:
+            model_best = {
+                model_name: max((round_scores.get((model_name, i), -np.inf) for i in candidate_indices), default=-np.inf)
+                for model_name, candidate_indices in alive.items()
+            }
+            leader = max(model_best.values())
+            for model_name, score in model_best.items():
+                if score < leader - family_prune_margin:
+                    logging.info(f"Pruning {model_name}: {score:.4f} trails the leader {leader:.4f}")
+                    del alive[model_name]
+                    best_seen.pop(model_name, None)
+
+    best_params = {model_name: candidates[model_name][best_seen[model_name][2]] for model_name in models if model_name in best_seen}
+    return best_params, n_fits, full_fit_equivalents
+
+
+def evaluate_models(models, params, X_train, y_train, X_test, y_test, n_jobs=-1, time_budget=None, cv=3,
+                    warm_start=True, strategy="grid", halving_factor=3, min_resources=50, family_prune_margin=0.05,
+                    results_store=None):
     """
     Evaluate a set of machine learning models using grid search and report their performance metrics.
 
+    Every (model, hyperparameter set, CV fold) fit is an independent task, and all tasks of all models
+    are run concurrently on n_jobs worker processes. Candidates are interleaved across model families, so
+    when a time budget is given and runs out, no new fits are launched and every family is judged on the
+    candidates it completed so far. The best candidate of each family is then refit on the whole training set.
+
+    With strategy="halving" the exhaustive grid is replaced by successive halving: candidates are first
+    scored on small subsamples and only the best fraction is promoted to larger ones, and models that trail
+    the leader early are dropped altogether. The number of fits performed is printed for either strategy.
+
+    With warm_start, candidates that only differ in n_estimators (or CatBoost's iterations) share one fit per
+    fold: the largest ensemble is grown once and every smaller size is scored from its prefix, so the cost of
+    an ensemble grid no longer scales with the sum of all tree counts.
+
+    With a results_store (see src.cv_store.CVResultStore), the cross-validation results of every candidate
+    are recorded per (model, hyperparameters, training-data hash, CV scheme), and candidates that are already
+    known are not fitted again, so widening a grid only costs the new cells.
+
     Parameters:
         models (dict): A dictionary of machine learning models to be evaluated.
         params (dict): A dictionary of hyperparameter grids for each model.
@@ -15,9 +319,21 @@ def evaluate_models(models, params, X_train, y_train, X_test, y_test):
         y_train (array-like): Training target vector.
         X_test (array-like): Testing feature matrix.
         y_test (array-like): Testing target vector.
+        n_jobs (int): Number of worker processes; -1 uses all cores.
+        time_budget (float): Wall-clock budget in seconds for the cross-validation fits, or None for no limit.
+        cv (int): Number of stratified cross-validation folds.
+        warm_start (bool): Score all ensemble sizes of a candidate from one grown ensemble.
+        strategy (str): "grid" for exhaustive grid search (default) or "halving" for successive halving.
+        halving_factor (int): Fraction 1/halving_factor of candidates promoted per halving round.
+        min_resources (int): Number of training samples per fold in the first halving round.
+        family_prune_margin (float): Accuracy margin behind the leader at which a whole model is dropped
+            during halving, or None to never drop models.
+        results_store (CVResultStore): Optional store used to reuse and record cross-validation results.
 
     Returns:
         report (dict): A dictionary containing the model names as keys and their test accuracy scores as values.
+            Models without a single completed candidate within the time budget are left out. The entries of
+            `models` are replaced by the refitted best estimators.
 
     Raises:
         CustomException: If an error occurs during the evaluation process.
@@ -67,23 +383,40 @@ def evaluate_models(models, params, X_train, y_train, X_test, y_test):
         report = evaluate_models(models, params, X_train, y_train, X_test, y_test)
     """
     try:
+        X_train, y_train = np.asarray(X_train), np.asarray(y_train)
+        deadline = time.time() + time_budget if time_budget is not None else None
+        folds = list(StratifiedKFold(n_splits=cv).split(X_train, y_train))
+        candidates = {model_name: list(ParameterGrid(params.get(model_name, {}))) for model_name in models}
+        grid_fits = sum(len(c) for c in candidates.values()) * cv
+        data_hash = hash_array(X_train) + hash_array(y_train) if results_store is not None else None
+        cv_scheme = f"StratifiedKFold(n_splits={cv}), accuracy"
+
+        logging.info(f"Starting {strategy} search with n_jobs={n_jobs}, time_budget={time_budget}")
+        if strategy == "grid":
+            best_params, n_fits, fit_cost = _grid_search(models, candidates, X_train, y_train, folds, deadline, n_jobs, warm_start,
+                                                         results_store, data_hash, cv_scheme)
+        elif strategy == "halving":
+            best_params, n_fits, fit_cost = _halving_search(models, candidates, X_train, y_train, folds, deadline, n_jobs,
+                                                  warm_start, results_store, data_hash, cv_scheme, halving_factor, min_resources, family_prune_margin)
+        else:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+
+        print(f"Total cross-validation fits ({strategy}): {n_fits}, {fit_cost:.1f} in full-fold equivalents (exhaustive grid: {grid_fits})")
+        logging.info(f"Completed {n_fits} cross-validation fits ({fit_cost:.1f} full-fold equivalents) with the {strategy} strategy "
+                     f"(exhaustive grid: {grid_fits})")
+        for model_name in models:
+            if model_name not in best_params:
+                logging.info(f"No completed candidate for {model_name}")
+
+        # Fit each model again with its best hyperparameters.
+        refitted = Parallel(n_jobs=n_jobs)(
+            delayed(_refit)(models[model_name], best_params[model_name], X_train, y_train) for model_name in best_params
+        )
+
         report = {}
-        for model_name, model in models.items():
-            # Define the hyperparameter grid for the current model.
-            param_grid = params.get(model_name, {})
-            
-            # Create a GridSearchCV object for hyperparameter tuning.
-            gs = GridSearchCV(model, param_grid, cv=3)
-            
-            # Fit the model to the training data with grid search.
-            gs.fit(X_train, y_train)
-            
-            # Set the best hyperparameters found by grid search.
-            model.set_params(**gs.best_params_)
-            
-            # Fit the model again with the best hyperparameters.
-            model.fit(X_train, y_train)
-            
+        for model_name, model in zip(best_params, refitted):
+            models[model_name] = model
+
             # Make predictions on the training and testing data.
             y_train_pred = model.predict(X_train)
             y_test_pred = model.predict(X_test)
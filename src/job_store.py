@@ -0,0 +1,202 @@
+import os
+import sys
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from src.exception import CustomException
+from src.logger import logging
+
+
+@dataclass
+class JobStoreConfig:
+    """
+    Configuration class for the bulk-scoring job store.
+
+    Attributes:
+        db_path (str): SQLite database holding the job queue.
+        jobs_dir (str): Directory holding jobs/<job id>/ with the uploaded input and the results.
+    """
+    db_path: str = os.environ.get("LOAN_JOB_DB_PATH", os.path.join('artifacts', 'jobs.sqlite'))
+    jobs_dir: str = os.environ.get("LOAN_JOBS_DIR", os.path.join('artifacts', 'jobs'))
+
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class JobStore:
+    """
+    Local SQLite queue of bulk-scoring jobs.
+
+    A job is claimed by one worker at a time under a lease: the worker renews its heartbeat with every
+    committed chunk, and a running job whose heartbeat is older than the lease is claimed again by another
+    worker, so that the jobs of a crashed process are not lost. Progress is recorded per chunk together with
+    the size of the results file at that point, so that a claimed job resumes after the last committed chunk.
+    Updates from a worker that lost its lease are rejected.
+
+    Example:
+    store = JobStore()
+    job_id = store.create('data/loan_dataset.csv', 'csv', 'artifacts/jobs/results.csv', 'csv', 10_000)
+    store.get(job_id)["status"]
+    """
+    def __init__(self, config=None):
+        try:
+            self.store_config = config or JobStoreConfig()
+            dir_path = os.path.dirname(self.store_config.db_path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
+            with self._connect() as connection:
+                # Write-ahead logging lets the API read job status while a worker commits a chunk.
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id TEXT PRIMARY KEY,
+                        status TEXT NOT NULL,
+                        input_path TEXT NOT NULL,
+                        input_format TEXT NOT NULL,
+                        output_path TEXT NOT NULL,
+                        output_format TEXT NOT NULL,
+                        chunk_size INTEGER NOT NULL,
+                        total_rows INTEGER,
+                        chunks_done INTEGER NOT NULL DEFAULT 0,
+                        rows_done INTEGER NOT NULL DEFAULT 0,
+                        errors INTEGER NOT NULL DEFAULT 0,
+                        output_bytes INTEGER NOT NULL DEFAULT 0,
+                        model_version TEXT,
+                        worker TEXT,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        error TEXT,
+                        created REAL NOT NULL,
+                        started REAL,
+                        heartbeat REAL,
+                        finished REAL
+                    )
+                """)
+                connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.store_config.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def job_dir(self, job_id):
+        return os.path.join(self.store_config.jobs_dir, job_id)
+
+    @staticmethod
+    def new_id():
+        return uuid.uuid4().hex
+
+    def create(self, input_path, input_format, output_path, output_format, chunk_size, job_id=None):
+        """
+        Queue a job and return its id.
+        """
+        job_id = job_id or self.new_id()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, status, input_path, input_format, output_path, output_format, chunk_size, "
+                "created) VALUES (?, 'queued', ?, ?, ?, ?, ?, ?)",
+                (job_id, input_path, input_format, output_path, output_format, chunk_size, time.time()),
+            )
+        logging.info(f"Queued scoring job {job_id} for {input_path}")
+        return job_id
+
+    def get(self, job_id):
+        """
+        Return a job as a dict, or None if it does not exist.
+        """
+        with self._connect() as connection:
+            row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def list(self, status=None, limit=100):
+        """
+        Return the most recent jobs, optionally only those with the given status.
+        """
+        query, params = "SELECT * FROM jobs", ()
+        if status is not None:
+            query, params = query + " WHERE status = ?", (status,)
+        with self._connect() as connection:
+            rows = connection.execute(query + " ORDER BY created DESC LIMIT ?", params + (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self):
+        with self._connect() as connection:
+            rows = connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: 0 for status in JOB_STATUSES} | {status: count for status, count in rows}
+
+    def claim(self, worker_id, lease_seconds):
+        """
+        Claim the oldest queued job, or a running job whose lease expired.
+
+        Returns:
+            dict: The claimed job, or None if there is nothing to run.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            # Take the write lock before selecting, so that two workers cannot claim the same job.
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND heartbeat < ?) "
+                "ORDER BY created LIMIT 1",
+                (now - lease_seconds,),
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, heartbeat = ?, started = COALESCE(started, ?), "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker_id, now, now, row["id"]),
+            )
+            job = connection.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        return dict(job)
+
+    def _update_owned(self, job_id, worker_id, assignments, params):
+        with self._connect() as connection:
+            cursor = connection.execute(
+                f"UPDATE jobs SET {assignments}, heartbeat = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                params + (time.time(), job_id, worker_id),
+            )
+        return cursor.rowcount == 1
+
+    def start(self, job_id, worker_id, total_rows, model_version):
+        """
+        Record the number of input rows and the model version a job is scored with, on its first claim.
+        Returns False if the worker no longer holds the job.
+        """
+        return self._update_owned(job_id, worker_id, "total_rows = ?, model_version = ?", (total_rows, model_version))
+
+    def commit_chunk(self, job_id, worker_id, chunks_done, rows_done, errors, output_bytes):
+        """
+        Record a chunk whose results were written and synced to the results file, which is output_bytes long.
+        Returns False if the worker no longer holds the job.
+        """
+        return self._update_owned(
+            job_id, worker_id, "chunks_done = ?, rows_done = ?, errors = ?, output_bytes = ?",
+            (chunks_done, rows_done, errors, output_bytes),
+        )
+
+    def finish(self, job_id, worker_id, status, error=None):
+        """
+        Mark a job succeeded or failed. Returns False if the worker no longer holds the job.
+        """
+        return self._update_owned(job_id, worker_id, "status = ?, error = ?, finished = ?",
+                                  (status, error, time.time()))
+
+    def release(self, job_id, worker_id):
+        """
+        Put a job back in the queue, keeping its progress, when its worker shuts down.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL WHERE id = ? AND worker = ? AND status = 'running'",
+                (job_id, worker_id),
+            )
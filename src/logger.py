@@ -1,5 +1,11 @@
 import os
+import json
+import time
+import queue
+import atexit
 import logging
+import logging.handlers
+from dataclasses import dataclass
 from datetime import datetime
 
 # Create a unique log file name based on the current date and time.
@@ -14,9 +20,247 @@ os.makedirs(log_path, exist_ok=True)
 # Create the full path to the log file.
 LOG_FILE_PATH = os.path.join(log_path, LOG_FILE)
 
-# Configure the logging system.
-logging.basicConfig(
-    filename=LOG_FILE_PATH,  # Specify the log file where log messages will be written.
-    format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",  # Define the log message format.
-    level=logging.INFO  # Set the logging level to INFO, which captures messages with INFO level or higher.
-)
+# Log message format of the synchronous mode, and of the queue mode when caller information is kept.
+LOG_FORMAT = "[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+
+# Format without %(lineno)d, used when the caller's frame is not looked up for every record.
+LOG_FORMAT_NO_CALLER = "[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s"
+
+# Name of the logger for per-request messages, which are sampled (see LoggingConfig.request_log_rate).
+REQUEST_LOGGER_NAME = "loan_api.requests"
+
+
+@dataclass
+class LoggingConfig:
+    """
+    Configuration class for the logging backend. Every setting can be overridden through an environment variable.
+
+    Attributes:
+        mode (str): "queue" hands records to a background writer thread through a queue, so that logging calls
+            never wait for the disk; "sync" writes them on the calling thread (LOAN_LOG_MODE).
+        log_format (str): "text" for the classic format or "json" for one JSON object per line (LOAN_LOG_FORMAT).
+        caller_info (bool): Whether the line number of every logging call is looked up and written
+            (LOAN_LOG_CALLER_INFO); always kept in the sync mode. When it is off, the queue mode sets
+            logging._srcfile to None, which the logging documentation describes as the way to skip the
+            stack walk of findCaller for every record.
+        batch_size (int): Records the background writer writes before it flushes the file (LOAN_LOG_BATCH_SIZE).
+        flush_seconds (float): Longest time a written record waits for a flush (LOAN_LOG_FLUSH_SECONDS).
+        request_log_rate (float): Per-request records let through per second; 0 drops them all
+            (LOAN_LOG_REQUEST_RATE).
+    """
+    mode: str = os.environ.get("LOAN_LOG_MODE", "queue")
+    log_format: str = os.environ.get("LOAN_LOG_FORMAT", "text")
+    caller_info: bool = os.environ.get("LOAN_LOG_CALLER_INFO", "0") == "1"
+    batch_size: int = int(os.environ.get("LOAN_LOG_BATCH_SIZE", 512))
+    flush_seconds: float = float(os.environ.get("LOAN_LOG_FLUSH_SECONDS", 1.0))
+    request_log_rate: float = float(os.environ.get("LOAN_LOG_REQUEST_RATE", 10.0))
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as JSON lines, including any fields passed through extra={...}, and the caller's line
+    number when caller_info is set.
+    """
+    # Attributes every LogRecord has; anything else came from extra={...}.
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+    def __init__(self, caller_info=True):
+        super().__init__()
+        self.caller_info = caller_info
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if self.caller_info and record.lineno:
+            entry["line"] = record.lineno
+        for key, value in vars(record).items():
+            if key not in self.RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class BatchedFileHandler(logging.FileHandler):
+    """
+    FileHandler that flushes after batch_size records instead of after every record. It is only used by the
+    background writer, which also flushes it whenever the queue has been idle for flush_seconds.
+    """
+    def __init__(self, filename, batch_size=512, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.batch_size = batch_size
+        self._pending = 0
+
+    def emit(self, record):
+        try:
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self._pending = 0
+        super().flush()
+
+
+class InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a queue read in the same process: the message is merged with its arguments on the
+    calling thread (arguments may change later), but the record is neither copied nor formatted there.
+    """
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """
+    QueueListener that flushes its handlers whenever no record arrived for flush_seconds, so that records
+    written in a batch reach the file shortly after a burst ends.
+    """
+    def __init__(self, log_queue, *handlers, flush_seconds=1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_seconds = flush_seconds
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block=block, timeout=self.flush_seconds if block else None)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token-bucket sampling: lets through at most rate records per second (bursts of up to rate records), and
+    adds how many records were dropped since the last one let through as the dropped_records field.
+    """
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.dropped = 0
+
+    def filter(self, record):
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            self.dropped += 1
+            return False
+        self.tokens -= 1
+        if self.dropped:
+            record.dropped_records = self.dropped
+            self.dropped = 0
+        return True
+
+
+_listener = None
+_queue_handler = None
+_file_handler = None
+
+
+def _formatter(config):
+    if config.log_format == "json":
+        return JsonFormatter(caller_info=config.caller_info)
+    return logging.Formatter(LOG_FORMAT if config.caller_info else LOG_FORMAT_NO_CALLER)
+
+
+def _start_listener(config):
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = BatchingQueueListener(log_queue, _file_handler, flush_seconds=config.flush_seconds)
+    _listener.start()
+
+
+def stop_logging():
+    """
+    Write every queued record and flush the log file. Registered at exit; processes that leave through
+    os._exit (e.g. forked workers) call it themselves. Records logged afterwards go straight to the file.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        # Records logged afterwards (e.g. by other atexit handlers) are written directly, one at a time.
+        root = logging.getLogger()
+        root.removeHandler(_queue_handler)
+        _file_handler.batch_size = 1
+        root.addHandler(_file_handler)
+    if _file_handler is not None:
+        _file_handler.flush()
+
+
+def _before_fork():
+    # Hold the writer's lock so that the file buffer is not half-written when the process is copied.
+    _file_handler.acquire()
+    _file_handler.flush()
+
+
+def _after_fork_in_parent():
+    _file_handler.release()
+
+
+def _after_fork_in_child():
+    # The writer thread does not exist in the child: start a new one on a fresh queue.
+    if _listener is not None:
+        _start_listener(logging_config)
+
+
+def configure_logging(config):
+    """
+    Configure the root logger for the given LoggingConfig. Called once when this module is imported.
+    """
+    global _queue_handler, _file_handler
+    request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
+    if config.request_log_rate > 0:
+        request_logger.addFilter(RateLimitFilter(config.request_log_rate))
+    else:
+        request_logger.disabled = True
+
+    if config.mode != "queue":
+        # Configure the logging system.
+        logging.basicConfig(
+            filename=LOG_FILE_PATH,  # Specify the log file where log messages will be written.
+            format=LOG_FORMAT,  # Define the log message format.
+            level=logging.INFO  # Set the logging level to INFO, which captures messages with INFO level or higher.
+        )
+        if config.log_format == "json":
+            for handler in logging.getLogger().handlers:
+                handler.setFormatter(JsonFormatter())
+        return
+
+    if not config.caller_info:
+        # Skip the stack walk that finds the caller's file and line number for every record.
+        logging._srcfile = None
+
+    _file_handler = BatchedFileHandler(LOG_FILE_PATH, batch_size=config.batch_size, delay=True)
+    _file_handler.setFormatter(_formatter(config))
+    _queue_handler = InProcessQueueHandler(queue.SimpleQueue())
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(logging.INFO)
+    _start_listener(config)
+
+    atexit.register(stop_logging)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(before=_before_fork, after_in_parent=_after_fork_in_parent,
+                            after_in_child=_after_fork_in_child)
+
+
+logging_config = LoggingConfig()
+configure_logging(logging_config)
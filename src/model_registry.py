@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+from dataclasses import dataclass
+
+from src.cache import hash_file
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import atomic_write, fsync_dir
+
+
+@dataclass
+class ModelRegistryConfig:
+    """
+    Configuration class for the local model registry.
+
+    Attributes:
+        registry_dir (str): Directory holding versions/<version>/ and the current.json pointer.
+    """
+    registry_dir: str = os.environ.get("LOAN_MODEL_REGISTRY_DIR", os.path.join('artifacts', 'registry'))
+
+
+# Files a version can hold; the serving artifact is optional (see PredictionPipelineConfig).
+VERSION_FILES = {
+    "preprocessor": "preprocessor.pkl",
+    "model": "model.pkl",
+    "serving_artifact": "serving_model.npz",
+}
+
+
+class ModelRegistry:
+    """
+    Local versioned registry of serving artifacts (preprocessor, model and optional serving artifact).
+
+    A version is published by copying its files into a temporary directory, fsyncing them and renaming the
+    directory to versions/<version>, so that a version directory is always complete. The active version is
+    recorded in current.json, which is replaced atomically together with the history of earlier activations,
+    so that rolling back is a single pointer update. Serving processes poll current.json and hot-swap.
+
+    A rollback pins the active version: publishing (e.g. by a training run) no longer activates new
+    versions until an operator activates a version explicitly.
+
+    Example:
+    registry = ModelRegistry()
+    version = registry.publish({"preprocessor": "artifacts/preprocessor.pkl", "model": "artifacts/model.pkl"})
+    registry.rollback()
+    """
+    def __init__(self, config=None):
+        self.registry_config = config or ModelRegistryConfig()
+        self.versions_dir = os.path.join(self.registry_config.registry_dir, 'versions')
+        self.pointer_path = os.path.join(self.registry_config.registry_dir, 'current.json')
+
+    def _read_pointer(self):
+        if not os.path.exists(self.pointer_path):
+            return {"version": None, "history": []}
+        with open(self.pointer_path, 'r') as file_obj:
+            return json.load(file_obj)
+
+    def _write_pointer(self, pointer):
+        with atomic_write(self.pointer_path, mode='w') as file_obj:
+            json.dump(pointer, file_obj)
+
+    def current(self):
+        """
+        Return the active version, or None if nothing was published yet.
+        """
+        return self._read_pointer()["version"]
+
+    def version_dir(self, version):
+        return os.path.join(self.versions_dir, version)
+
+    def files(self, version=None):
+        """
+        Return {name: path} of the files of a version (the active one by default).
+        """
+        version = version or self.current()
+        if version is None:
+            return {}
+        return {name: os.path.join(self.version_dir(version), file_name)
+                for name, file_name in VERSION_FILES.items()
+                if os.path.exists(os.path.join(self.version_dir(version), file_name))}
+
+    def metadata(self, version):
+        with open(os.path.join(self.version_dir(version), 'metadata.json'), 'r') as file_obj:
+            return json.load(file_obj)
+
+    def versions(self):
+        """
+        Return the metadata of every published version, oldest first, marking the active one.
+        """
+        if not os.path.isdir(self.versions_dir):
+            return []
+        current = self.current()
+        versions = []
+        for version in sorted(name for name in os.listdir(self.versions_dir) if not name.startswith('.')):
+            metadata = self.metadata(version)
+            metadata["active"] = version == current
+            versions.append(metadata)
+        return versions
+
+    def publish(self, files, metadata=None, activate=True, override_pin=False):
+        """
+        Publish a new version from {name: path} (see VERSION_FILES) and optionally make it the active one.
+        If the files are identical to a published version, that version is returned and nothing is activated.
+        A new version is not activated while a rollback is pinned, unless override_pin is set.
+
+        Returns:
+            str: The published (or existing) version.
+        """
+        try:
+            unknown = set(files) - set(VERSION_FILES)
+            if unknown or "model" not in files or "preprocessor" not in files:
+                raise ValueError(f"A version needs a preprocessor and a model, and only {list(VERSION_FILES)}")
+            hashes = {name: hash_file(file_path) for name, file_path in files.items()}
+
+            for existing in self.versions():
+                if existing["hashes"] == hashes:
+                    logging.info(f"Registry already holds these files as {existing['version']}")
+                    return existing["version"]
+
+            version = self._copy_version(files, hashes, metadata or {})
+            logging.info(f"Published model version {version}")
+            if activate:
+                if self.pinned() and not override_pin:
+                    logging.info(f"Not activating {version}: {self.current()} is pinned by a rollback")
+                else:
+                    self.activate(version)
+            return version
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def pinned(self):
+        """
+        Return True if the active version was set by a rollback and is kept until an explicit activation.
+        """
+        return bool(self._read_pointer().get("pinned", False))
+
+    def _copy_version(self, files, hashes, metadata):
+        os.makedirs(self.versions_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=self.versions_dir, prefix='.tmp-')
+        try:
+            for name, file_path in files.items():
+                destination = os.path.join(tmp_dir, VERSION_FILES[name])
+                shutil.copyfile(file_path, destination)
+                with open(destination, 'rb') as file_obj:
+                    os.fsync(file_obj.fileno())
+            # Versions are numbered in publish order; a concurrent publisher taking the same number retries.
+            while True:
+                numbers = [int(name[1:]) for name in os.listdir(self.versions_dir) if name.startswith('v')]
+                version = f"v{max(numbers, default=0) + 1:04d}"
+                with open(os.path.join(tmp_dir, 'metadata.json'), 'w') as file_obj:
+                    json.dump({"version": version, "created": time.time(), "hashes": hashes, **metadata}, file_obj)
+                    file_obj.flush()
+                    os.fsync(file_obj.fileno())
+                fsync_dir(tmp_dir)
+                try:
+                    os.rename(tmp_dir, self.version_dir(version))
+                    break
+                except OSError:
+                    if not os.path.exists(self.version_dir(version)):
+                        raise
+            fsync_dir(self.versions_dir)
+            return version
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    def activate(self, version):
+        """
+        Make a published version the active one, remembering the previous one for rollback. This also
+        releases a version pinned by rollback.
+        """
+        try:
+            if not os.path.isdir(self.version_dir(version)):
+                raise ValueError(f"Unknown model version {version}")
+            pointer = self._read_pointer()
+            if pointer["version"] is not None and pointer["version"] != version:
+                pointer["history"].append(pointer["version"])
+            pointer["version"] = version
+            pointer["activated"] = time.time()
+            pointer["pinned"] = False
+            self._write_pointer(pointer)
+            logging.info(f"Activated model version {version}")
+            return version
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def rollback(self):
+        """
+        Reactivate the version that was active before the current one and pin it, so that versions published
+        afterwards are not activated until an operator activates one (see activate).
+
+        Returns:
+            str: The version that is active after the rollback.
+        """
+        try:
+            pointer = self._read_pointer()
+            if not pointer["history"]:
+                raise ValueError("There is no earlier model version to roll back to")
+            rolled_back = pointer["version"]
+            pointer["version"] = pointer["history"].pop()
+            pointer["activated"] = time.time()
+            pointer["pinned"] = True
+            self._write_pointer(pointer)
+            logging.info(f"Rolled back model version {rolled_back} to {pointer['version']}")
+            return pointer["version"]
+
+        except Exception as e:
+            raise CustomException(e, sys)
@@ -0,0 +1,203 @@
+import os
+import sys
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.exception import CustomException
+from src.logger import logging
+from src.pipelines.prediction_pipeline import PredictionPipeline, PredictionPipelineConfig
+
+
+@dataclass
+class BulkScoringConfig:
+    """
+    Configuration class for bulk scoring of CSV/JSONL files.
+
+    Attributes:
+        chunk_size (int): Number of rows read, scored and written at a time.
+        workers (int): Number of scoring processes. 1 scores in the current process.
+        max_chunks_in_flight (int): Chunks queued per worker; bounds memory together with chunk_size.
+    """
+    chunk_size: int = 50_000
+    workers: int = os.cpu_count() or 1
+    max_chunks_in_flight: int = 2
+
+
+# Each worker process loads the preprocessor and model once, in the pool initializer.
+_worker_pipeline = None
+
+
+def _init_worker(pipeline_config):
+    global _worker_pipeline
+    _worker_pipeline = PredictionPipeline(config=pipeline_config)
+
+
+def read_chunks(input_path, chunk_size, input_format=None):
+    """
+    Stream an input file in fixed-size chunks.
+
+    CSV files (same schema as data/loan_dataset.csv) are yielded as DataFrames. JSONL files, one
+    application per line, are yielded as lists of raw lines that the workers parse.
+    """
+    input_format = input_format or _detect_format(input_path)
+    if input_format == "csv":
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+        return
+
+    lines = []
+    with open(input_path, "r") as file_obj:
+        for line in file_obj:
+            if line.strip():
+                lines.append(line)
+            if len(lines) >= chunk_size:
+                yield lines
+                lines = []
+    if lines:
+        yield lines
+
+
+def score_chunk(chunk, start_row, pipeline=None):
+    """
+    Score one chunk and return a DataFrame with a row number, Loan_ID (when present), decision and probability.
+    Rows with invalid values get an error message instead of a decision.
+    """
+    pipeline = pipeline or _worker_pipeline
+    if isinstance(chunk, pd.DataFrame):
+        records = chunk
+        loan_ids = chunk["Loan_ID"].to_numpy(dtype=object) if "Loan_ID" in chunk else None
+    else:
+        rows = [json.loads(line) for line in chunk]
+        records = PredictionPipeline.to_columns(rows)
+        loan_ids = records.get("Loan_ID")
+
+    n_rows = len(chunk)
+    decisions = np.full(n_rows, None, dtype=object)
+    probabilities = np.full(n_rows, np.nan)
+    errors = np.full(n_rows, None, dtype=object)
+
+    row_errors = pipeline.validate(records)
+    if row_errors:
+        for i, messages in row_errors.items():
+            errors[i] = "; ".join(messages)
+        valid = np.array([i not in row_errors for i in range(n_rows)])
+        if isinstance(records, pd.DataFrame):
+            records = records[valid]
+        else:
+            records = {column: np.asarray(values, dtype=object)[valid] for column, values in records.items()}
+    else:
+        valid = np.ones(n_rows, dtype=bool)
+
+    if valid.any():
+        labels, probs = pipeline.predict_with_proba(records)
+        decisions[valid] = np.where(np.asarray(labels) == 1, "Approved", "Rejected")
+        if probs is not None:
+            probabilities[valid] = probs
+
+    result = pd.DataFrame({"row": np.arange(start_row, start_row + n_rows)})
+    if loan_ids is not None:
+        result["Loan_ID"] = loan_ids
+    result["decision"] = decisions
+    result["probability"] = probabilities
+    result["error"] = errors
+    return result
+
+
+def _detect_format(path):
+    return "jsonl" if os.path.splitext(path)[1].lower() in (".jsonl", ".json", ".ndjson") else "csv"
+
+
+def format_chunk(result, output_format, header):
+    """
+    Render a scored chunk as CSV or JSON-lines text, so that formatting also runs in the workers.
+    """
+    if output_format == "csv":
+        return result.to_csv(header=header, index=False)
+    text = result.to_json(orient="records", lines=True)
+    return text if text.endswith("\n") or not text else text + "\n"
+
+
+def _score_and_format(chunk, start_row, output_format, header, pipeline=None):
+    result = score_chunk(chunk, start_row, pipeline)
+    return format_chunk(result, output_format, header), len(result), int(result["error"].notna().sum())
+
+
+def score_file(input_path, output_path, config=None, pipeline_config=None, input_format=None):
+    """
+    Score a CSV or JSONL file chunk by chunk and write the results incrementally.
+
+    Chunks are scored in parallel by a process pool whose workers each load the model once. At most
+    workers * max_chunks_in_flight chunks are held at a time and results are written in input order,
+    so memory stays bounded regardless of the input size.
+
+    Args:
+        input_path (str): CSV (data/loan_dataset.csv schema) or JSONL file of applications.
+        output_path (str): Destination file; .jsonl/.json writes JSON lines, anything else CSV.
+        config (BulkScoringConfig): Chunking and parallelism settings.
+        pipeline_config (PredictionPipelineConfig): Paths of the preprocessor and model.
+        input_format (str): "csv" or "jsonl"; detected from the file extension when omitted.
+
+    Returns:
+        dict: Number of rows scored, rows with errors, elapsed seconds and rows per second.
+
+    Example:
+        score_file('data/loan_dataset.csv', 'artifacts/scores.csv', BulkScoringConfig(workers=4))
+    """
+    try:
+        config = config or BulkScoringConfig()
+        pipeline_config = pipeline_config or PredictionPipelineConfig()
+        output_format = _detect_format(output_path)
+        dir_path = os.path.dirname(output_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+        logging.info(f"Bulk scoring {input_path} -> {output_path} with {config.workers} workers")
+        started = time.perf_counter()
+        totals = {"rows": 0, "errors": 0}
+
+        chunks = read_chunks(input_path, config.chunk_size, input_format)
+        start_row = 0
+        with open(output_path, "w") as output_file:
+
+            def write(scored):
+                text, n_rows, n_errors = scored
+                output_file.write(text)
+                totals["rows"] += n_rows
+                totals["errors"] += n_errors
+
+            if config.workers <= 1:
+                pipeline = PredictionPipeline(config=pipeline_config)
+                for chunk in chunks:
+                    write(_score_and_format(chunk, start_row, output_format, start_row == 0, pipeline))
+                    start_row += len(chunk)
+            else:
+                max_in_flight = config.workers * config.max_chunks_in_flight
+                with ProcessPoolExecutor(max_workers=config.workers, initializer=_init_worker,
+                                         initargs=(pipeline_config,)) as executor:
+                    pending = deque()
+                    for chunk in chunks:
+                        pending.append(executor.submit(_score_and_format, chunk, start_row, output_format, start_row == 0))
+                        start_row += len(chunk)
+                        # Write the oldest chunk before reading more, keeping results in input order.
+                        if len(pending) >= max_in_flight:
+                            write(pending.popleft().result())
+                    while pending:
+                        write(pending.popleft().result())
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "rows": totals["rows"],
+            "errors": totals["errors"],
+            "seconds": elapsed,
+            "rows_per_second": totals["rows"] / elapsed if elapsed > 0 else 0.0,
+        }
+        logging.info(f"Bulk scoring finished: {summary}")
+        return summary
+
+    except Exception as e:
+        raise CustomException(e, sys)
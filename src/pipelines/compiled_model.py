@@ -0,0 +1,395 @@
+import os
+import sys
+import json
+import tempfile
+
+import numpy as np
+
+from src.cache import hash_file
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import atomic_write
+
+
+class _TreeArrays:
+    """
+    Accumulates trees into the flat node arrays of a CompiledTreeModel.
+    Leaves point to themselves, so that evaluating a fixed number of levels is safe for every tree.
+    """
+    def __init__(self):
+        self.feature, self.threshold, self.left, self.right, self.missing_left, self.value = [], [], [], [], [], []
+        self.roots = []
+        self.max_depth = 0
+
+    def add(self, feature, threshold, left, right, missing_left, value, depth):
+        """
+        Add one tree given as node arrays with tree-local child indices (-1 for leaves).
+        """
+        offset = sum(len(block) for block in self.feature)
+        is_leaf = np.asarray(left) < 0
+        local = np.arange(len(feature))
+        self.feature.append(np.where(is_leaf, 0, feature).astype(np.int32))
+        self.threshold.append(np.where(is_leaf, 0.0, threshold).astype(np.float64))
+        self.left.append((np.where(is_leaf, local, left) + offset).astype(np.int32))
+        self.right.append((np.where(is_leaf, local, right) + offset).astype(np.int32))
+        self.missing_left.append(np.asarray(missing_left, dtype=bool))
+        self.value.append(np.asarray(value).reshape(len(feature), -1))
+        self.roots.append(offset)
+        self.max_depth = max(self.max_depth, depth)
+
+    def arrays(self, value_dtype=np.float64):
+        return {
+            "feature": np.concatenate(self.feature),
+            "threshold": np.concatenate(self.threshold),
+            "left": np.concatenate(self.left),
+            "right": np.concatenate(self.right),
+            "missing_left": np.concatenate(self.missing_left),
+            "value": np.concatenate(self.value).astype(value_dtype),
+            "roots": np.asarray(self.roots, dtype=np.int32),
+            "max_depth": np.int64(self.max_depth),
+        }
+
+
+def _softmax(X):
+    """
+    Row-wise softmax with the exact steps of sklearn.utils.extmath.softmax, without importing scikit-learn.
+    """
+    X = X - np.max(X, axis=1).reshape((-1, 1))
+    np.exp(X, out=X)
+    X /= np.sum(X, axis=1).reshape((-1, 1))
+    return X
+
+
+def _add_sklearn_tree(trees, tree, value):
+    missing_left = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+    trees.add(tree.feature, tree.threshold, tree.children_left, tree.children_right, missing_left, value,
+              tree.max_depth)
+
+
+def _normalized_tree_value(tree, n_classes):
+    """
+    Leaf class probabilities, normalized the way DecisionTreeClassifier.predict_proba does.
+    """
+    proba = tree.value[:, 0, :n_classes].copy()
+    normalizer = proba.sum(axis=1)[:, np.newaxis]
+    normalizer[normalizer == 0.0] = 1.0
+    proba /= normalizer
+    return proba
+
+
+def _compile_forest(model):
+    estimators = getattr(model, "estimators_", [model])
+    trees = _TreeArrays()
+    for estimator in estimators:
+        _add_sklearn_tree(trees, estimator.tree_, _normalized_tree_value(estimator.tree_, model.n_classes_))
+    return {"kind": "forest", **trees.arrays()}
+
+
+def _compile_adaboost(model):
+    trees = _TreeArrays()
+    for estimator in model.estimators_:
+        if not hasattr(estimator, "tree_"):
+            raise ValueError(f"AdaBoost over {type(estimator).__name__} cannot be compiled")
+        # Each tree votes for the class of its leaf, like estimator.predict.
+        votes = np.eye(model.n_classes_)[np.argmax(estimator.tree_.value[:, 0, :], axis=1)]
+        _add_sklearn_tree(trees, estimator.tree_, votes)
+    weights = np.asarray(model.estimator_weights_[:len(model.estimators_)], dtype=np.float64)
+    return {"kind": "adaboost", **trees.arrays(), "weights": weights,
+            "weight_sum": np.float64(model.estimator_weights_.sum())}
+
+
+def _compile_gradient_boosting(model):
+    if model.n_classes_ != 2 or model.loss != "log_loss":
+        raise ValueError("Only binary GradientBoostingClassifier with log_loss can be compiled")
+    trees = _TreeArrays()
+    for estimator in model.estimators_[:, 0]:
+        # predict_stages adds learning_rate * leaf value, so the product is stored directly.
+        _add_sklearn_tree(trees, estimator.tree_, model.learning_rate * estimator.tree_.value[:, 0, 0])
+    # The initial raw prediction is only exposed through a private method; without it (or with another
+    # signature) the model is not compiled and is served from the pickle instead.
+    try:
+        base = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0]
+    except (AttributeError, TypeError) as e:
+        raise ValueError(f"GradientBoostingClassifier cannot be compiled with this scikit-learn version: {e}")
+    return {"kind": "gradient_boosting", **trees.arrays(), "base": np.float64(base)}
+
+
+def _compile_xgboost(model):
+    booster = model.get_booster()
+    config = json.loads(booster.save_raw(raw_format="json"))["learner"]
+    if config["objective"]["name"] != "binary:logistic" or config["gradient_booster"]["name"] != "gbtree":
+        raise ValueError("Only binary:logistic gbtree XGBoost models can be compiled")
+    trees = _TreeArrays()
+    for tree in config["gradient_booster"]["model"]["trees"]:
+        left = np.asarray(tree["left_children"])
+        # Leaf values are stored in split_conditions; depth is found by walking the parents.
+        parents = np.asarray(tree["parents"])
+        depth = np.zeros(len(left), dtype=np.int64)
+        for node in range(1, len(left)):
+            depth[node] = depth[parents[node]] + 1
+        conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+        trees.add(tree["split_indices"], conditions.astype(np.float64), left, tree["right_children"],
+                  tree["default_left"], conditions, int(depth.max()))
+    # base_score is the prior probability, written as "5E-1" or "[5E-1]" depending on the version.
+    base_score = np.float32(float(config["learner_model_param"]["base_score"].strip("[]")))
+    # XGBoost converts it to a margin with a correctly rounded float32 log, which float64 rounding reproduces.
+    base = np.float32(-np.log(np.float64(np.float32(1.0) / base_score - np.float32(1.0))))
+    return {"kind": "xgboost", **trees.arrays(np.float32), "base": base, "strict": np.bool_(True)}
+
+
+def _compile_catboost(model):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = os.path.join(tmp_dir, "model.json")
+        model.save_model(model_path, format="json")
+        with open(model_path, "r") as file_obj:
+            dump = json.load(file_obj)
+    if dump["features_info"].get("categorical_features") or len(model.classes_) != 2:
+        raise ValueError("Only binary CatBoost models over float features can be compiled")
+    nan_min = {feature["feature_index"]: feature.get("nan_value_treatment", "AsIs") != "AsFalse"
+               for feature in dump["features_info"]["float_features"]}
+    trees = _TreeArrays()
+    for tree in dump["oblivious_trees"]:
+        splits = tree["splits"]
+        depth = len(splits)
+        # Expand the oblivious tree into a complete binary tree in heap order. The leaf index of CatBoost
+        # has the first split as its lowest bit, and a value above the border sets the bit.
+        n_internal = 2 ** depth - 1
+        nodes = np.arange(n_internal)
+        level = np.floor(np.log2(nodes + 1)).astype(np.int64) if depth else nodes
+        feature = np.array([splits[l]["float_feature_index"] for l in level] + [0] * (2 ** depth), dtype=np.int64)
+        threshold = np.array([splits[l]["border"] for l in level] + [0.0] * (2 ** depth))
+        left = np.concatenate([2 * nodes + 1, -np.ones(2 ** depth, dtype=np.int64)])
+        right = np.concatenate([2 * nodes + 2, -np.ones(2 ** depth, dtype=np.int64)])
+        missing_left = np.array([nan_min.get(splits[l]["float_feature_index"], True) for l in level]
+                                + [True] * (2 ** depth), dtype=bool)
+        paths = np.arange(2 ** depth)
+        # Heap leaf i is reached with the level bits of i from the most significant one down.
+        leaf_index = np.zeros(2 ** depth, dtype=np.int64)
+        for l in range(depth):
+            leaf_index |= ((paths >> (depth - 1 - l)) & 1) << l
+        value = np.concatenate([np.zeros(n_internal), np.asarray(tree["leaf_values"])[leaf_index]])
+        trees.add(feature, threshold, left, right, missing_left, value, depth)
+    scale, bias = dump["scale_and_bias"]
+    return {"kind": "catboost", **trees.arrays(), "scale": np.float64(scale), "base": np.float64(bias[0])}
+
+
+def _compile_linear(model):
+    if len(model.classes_) != 2:
+        raise ValueError("Only binary LogisticRegression can be compiled")
+    return {"kind": "linear", "coef": np.asarray(model.coef_, dtype=np.float64),
+            "intercept": np.asarray(model.intercept_, dtype=np.float64)}
+
+
+_COMPILERS = {
+    "DecisionTreeClassifier": _compile_forest,
+    "ExtraTreeClassifier": _compile_forest,
+    "RandomForestClassifier": _compile_forest,
+    "ExtraTreesClassifier": _compile_forest,
+    "AdaBoostClassifier": _compile_adaboost,
+    "GradientBoostingClassifier": _compile_gradient_boosting,
+    "XGBClassifier": _compile_xgboost,
+    "CatBoostClassifier": _compile_catboost,
+    "LogisticRegression": _compile_linear,
+}
+
+
+class CompiledModel:
+    """
+    Base class of the compiled models: a dict of NumPy arrays that is saved to and loaded from an .npz file.
+    Only NumPy is imported to load and evaluate one; SciPy is imported on first use by the kinds that need it.
+    """
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.kind = str(arrays["kind"])
+        self.classes_ = arrays["classes"]
+        self.n_features_in_ = int(arrays["n_features"])
+
+    @staticmethod
+    def from_arrays(arrays):
+        return (CompiledLinearModel if str(arrays["kind"]) == "linear" else CompiledTreeModel)(arrays)
+
+    @classmethod
+    def load(cls, file_path):
+        try:
+            with np.load(file_path, allow_pickle=False) as data:
+                return CompiledModel.from_arrays({name: data[name] for name in data.files})
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def save(self, file_path):
+        try:
+            with atomic_write(file_path) as file_obj:
+                np.savez(file_obj, **self.arrays)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+
+class CompiledLinearModel(CompiledModel):
+    """
+    Binary LogisticRegression reduced to its coefficients, evaluated with the same arithmetic as scikit-learn.
+    """
+    def decision_function(self, X):
+        return (np.asarray(X, dtype=np.float64) @ self.arrays["coef"].T + self.arrays["intercept"]).reshape(-1)
+
+    def predict_proba(self, X):
+        from scipy.special import expit
+        positive = expit(self.decision_function(X))
+        return np.stack([1 - positive, positive], axis=1)
+
+    def predict(self, X):
+        return self.classes_.take((self.decision_function(X) > 0).astype(int), axis=0)
+
+
+class CompiledTreeModel(CompiledModel):
+    """
+    Array-backed tree ensemble that reproduces the predictions of a fitted RandomForest, DecisionTree,
+    AdaBoost (over trees), GradientBoosting, XGBoost or CatBoost classifier without its library.
+
+    All trees are stored in flat node arrays (feature, threshold, left/right child, missing direction and
+    leaf values). A batch is evaluated level by level for every row and tree at once, and the leaf values
+    are combined in tree order with the same arithmetic as the original library, so that labels and
+    probabilities are identical. It exposes predict, predict_proba and classes_ like the original model.
+
+    Example:
+    compiled = compile_model(load_object('artifacts/model.pkl'))
+    compiled.save('artifacts/model_compiled.npz')
+    labels = CompiledModel.load('artifacts/model_compiled.npz').predict(features)
+    """
+    def __init__(self, arrays):
+        super().__init__(arrays)
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.missing_left = arrays["missing_left"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.strict = bool(arrays.get("strict", False))
+
+    def leaves(self, X):
+        """
+        Return the leaf node reached by every row in every tree, as an (n_rows, n_trees) index array.
+        """
+        # All supported libraries compare float32 feature values against the thresholds.
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        flat = X.ravel()
+        has_missing = np.isnan(flat).any()
+        row_offsets = (np.arange(X.shape[0]) * X.shape[1])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.max_depth):
+            values = flat[row_offsets + self.feature[nodes]]
+            thresholds = self.threshold[nodes]
+            go_left = values < thresholds if self.strict else values <= thresholds
+            if has_missing:
+                go_left = np.where(np.isnan(values), self.missing_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def _accumulate(self, leaf_values, base=None):
+        """
+        Sum leaf values over trees sequentially in tree order (np.cumsum), optionally starting from a base value.
+        """
+        if base is not None:
+            leaf_values = np.concatenate([np.full(leaf_values.shape[:1] + (1,) + leaf_values.shape[2:], base,
+                                                  dtype=leaf_values.dtype), leaf_values], axis=1)
+        return np.cumsum(leaf_values, axis=1, dtype=leaf_values.dtype)[:, -1]
+
+    def decision_function(self, X):
+        """
+        Return the raw score of the ensemble: mean class probabilities for forests, the AdaBoost decision
+        function, or the log-odds margin for gradient boosting.
+        """
+        leaf_values = self.value[self.leaves(X)]
+        if self.kind == "forest":
+            return self._accumulate(leaf_values) / len(self.roots)
+        if self.kind == "adaboost":
+            weights = self.arrays["weights"][np.newaxis, :, np.newaxis]
+            n_classes = len(self.classes_)
+            votes = np.where(leaf_values == 1.0, weights, -1 / (n_classes - 1) * weights)
+            pred = self._accumulate(votes) / self.arrays["weight_sum"]
+            if n_classes == 2:
+                pred[:, 0] *= -1
+                return pred.sum(axis=1)
+            return pred
+        if self.kind == "catboost":
+            return self.arrays["scale"] * self._accumulate(leaf_values[:, :, 0]) + self.arrays["base"]
+        return self._accumulate(leaf_values[:, :, 0], self.arrays["base"])
+
+    def predict_proba(self, X):
+        decision = self.decision_function(X)
+        if self.kind == "forest":
+            return decision
+        if self.kind == "adaboost":
+            if len(self.classes_) == 2:
+                decision = np.vstack([-decision, decision]).T / 2
+            else:
+                decision = decision / (len(self.classes_) - 1)
+            return _softmax(decision)
+        # For XGBoost the margin is float32 and so is expit, which matches its sigmoid.
+        from scipy.special import expit
+        positive = expit(decision)
+        return np.stack([1 - positive, positive], axis=1)
+
+    def predict(self, X):
+        decision = self.decision_function(X)
+        if self.kind == "forest" or (self.kind == "adaboost" and len(self.classes_) > 2):
+            return self.classes_.take(np.argmax(decision, axis=1), axis=0)
+        if self.kind == "xgboost":
+            return self.classes_.take((self.predict_proba(X)[:, 1] > 0.5).astype(int), axis=0)
+        if self.kind == "gradient_boosting":
+            return self.classes_.take((decision >= 0).astype(int), axis=0)
+        return self.classes_.take((decision > 0).astype(int), axis=0)
+
+
+def compile_model(model):
+    """
+    Compile a fitted tree-ensemble classifier (or binary LogisticRegression) into a CompiledModel.
+
+    Raises:
+        ValueError: If the model type or configuration is not supported.
+    """
+    compiler = _COMPILERS.get(type(model).__name__)
+    if compiler is None:
+        raise ValueError(f"{type(model).__name__} cannot be compiled")
+    arrays = compiler(model)
+    arrays["classes"] = np.asarray(model.classes_)
+    arrays["n_features"] = np.int64(model.n_features_in_)
+    arrays["kind"] = np.str_(arrays["kind"])
+    if "roots" in arrays:
+        logging.info(f"Compiled {type(model).__name__} into {len(arrays['roots'])} trees "
+                     f"and {len(arrays['feature'])} nodes")
+    return CompiledModel.from_arrays(arrays)
+
+
+def export_compiled_model(model, model_file_path, compiled_file_path):
+    """
+    Compile the model saved at model_file_path and save it next to it, tagged with the pickle's hash so that
+    a compiled file that no longer matches the pickle is never served.
+
+    Returns:
+        bool: True if the model was compiled, False if its type is not supported (any stale file is removed).
+    """
+    try:
+        compiled = compile_model(model)
+    except ValueError as e:
+        logging.info(f"Model not compiled: {e}")
+        if os.path.exists(compiled_file_path):
+            os.remove(compiled_file_path)
+        return False
+    compiled.arrays["model_sha256"] = np.str_(hash_file(model_file_path))
+    compiled.save(compiled_file_path)
+    return True
+
+
+def load_compiled_model(compiled_file_path, model_file_path):
+    """
+    Load the compiled form of the model at model_file_path, or return None if there is none or it is stale.
+    """
+    if not compiled_file_path or not os.path.exists(compiled_file_path):
+        return None
+    compiled = CompiledModel.load(compiled_file_path)
+    if str(compiled.arrays.get("model_sha256", "")) != hash_file(model_file_path):
+        logging.info(f"Ignoring {compiled_file_path}: it was compiled from a different {model_file_path}")
+        return None
+    return compiled
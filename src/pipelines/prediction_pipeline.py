@@ -0,0 +1,460 @@
+import os
+import sys
+import json
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.cache import hash_file
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import load_object, atomic_write
+from src.pipelines.compiled_model import CompiledModel, compile_model, load_compiled_model
+
+
+# Map the snake_case request fields (see api/schemas.py) onto the training column names.
+FIELD_MAP = {
+    "gender": "Gender",
+    "married": "Married",
+    "dependents": "Dependents",
+    "education": "Education",
+    "self_employed": "Self_Employed",
+    "applicant_income": "ApplicantIncome",
+    "coapplicant_income": "CoapplicantIncome",
+    "loan_amount": "LoanAmount",
+    "loan_amount_term": "Loan_Amount_Term",
+    "credit_history": "Credit_History",
+    "property_area": "Property_Area",
+}
+
+# Request values that are spelled differently from the values seen in data/loan_dataset.csv.
+VALUE_ALIASES = {
+    "Married": {"Married": "Yes", "Unmarried": "No", "Single": "No"},
+    "Credit_History": {"Yes": 1.0, "No": 0.0, "Y": 1.0, "N": 0.0},
+}
+
+
+@dataclass
+class PredictionPipelineConfig:
+    """
+    Configuration class for the PredictionPipeline, specifying the paths of the fitted artifacts.
+    The compiled tree ensemble exported by ModelTrainer is used instead of the pickled model when
+    use_compiled_model is set and it was compiled from the current model file.
+
+    The serving artifact holds the preprocessor lookup tables and the compiled model in one .npz file that
+    loads with NumPy alone, so that neither scikit-learn nor the model libraries are imported. It is used
+    when use_serving_artifact is set and it was exported from the current preprocessor and model files.
+    """
+    preprocessor_file_path: str = os.path.join('artifacts', 'preprocessor.pkl')
+    model_file_path: str = os.path.join('artifacts', 'model.pkl')
+    compiled_model_file_path: str = os.path.join('artifacts', 'model_compiled.npz')
+    use_compiled_model: bool = True
+    serving_artifact_file_path: str = os.path.join('artifacts', 'serving_model.npz')
+    use_serving_artifact: bool = True
+
+
+def _category_key(value):
+    """
+    Normalize a raw categorical value into the string key used by the lookup tables.
+    Returns None for missing values so that they pick up the imputed category.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value if value != "" else None
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+
+def _to_float(value, aliases):
+    """
+    Convert a single raw numerical value to float, applying any value aliases. Missing values become NaN.
+    """
+    if value is None or value == "":
+        return np.nan
+    if aliases and value in aliases:
+        return aliases[value]
+    return float(value)
+
+
+class PredictionPipeline:
+    """
+    Class responsible for scoring loan applications with the fitted preprocessor and model.
+
+    The preprocessor and model are loaded once. The fitted ColumnTransformer is compiled into
+    plain NumPy lookup tables (imputation values, scaling statistics and category -> column indices),
+    so that N applications are turned into the model's feature matrix in one vectorized pass
+    without building a DataFrame or going through sklearn's per-call validation.
+
+    Example:
+    pipeline = PredictionPipeline()
+    labels, probabilities = pipeline.predict_with_proba([request.dict()])
+    """
+    def __init__(self, preprocessor=None, model=None, config=None):
+        try:
+            self.prediction_pipeline_config = config or PredictionPipelineConfig()
+
+            # Prefer the slim serving artifact, which needs no unpickling and no heavy imports.
+            if preprocessor is None and model is None and self.prediction_pipeline_config.use_serving_artifact:
+                artifact = self._load_serving_artifact()
+                if artifact is not None:
+                    self.preprocessor = None
+                    self.model = artifact
+                    logging.info(f"Prediction pipeline ready with {self.n_features} features from "
+                                 f"{self.prediction_pipeline_config.serving_artifact_file_path}")
+                    return
+
+            # Load the fitted artifacts once, unless they were handed in directly.
+            if preprocessor is None:
+                preprocessor = load_object(self.prediction_pipeline_config.preprocessor_file_path)
+            if model is None and self.prediction_pipeline_config.use_compiled_model:
+                model = load_compiled_model(self.prediction_pipeline_config.compiled_model_file_path,
+                                            self.prediction_pipeline_config.model_file_path)
+            if model is None:
+                model = load_object(self.prediction_pipeline_config.model_file_path)
+
+            self.preprocessor = preprocessor
+            self.model = model
+            self._compile_preprocessor()
+            logging.info(f"Prediction pipeline ready with {self.n_features} features (compiled={self.compiled}, "
+                         f"model={type(self.model).__name__})")
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _compile_preprocessor(self):
+        """
+        Turn the fitted ColumnTransformer from DataTransformation.get_data_transformer_object into lookup tables.
+        Preprocessors of any other shape are kept as-is and applied through their own transform method.
+        """
+        self.compiled = False
+        self.numerical_columns = []
+        self.categorical_columns = []
+        self.input_columns = []
+
+        transformers = getattr(self.preprocessor, "transformers_", None)
+        if transformers is None or getattr(self.preprocessor, "remainder", "drop") != "drop":
+            self.input_columns = list(getattr(self.preprocessor, "feature_names_in_", FIELD_MAP.values()))
+            self.n_features = len(self.preprocessor.get_feature_names_out())
+            return
+
+        numerical_blocks = []
+        categorical_blocks = []
+        offset = 0
+        for name, transformer, columns in transformers:
+            if transformer == "drop" or name == "remainder":
+                continue
+            steps = dict(transformer.steps) if hasattr(transformer, "steps") else {}
+            imputer = steps.get("imputer")
+            scaler = steps.get("scalar")
+            encoder = steps.get("onehot")
+
+            if imputer is not None and scaler is not None and len(steps) == 2:
+                mean = scaler.mean_ if scaler.with_mean else np.zeros(len(columns))
+                scale = scaler.scale_ if scaler.with_std else np.ones(len(columns))
+                numerical_blocks.append((list(columns), imputer.statistics_.astype(float), mean, scale, offset))
+                offset += len(columns)
+            elif imputer is not None and encoder is not None and len(steps) == 2 \
+                    and getattr(encoder, "drop_idx_", None) is None \
+                    and encoder.get_params().get("min_frequency") is None \
+                    and encoder.get_params().get("max_categories") is None:
+                for column, fill_value, categories in zip(columns, imputer.statistics_, encoder.categories_):
+                    lookup = {_category_key(category): offset + i for i, category in enumerate(categories)}
+                    # Missing values are imputed with the most frequent category before encoding.
+                    lookup[None] = lookup.get(_category_key(fill_value), -1)
+                    categorical_blocks.append((column, lookup))
+                    offset += len(categories)
+            else:
+                self.input_columns = list(self.preprocessor.feature_names_in_)
+                self.n_features = len(self.preprocessor.get_feature_names_out())
+                return
+
+        self.numerical_columns = [column for block in numerical_blocks for column in block[0]]
+        self.categorical_columns = [column for column, _ in categorical_blocks]
+        self.input_columns = self.numerical_columns + self.categorical_columns
+        self._numerical_blocks = numerical_blocks
+        self._categorical_blocks = categorical_blocks
+        self.n_features = offset
+        self.compiled = True
+
+    def _artifact_sources(self):
+        """
+        Fingerprint of the pickles a serving artifact is exported from, used to detect stale artifacts.
+        """
+        return {
+            "preprocessor": hash_file(self.prediction_pipeline_config.preprocessor_file_path),
+            "model": hash_file(self.prediction_pipeline_config.model_file_path),
+        }
+
+    def export_serving_artifact(self):
+        """
+        Save the preprocessor lookup tables and the compiled model to serving_artifact_file_path.
+
+        Returns:
+            bool: False (and no file) when the preprocessor or the model cannot be compiled.
+        """
+        try:
+            artifact_path = self.prediction_pipeline_config.serving_artifact_file_path
+            if os.path.exists(artifact_path):
+                os.remove(artifact_path)
+            if not self.compiled:
+                logging.info("No serving artifact: the preprocessor could not be compiled")
+                return False
+            try:
+                compiled_model = self.model if isinstance(self.model, CompiledModel) else compile_model(self.model)
+            except ValueError as e:
+                logging.info(f"No serving artifact: {e}")
+                return False
+
+            # Missing values are keyed by None, which JSON objects cannot hold, so lookups are stored as pairs.
+            tables = {
+                "numerical_blocks": [
+                    [columns, fill_values.tolist(), np.asarray(mean).tolist(), np.asarray(scale).tolist(), offset]
+                    for columns, fill_values, mean, scale, offset in self._numerical_blocks
+                ],
+                "categorical_blocks": [[column, list(lookup.items())] for column, lookup in self._categorical_blocks],
+                "n_features": self.n_features,
+                "sources": self._artifact_sources(),
+            }
+            with atomic_write(artifact_path) as file_obj:
+                np.savez(file_obj, **compiled_model.arrays, serving_tables=np.str_(json.dumps(tables)))
+            logging.info(f"Exported the serving artifact to {artifact_path}")
+            return True
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def _load_serving_artifact(self):
+        """
+        Load the lookup tables and compiled model of the serving artifact, or return None if it is missing
+        or was exported from other preprocessor or model files.
+        """
+        artifact_path = self.prediction_pipeline_config.serving_artifact_file_path
+        if not os.path.exists(artifact_path):
+            return None
+        with np.load(artifact_path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        tables = json.loads(str(arrays.pop("serving_tables")))
+        if tables["sources"] != self._artifact_sources():
+            logging.info(f"Ignoring {artifact_path}: it was exported from other preprocessor or model files")
+            return None
+
+        self._numerical_blocks = [
+            (columns, np.array(fill_values, dtype=np.float64), np.array(mean, dtype=np.float64),
+             np.array(scale, dtype=np.float64), offset)
+            for columns, fill_values, mean, scale, offset in tables["numerical_blocks"]
+        ]
+        self._categorical_blocks = [(column, dict((key, index) for key, index in pairs))
+                                    for column, pairs in tables["categorical_blocks"]]
+        self.numerical_columns = [column for block in self._numerical_blocks for column in block[0]]
+        self.categorical_columns = [column for column, _ in self._categorical_blocks]
+        self.input_columns = self.numerical_columns + self.categorical_columns
+        self.n_features = tables["n_features"]
+        self.compiled = True
+        return CompiledModel.from_arrays(arrays)
+
+    @staticmethod
+    def to_columns(records):
+        """
+        Convert applications into a dict of columns keyed by the training column names.
+
+        Args:
+            records: A list of dicts (snake_case request fields or training column names),
+                a single dict, a dict of columns, or a pandas DataFrame.
+
+        Returns:
+            dict: Column name -> list/array of raw values.
+        """
+        # pandas is only imported by callers that pass pandas objects, so it is not loaded for serving.
+        pd = sys.modules.get("pandas")
+        if pd is not None and isinstance(records, pd.DataFrame):
+            return {FIELD_MAP.get(column, column): records[column].to_numpy(dtype=object) for column in records.columns}
+
+        if isinstance(records, dict):
+            first = next(iter(records.values()), None)
+            if isinstance(first, (list, tuple, np.ndarray)) or (pd is not None and isinstance(first, pd.Series)):
+                return {FIELD_MAP.get(column, column): values for column, values in records.items()}
+            records = [records]
+
+        columns = {}
+        for key in records[0].keys() if records else []:
+            columns[FIELD_MAP.get(key, key)] = [record.get(key) for record in records]
+        return columns
+
+    def featurize(self, records):
+        """
+        Build the model's feature matrix for a batch of applications in a single pass.
+
+        Args:
+            records: Applications in any format accepted by to_columns.
+
+        Returns:
+            numpy.ndarray: A float matrix of shape (n_records, n_features).
+
+        Raises:
+            CustomException: If a required field is missing or a value cannot be converted.
+        """
+        try:
+            columns = self.to_columns(records)
+
+            if not self.compiled:
+                return self._transform_with_preprocessor(columns)
+
+            n_rows = len(next(iter(columns.values()))) if columns else 0
+            features = np.zeros((n_rows, self.n_features), dtype=np.float64)
+
+            for block_columns, fill_values, mean, scale, offset in self._numerical_blocks:
+                block = np.empty((n_rows, len(block_columns)), dtype=np.float64)
+                for j, column in enumerate(block_columns):
+                    block[:, j] = self._numerical_column(column, columns[column])
+                # Impute missing values with the training medians, then standardize.
+                block = np.where(np.isnan(block), fill_values, block)
+                features[:, offset:offset + len(block_columns)] = (block - mean) / scale
+
+            rows = np.arange(n_rows)
+            for column, lookup in self._categorical_blocks:
+                aliases = VALUE_ALIASES.get(column, {})
+                values = columns[column]
+                if isinstance(values, np.ndarray) and values.dtype.kind in "US":
+                    # Columnar input: look up each distinct value once instead of every row.
+                    uniques, inverse = np.unique(values, return_inverse=True)
+                    codes = [lookup.get(_category_key(aliases.get(value, value)), -1) for value in uniques.tolist()]
+                    indices = np.asarray(codes, dtype=np.intp)[inverse.reshape(-1)]
+                else:
+                    keys = (_category_key(aliases.get(value, value)) for value in values)
+                    indices = np.fromiter((lookup.get(key, -1) for key in keys), dtype=np.intp, count=n_rows)
+                # Unknown categories are ignored, i.e. encoded as all zeros like OneHotEncoder(handle_unknown='ignore').
+                known = indices >= 0
+                features[rows[known], indices[known]] = 1.0
+
+            return features
+
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    @staticmethod
+    def _numerical_column(column, values):
+        """
+        Convert one column of raw numerical values to a float array, falling back to per-value aliases.
+        """
+        try:
+            return np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            aliases = VALUE_ALIASES.get(column)
+            if isinstance(values, np.ndarray) and values.dtype.kind in "US":
+                # Columnar input: convert each distinct value once instead of every row.
+                uniques, inverse = np.unique(values, return_inverse=True)
+                converted = np.fromiter((_to_float(value, aliases) for value in uniques.tolist()), dtype=np.float64,
+                                        count=len(uniques))
+                return converted[inverse.reshape(-1)]
+            return np.fromiter((_to_float(value, aliases) for value in values), dtype=np.float64, count=len(values))
+
+    def validate(self, records):
+        """
+        Check that every numerical value of a batch can be converted and that every categorical value is
+        one of allowed_categories (missing values are imputed), without failing the whole batch.
+
+        Args:
+            records: Applications in any format accepted by to_columns.
+
+        Returns:
+            dict: Row index -> list of error messages, only for rows that have errors.
+        """
+        columns = self.to_columns(records)
+        n_rows = len(next(iter(columns.values()))) if columns else 0
+        allowed_categories = self.allowed_categories()
+        errors = {}
+        for column in self.input_columns:
+            if column not in columns:
+                for i in range(n_rows):
+                    errors.setdefault(i, []).append(f"{column}: field required")
+                continue
+            if column in allowed_categories:
+                accepted = set(allowed_categories[column])
+                for i, value in enumerate(columns[column]):
+                    key = _category_key(value)
+                    if key is not None and key not in accepted:
+                        errors.setdefault(i, []).append(
+                            f"{column}: {value!r} is not one of {allowed_categories[column]}")
+                continue
+            if column not in self.numerical_columns:
+                continue
+            try:
+                np.asarray(columns[column], dtype=np.float64)
+                continue
+            except (TypeError, ValueError):
+                pass
+            aliases = VALUE_ALIASES.get(column)
+            for i, value in enumerate(columns[column]):
+                try:
+                    _to_float(value, aliases)
+                except (TypeError, ValueError):
+                    errors.setdefault(i, []).append(f"{column}: invalid value {value!r}")
+        return errors
+
+    def allowed_categories(self):
+        """
+        Return {column: sorted accepted values} of the categorical columns: the categories seen in training
+        and their aliases. Empty when the preprocessor could not be compiled.
+        """
+        allowed = {}
+        for column, lookup in (self._categorical_blocks if self.compiled else []):
+            aliases = VALUE_ALIASES.get(column, {})
+            allowed[column] = sorted({key for key in lookup if key is not None}
+                                     | {alias for alias, value in aliases.items() if _category_key(value) in lookup})
+        return allowed
+
+    def _transform_with_preprocessor(self, columns):
+        """
+        Fallback path for preprocessors that could not be compiled into lookup tables.
+        """
+        import pandas as pd
+        frame = pd.DataFrame({column: columns[column] for column in self.input_columns})
+        for column, aliases in VALUE_ALIASES.items():
+            if column in frame:
+                frame[column] = frame[column].replace(aliases)
+        features = self.preprocessor.transform(frame)
+        return features.toarray() if hasattr(features, "toarray") else np.asarray(features)
+
+    def predict(self, records):
+        """
+        Predict the encoded loan status (1 = approved, 0 = rejected) for a batch of applications.
+        """
+        try:
+            features = self.featurize(records)
+            return self.model.predict(features)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict_with_proba(self, records):
+        """
+        Predict labels and approval probabilities for a batch of applications with a single model call.
+
+        Returns:
+            tuple: (labels, probabilities). Probabilities are None when the model has no predict_proba.
+        """
+        try:
+            return self.predict_features(self.featurize(records))
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def predict_features(self, features):
+        """
+        Predict labels and approval probabilities from a feature matrix built by featurize.
+
+        Returns:
+            tuple: (labels, probabilities). Probabilities are None when the model has no predict_proba.
+        """
+        try:
+            if hasattr(self.model, "predict_proba"):
+                probabilities = self.model.predict_proba(features)
+                classes = getattr(self.model, "classes_", np.arange(probabilities.shape[1]))
+                labels = np.asarray(classes)[np.argmax(probabilities, axis=1)]
+                return labels, probabilities[:, 1]
+            return self.model.predict(features), None
+        except Exception as e:
+            raise CustomException(e, sys)
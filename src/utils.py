@@ -1,8 +1,56 @@
 import os
 import sys
 import pickle
+import tempfile
+from contextlib import contextmanager
+import numpy as np
 from src.exception import CustomException
 
+# pandas is imported inside the frame helpers, so that the serving path (load_object) does not load it.
+
+def fsync_dir(dir_path):
+    """
+    Flush a directory entry to disk, so that a rename inside it survives a crash (no-op where unsupported).
+    """
+    try:
+        fd = os.open(dir_path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(file_path, mode='wb'):
+    """
+    Open a temporary file next to file_path for writing; once the block succeeds the file is fsynced and
+    renamed over file_path. Readers see either the old or the new file, never a partially written one.
+
+    Example:
+        with atomic_write('artifacts/model.pkl') as file_obj:
+            pickle.dump(model, file_obj)
+    """
+    dir_path = os.path.dirname(file_path)
+    if dir_path:
+        os.makedirs(dir_path, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path or '.', prefix='.tmp-', suffix=os.path.splitext(file_path)[1])
+    try:
+        with os.fdopen(fd, mode) as file_obj:
+            yield file_obj
+            file_obj.flush()
+            os.fsync(file_obj.fileno())
+        os.replace(tmp_path, file_path)
+        fsync_dir(dir_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 def save_object(file_path, object):
     """
     Save a Python object to a file using pickle.
@@ -18,12 +66,203 @@ def save_object(file_path, object):
         save_object('model.pkl', trained_model)
     """
     try:
-        # Ensure the directory path exists or create it.
+        # Serialize to a temporary file and rename it into place, so that readers never see a partial pickle.
+        with atomic_write(file_path) as file_obj:
+            pickle.dump(object, file_obj)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+def load_object(file_path):
+    """
+    Load a Python object from a pickle file.
+
+    Parameters:
+        file_path (str): The path to the pickle file.
+
+    Returns:
+        The deserialized Python object.
+
+    Raises:
+        CustomException: If an error occurs while loading the object.
+
+    Example:
+        model = load_object('artifacts/model.pkl')
+    """
+    try:
+        with open(file_path, 'rb') as file_obj:
+            return pickle.load(file_obj)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def save_frame(df, file_path):
+    """
+    Save a DataFrame in the format given by the file extension: .feather/.arrow (Arrow IPC),
+    .parquet, or .csv.
+
+    Parameters:
+        df (pandas.DataFrame): The DataFrame to be saved.
+        file_path (str): The destination path.
+
+    Raises:
+        CustomException: If an error occurs while saving the DataFrame.
+
+    Example:
+        save_frame(train_set, 'artifacts/train.feather')
+    """
+    try:
         dir_path = os.path.dirname(file_path)
-        os.makedirs(dir_path, exist_ok=True)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
 
-        # Serialize and save the object to the specified file.
-        with open(file_path, 'wb') as file_obj:
-            pickle.dump(object, file_obj)
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in ('.feather', '.arrow'):
+            # Uncompressed Arrow files can be memory-mapped when they are read back.
+            df.reset_index(drop=True).to_feather(file_path, compression='uncompressed')
+        elif extension == '.parquet':
+            df.to_parquet(file_path, index=False)
+        else:
+            df.to_csv(file_path, index=False, header=True)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def load_frame(file_path):
+    """
+    Load a DataFrame saved by save_frame. Arrow and Parquet files are memory-mapped instead of parsed.
+
+    Parameters:
+        file_path (str): The path of the .feather/.arrow, .parquet or .csv file.
+
+    Returns:
+        pandas.DataFrame: The loaded DataFrame.
+
+    Raises:
+        CustomException: If an error occurs while loading the DataFrame.
+
+    Example:
+        train_df = load_frame('artifacts/train.feather')
+    """
+    try:
+        import pandas as pd
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in ('.feather', '.arrow'):
+            from pyarrow import feather
+            return feather.read_table(file_path, memory_map=True).to_pandas()
+        if extension == '.parquet':
+            return pd.read_parquet(file_path, memory_map=True)
+        return pd.read_csv(file_path)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def iter_frame_chunks(file_path, chunk_size):
+    """
+    Yield a file saved by save_frame or FrameWriter as DataFrames of at most chunk_size rows,
+    so that it can be processed without loading it whole.
+
+    Example:
+        for chunk in iter_frame_chunks('artifacts/train.feather', 100_000):
+            statistics.update(chunk)
+    """
+    try:
+        import pandas as pd
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in ('.feather', '.arrow'):
+            from pyarrow import feather
+            table = feather.read_table(file_path, memory_map=True)
+            for batch in table.to_batches(max_chunksize=chunk_size):
+                yield batch.to_pandas()
+        elif extension == '.parquet':
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(file_path, memory_map=True).iter_batches(batch_size=chunk_size):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(file_path, chunksize=chunk_size)
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def save_array(array, file_path):
+    """
+    Save a NumPy array as an .npy file.
+
+    Example:
+        save_array(train_arr, 'artifacts/train_arr.npy')
+    """
+    try:
+        # Replace the file atomically; processes that memory-mapped the old file keep reading it unchanged.
+        with atomic_write(file_path) as file_obj:
+            np.save(file_obj, np.ascontiguousarray(array))
+    except Exception as e:
+        raise CustomException(e, sys)
+
+
+def load_array(file_path, mmap=True):
+    """
+    Load an .npy file, memory-mapped read-only by default so that nothing is copied until it is used.
+
+    Example:
+        train_arr = load_array('artifacts/train_arr.npy')
+    """
+    try:
+        return np.load(file_path, mmap_mode='r' if mmap else None)
     except Exception as e:
         raise CustomException(e, sys)
+
+
+class FrameWriter:
+    """
+    Append DataFrame chunks to one file, in the format given by the file extension (see save_frame),
+    without holding more than one chunk in memory. All chunks must have the same columns and dtypes.
+
+    Example:
+        with FrameWriter('artifacts/train.feather') as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.extension = os.path.splitext(file_path)[1].lower()
+        self._writer = None
+        self._schema = None
+        self.rows = 0
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+
+    def write(self, df):
+        try:
+            if self.extension in ('.feather', '.arrow', '.parquet'):
+                import pyarrow as pa
+                table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+                if self._writer is None:
+                    # A text column that is missing throughout the first chunk has no type yet; store it as
+                    # text, so that the later chunks match the schema.
+                    self._schema = pa.schema(
+                        [field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema],
+                        metadata=table.schema.metadata,
+                    )
+                    table = table.cast(self._schema)
+                    if self.extension == '.parquet':
+                        import pyarrow.parquet as pq
+                        self._writer = pq.ParquetWriter(self.file_path, self._schema)
+                    else:
+                        self._writer = pa.ipc.new_file(self.file_path, self._schema)
+                self._writer.write_table(table)
+            else:
+                df.to_csv(self.file_path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+            self.rows += len(df)
+        except Exception as e:
+            raise CustomException(e, sys)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
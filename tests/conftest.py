@@ -0,0 +1,34 @@
+import os
+
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.components.data_transformation import DataTransformation
+
+
+SOURCE_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "loan_dataset.csv")
+
+
+@pytest.fixture(scope="session")
+def loan_frame():
+    return pd.read_csv(SOURCE_DATA_PATH)
+
+
+@pytest.fixture(scope="session")
+def training_data(loan_frame):
+    """
+    The preprocessor fitted on data/loan_dataset.csv, the transformed features and the encoded target.
+    """
+    features = loan_frame.drop(columns=["Loan_Status", "Loan_ID"])
+    preprocessor = DataTransformation().get_data_transformer_object().fit(features)
+    X = preprocessor.transform(features)
+    y = (loan_frame["Loan_Status"] == "Y").to_numpy(dtype=float)
+    return preprocessor, X, y
+
+
+@pytest.fixture(scope="session")
+def fitted_artifacts(training_data):
+    preprocessor, X, y = training_data
+    model = RandomForestClassifier(n_estimators=20, max_depth=5, random_state=0).fit(X, y)
+    return preprocessor, model
@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+from api.batching import MicroBatcher
+
+
+def score(records):
+    if any(record == "bad" for record in records):
+        raise ValueError("bad record")
+    return [len(record) for record in records], [0.5] * len(records)
+
+
+def test_concurrent_requests_are_scored_in_one_batch():
+    calls = []
+
+    def recording_score(records):
+        calls.append(list(records))
+        return score(records)
+
+    async def main():
+        batcher = MicroBatcher(recording_score, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(*(batcher.submit("x" * i) for i in range(1, 6)))
+        await batcher.close()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(main())
+    assert results == [(i, 0.5) for i in range(1, 6)]
+    assert calls == [["x", "xx", "xxx", "xxxx", "xxxxx"]]
+    assert stats["batches"] == 1 and stats["items"] == 5
+
+
+def test_batches_are_capped_at_max_batch_size():
+    async def main():
+        batcher = MicroBatcher(score, max_batch_size=2, max_wait_ms=50)
+        await asyncio.gather(*(batcher.submit("x") for _ in range(5)))
+        await batcher.close()
+        return batcher.stats()
+
+    stats = asyncio.run(main())
+    assert stats["max_seen_batch_size"] == 2
+    assert stats["batches"] == 3
+
+
+def test_a_lone_request_is_flushed_after_max_wait():
+    async def main():
+        batcher = MicroBatcher(score, max_batch_size=64, max_wait_ms=20)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        result = await asyncio.wait_for(batcher.submit("abc"), timeout=2)
+        elapsed = loop.time() - started
+        await batcher.close()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(main())
+    assert result == (3, 0.5)
+    assert 0.015 <= elapsed < 1
+
+
+def test_a_failing_request_does_not_fail_the_others():
+    async def main():
+        batcher = MicroBatcher(score, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(batcher.submit("ok"), batcher.submit("bad"), batcher.submit("fine"),
+                                       return_exceptions=True)
+        await batcher.close()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(main())
+    assert results[0] == (2, 0.5) and results[2] == (4, 0.5)
+    assert isinstance(results[1], ValueError)
+    assert stats["failed_batches"] == 1
+
+
+def test_close_scores_the_queued_requests():
+    release = threading.Event()
+
+    def slow_score(records):
+        release.wait(5)
+        return score(records)
+
+    async def main():
+        batcher = MicroBatcher(slow_score, max_batch_size=1, max_wait_ms=0)
+        pending = [asyncio.ensure_future(batcher.submit("x" * i)) for i in range(1, 4)]
+        await asyncio.sleep(0.05)
+        closing = asyncio.ensure_future(batcher.close())
+        await asyncio.sleep(0.05)
+        release.set()
+        await closing
+        return await asyncio.gather(*pending)
+
+    assert asyncio.run(main()) == [(1, 0.5), (2, 0.5), (3, 0.5)]
+
+
+def test_close_fails_requests_it_cannot_score_in_time():
+    release = threading.Event()
+
+    def stuck_score(records):
+        release.wait(5)
+        return score(records)
+
+    async def main():
+        batcher = MicroBatcher(stuck_score, max_batch_size=1, max_wait_ms=0)
+        pending = [asyncio.ensure_future(batcher.submit("x")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        await batcher.close(timeout=0.1)
+        release.set()
+        return await asyncio.gather(*pending, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
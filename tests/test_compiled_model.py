@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import (AdaBoostClassifier, ExtraTreesClassifier, GradientBoostingClassifier,
+                              RandomForestClassifier)
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier, ExtraTreeClassifier
+
+from src.pipelines.compiled_model import CompiledModel, compile_model
+
+
+def xgboost_classifier():
+    xgboost = pytest.importorskip("xgboost")
+    return xgboost.XGBClassifier(n_estimators=20, max_depth=3)
+
+
+def catboost_classifier():
+    catboost = pytest.importorskip("catboost")
+    return catboost.CatBoostClassifier(iterations=20, depth=4, verbose=False, allow_writing_files=False)
+
+
+MODEL_FAMILIES = {
+    "decision_tree": lambda: DecisionTreeClassifier(max_depth=6, random_state=0),
+    "extra_tree": lambda: ExtraTreeClassifier(max_depth=6, random_state=0),
+    "random_forest": lambda: RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0),
+    "extra_trees": lambda: ExtraTreesClassifier(n_estimators=20, max_depth=6, random_state=0),
+    "adaboost": lambda: AdaBoostClassifier(n_estimators=20, random_state=0),
+    "gradient_boosting": lambda: GradientBoostingClassifier(n_estimators=20, random_state=0),
+    "logistic_regression": lambda: LogisticRegression(max_iter=1000),
+    "xgboost": xgboost_classifier,
+    "catboost": catboost_classifier,
+}
+
+
+@pytest.mark.parametrize("family", list(MODEL_FAMILIES))
+def test_compiled_model_matches_predict_proba(family, training_data, tmp_path):
+    _, X, y = training_data
+    X = np.asarray(X, dtype=np.float64)
+    model = MODEL_FAMILIES[family]().fit(X, y)
+
+    compiled = compile_model(model)
+    compiled.save(str(tmp_path / "model_compiled.npz"))
+    loaded = CompiledModel.load(str(tmp_path / "model_compiled.npz"))
+
+    for candidate in (compiled, loaded):
+        np.testing.assert_allclose(candidate.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-7)
+        np.testing.assert_array_equal(candidate.predict(X), model.predict(X))
+
+
+def test_gradient_boosting_without_private_init_is_not_compiled(training_data, monkeypatch):
+    _, X, y = training_data
+    model = GradientBoostingClassifier(n_estimators=5, random_state=0).fit(np.asarray(X), y)
+    monkeypatch.delattr("sklearn.ensemble._gb.BaseGradientBoosting._raw_predict_init")
+
+    with pytest.raises(ValueError):
+        compile_model(model)
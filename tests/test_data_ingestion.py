@@ -0,0 +1,36 @@
+import os
+
+import pandas as pd
+
+from src.cache import StageCache, StageCacheConfig
+from src.components.data_ingestion import DataIngestion
+from src.utils import load_frame
+
+
+SOURCE_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "loan_dataset.csv")
+
+
+def test_stream_data_ingestion_with_leading_all_null_text_column(tmp_path):
+    # The first chunk has no Gender at all, the later ones do.
+    df = pd.read_csv(SOURCE_DATA_PATH).head(40)
+    df.loc[:9, "Gender"] = None
+    source_path = tmp_path / "loans.csv"
+    df.to_csv(source_path, index=False)
+
+    data_ingestion = DataIngestion(stage_cache=StageCache(StageCacheConfig(cache_dir=str(tmp_path / "cache"))))
+    config = data_ingestion.ingestion_config
+    config.source_data_path = str(source_path)
+    config.raw_data_path = str(tmp_path / "loan.feather")
+    config.train_data_path = str(tmp_path / "train.feather")
+    config.test_data_path = str(tmp_path / "test.feather")
+    config.streaming = True
+    config.chunk_size = 5
+
+    train_path, test_path = data_ingestion.initiate_data_ingestion()
+
+    raw = load_frame(config.raw_data_path)
+    assert len(raw) == len(df)
+    assert len(load_frame(train_path)) + len(load_frame(test_path)) == len(df)
+    assert raw["Gender"].isna().sum() == df["Gender"].isna().sum()
+    assert raw["Gender"].dropna().isin(["Male", "Female"]).all()
+    assert raw["LoanAmount"].dtype == "float64"
@@ -0,0 +1,23 @@
+import numpy as np
+
+from api.drift import DriftMonitor
+from src.components.data_transformation import CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS
+from src.components.drift_profile import build_drift_profile
+from src.pipelines.prediction_pipeline import FIELD_MAP
+
+
+def test_columnar_updates_are_split_at_the_window_boundary(loan_frame):
+    monitor = DriftMonitor(build_drift_profile(loan_frame, NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS), window_size=10)
+    rows = loan_frame.dropna().head(25)
+    columns = {field: rows[column].to_numpy() for field, column in FIELD_MAP.items()}
+
+    monitor.update_columns({field: values[:4] for field, values in columns.items()})
+    monitor.update_columns({field: values[4:] for field, values in columns.items()})
+
+    report = monitor.report()
+    assert monitor.observed == 25
+    assert report["total"]["applications"] == 25
+    assert report["window"]["applications"] == 10
+    assert monitor._window_count == 5
+    assert sum(monitor._window["gender"]) == 5
+    assert np.sum(monitor._total["gender"]) == 25
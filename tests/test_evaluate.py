@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import src.evaluate
+from src.evaluate import _ensemble_size_param, _halving_search
+
+
+def test_halving_rounds_are_capped_by_the_samples(monkeypatch):
+    rounds = []
+
+    def fake_score_candidates(models, candidates, alive, X, y, folds, deadline, n_jobs, warm_start,
+                              results_store, data_hash, cv_scheme, n_samples=None):
+        rounds.append((n_samples, {model_name: len(indices) for model_name, indices in alive.items()}))
+        # Candidate i of every model scores i, so the leader of each family is its last candidate.
+        scores = {(model_name, i): i / 10000 for model_name, indices in alive.items() for i in indices}
+        return scores, sum(len(indices) for indices in alive.values()) * len(folds)
+
+    monkeypatch.setattr(src.evaluate, "_score_candidates", fake_score_candidates)
+    folds = [(np.arange(327), np.arange(327, 490))] * 3
+    models = {"Gradient Boosting": None, "Random Forest": None}
+    candidates = {"Gradient Boosting": [{}] * 96, "Random Forest": [{}] * 12}
+
+    best_params, _, _ = _halving_search(models, candidates, None, None, folds, None, 1, True, None, None, "cv",
+                                        factor=3, min_resources=50, family_prune_margin=0.05)
+
+    # 327 / 50 samples allow two rounds: 96 candidates would need six.
+    assert [n_samples for n_samples, _ in rounds] == [109, 327]
+    assert rounds[0][1] == {"Gradient Boosting": 96, "Random Forest": 12}
+    assert rounds[1][1] == {"Gradient Boosting": int(np.ceil(96 / 3 ** 5)), "Random Forest": 1}
+    assert set(best_params) == {"Gradient Boosting", "Random Forest"}
+
+
+def test_catboost_prefixes_need_a_fixed_learning_rate():
+    catboost = pytest.importorskip("catboost")
+    model = catboost.CatBoostClassifier(verbose=False)
+
+    assert _ensemble_size_param(model, {"iterations": 100, "depth": 6}) is None
+    assert _ensemble_size_param(model, {"iterations": 100, "learning_rate": 0.1}) == "iterations"
+    assert _ensemble_size_param(model.set_params(learning_rate=0.1), {"iterations": 100}) == "iterations"
@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from api.jobs import run_job
+from src.job_store import JobStore, JobStoreConfig
+from src.pipelines.prediction_pipeline import PredictionPipeline, PredictionPipelineConfig
+
+
+class FakePipelines:
+    """
+    Stands in for the worker's _PipelineLoader: serves one pipeline and records the versions loaded.
+    """
+    def __init__(self, pipeline, version="v0001"):
+        self.pipeline = pipeline
+        self.version = version
+        self.loaded = []
+
+    def current_version(self):
+        return self.version
+
+    def load(self, version):
+        self.loaded.append(version)
+        return self.pipeline
+
+
+class StopAfter:
+    """
+    A stop event that is set once it was checked the given number of times.
+    """
+    def __init__(self, checks):
+        self.checks = checks
+
+    def is_set(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(JobStoreConfig(db_path=str(tmp_path / "jobs.sqlite"), jobs_dir=str(tmp_path / "jobs")))
+
+
+@pytest.fixture
+def pipelines(fitted_artifacts):
+    preprocessor, model = fitted_artifacts
+    return FakePipelines(PredictionPipeline(preprocessor=preprocessor, model=model, config=PredictionPipelineConfig(
+        use_compiled_model=False, use_serving_artifact=False)))
+
+
+@pytest.fixture
+def input_path(tmp_path, loan_frame):
+    path = tmp_path / "applications.csv"
+    loan_frame.drop(columns=["Loan_Status"]).head(10).to_csv(path, index=False)
+    return str(path)
+
+
+def expire_lease(store, job_id):
+    with store._connect() as connection:
+        connection.execute("UPDATE jobs SET heartbeat = heartbeat - 3600 WHERE id = ?", (job_id,))
+
+
+def test_expired_lease_is_claimed_again_and_stale_worker_is_rejected(store):
+    job_id = store.create("input.csv", "csv", "results.csv", "csv", 4)
+    assert store.claim("worker-a", lease_seconds=60)["id"] == job_id
+    assert store.start(job_id, "worker-a", 10, "v0001")
+    # The lease is held, so there is nothing to claim.
+    assert store.claim("worker-b", lease_seconds=60) is None
+
+    expire_lease(store, job_id)
+    job = store.claim("worker-b", lease_seconds=60)
+    assert (job["id"], job["worker"], job["attempts"]) == (job_id, "worker-b", 2)
+
+    # The first worker lost its lease: its updates are rejected and do not touch the job.
+    assert not store.commit_chunk(job_id, "worker-a", 1, 4, 0, 100)
+    assert not store.finish(job_id, "worker-a", "failed", error="stale")
+    store.release(job_id, "worker-a")
+    job = store.get(job_id)
+    assert (job["status"], job["worker"], job["chunks_done"], job["error"]) == ("running", "worker-b", 0, None)
+
+    assert store.commit_chunk(job_id, "worker-b", 1, 4, 0, 100)
+    assert store.finish(job_id, "worker-b", "succeeded")
+    assert store.get(job_id)["status"] == "succeeded"
+    assert store.counts()["succeeded"] == 1
+
+
+def test_run_job_resumes_from_the_committed_output_size(store, pipelines, input_path, tmp_path):
+    reference_path = str(tmp_path / "reference.csv")
+    reference_id = store.create(input_path, "csv", reference_path, "csv", 4)
+    assert run_job(store, store.claim("worker-a", 60), "worker-a", pipelines, threading.Event())
+    with open(reference_path, "rb") as file_obj:
+        reference = file_obj.read()
+    assert store.get(reference_id)["rows_done"] == 10
+
+    output_path = str(tmp_path / "results.csv")
+    job_id = store.create(input_path, "csv", output_path, "csv", 4)
+    # Stop after the first chunk: the job goes back in the queue with its progress.
+    assert not run_job(store, store.claim("worker-a", 60), "worker-a", pipelines, StopAfter(1))
+    job = store.get(job_id)
+    assert (job["status"], job["chunks_done"], job["rows_done"]) == ("queued", 1, 4)
+    with open(output_path, "rb") as file_obj:
+        assert file_obj.read() == reference[:job["output_bytes"]]
+
+    # A chunk written but not committed before the worker died is dropped on resume.
+    with open(output_path, "ab") as file_obj:
+        file_obj.write(b"4,LP_UNCOMMITTED,Approved,0.5,\n")
+    pipelines.version = "v0002"
+    assert run_job(store, store.claim("worker-b", 60), "worker-b", pipelines, threading.Event())
+
+    with open(output_path, "rb") as file_obj:
+        assert file_obj.read() == reference
+    job = store.get(job_id)
+    assert (job["status"], job["chunks_done"], job["rows_done"], job["attempts"]) == ("succeeded", 3, 10, 2)
+    # The resumed job is scored by the version pinned on its first claim.
+    assert job["model_version"] == "v0001"
+    assert pipelines.loaded[-1] == "v0001"
+
+
+def test_run_job_stops_when_the_lease_is_lost(store, pipelines, input_path, tmp_path):
+    job_id = store.create(input_path, "csv", str(tmp_path / "results.csv"), "csv", 4)
+    job = store.claim("worker-a", 60)
+    expire_lease(store, job_id)
+    store.claim("worker-b", 60)
+
+    assert not run_job(store, job, "worker-a", pipelines, threading.Event())
+    job = store.get(job_id)
+    assert (job["status"], job["worker"], job["total_rows"], job["chunks_done"]) == ("running", "worker-b", None, 0)
@@ -0,0 +1,15 @@
+import logging as stdlib_logging
+
+from src.logger import LOG_FILE_PATH, logging, logging_config, stop_logging
+
+
+def test_records_logged_after_stop_logging_are_written():
+    stop_logging()
+    logging.info("logged after the writer thread stopped")
+    stop_logging()
+
+    root = stdlib_logging.getLogger()
+    if logging_config.mode == "queue":
+        assert not any(isinstance(handler, stdlib_logging.handlers.QueueHandler) for handler in root.handlers)
+    with open(LOG_FILE_PATH) as file_obj:
+        assert "logged after the writer thread stopped" in file_obj.read()
@@ -0,0 +1,16 @@
+from fastapi import FastAPI
+
+from api.metrics import MetricsMiddleware, ServingMetrics
+
+
+def test_requests_are_labelled_with_the_route_template():
+    app = FastAPI()
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        return job_id
+
+    middleware = MetricsMiddleware(app, ServingMetrics(), routes=lambda: app.routes)
+
+    assert middleware.route_label("/jobs/0123abcd") == "/jobs/{job_id}"
+    assert middleware.route_label("/unknown") == "other"
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+import src.components.model_trainer
+from api.model_watcher import ModelWatcher
+from src.components.model_trainer import ModelTrainer
+from src.model_registry import ModelRegistry, ModelRegistryConfig
+from src.utils import save_object
+
+
+def save_version_files(directory, preprocessor, model):
+    os.makedirs(directory, exist_ok=True)
+    files = {"preprocessor": os.path.join(directory, "preprocessor.pkl"), "model": os.path.join(directory, "model.pkl")}
+    save_object(files["preprocessor"], preprocessor)
+    save_object(files["model"], model)
+    return files
+
+
+def test_publish_rollback_and_pin(tmp_path, training_data, fitted_artifacts):
+    preprocessor, X, y = training_data
+    _, forest = fitted_artifacts
+    linear = LogisticRegression(max_iter=1000).fit(X, y)
+    registry_config = ModelRegistryConfig(registry_dir=str(tmp_path / "registry"))
+    registry = ModelRegistry(registry_config)
+
+    v1 = registry.publish(save_version_files(str(tmp_path / "a"), preprocessor, forest), metadata={"run": 1})
+    v2 = registry.publish(save_version_files(str(tmp_path / "b"), preprocessor, linear), metadata={"run": 2})
+    assert (v1, v2) == ("v0001", "v0002")
+    assert registry.current() == v2
+    # Versions are complete directories; no temporary directory is left behind.
+    assert sorted(os.listdir(registry.versions_dir)) == [v1, v2]
+    assert set(registry.files(v1)) == {"preprocessor", "model"}
+    assert registry.metadata(v2)["run"] == 2
+
+    # Identical files are not published again, and the active version does not change.
+    assert registry.publish(save_version_files(str(tmp_path / "c"), preprocessor, forest)) == v1
+    assert registry.current() == v2
+
+    assert registry.rollback() == v1
+    assert registry.pinned()
+    with open(registry.pointer_path) as file_obj:
+        assert json.load(file_obj)["history"] == []
+
+    # A version published while a rollback is pinned is kept, but not activated.
+    retrained = LogisticRegression(C=0.5, max_iter=1000).fit(X, y)
+    v3 = registry.publish(save_version_files(str(tmp_path / "d"), preprocessor, retrained))
+    assert v3 == "v0003"
+    assert registry.current() == v1
+
+    watcher = ModelWatcher(registry_config, poll_seconds=0)
+    assert watcher.version == v1
+    assert type(watcher.pipeline.model).__name__ in ("RandomForestClassifier", "CompiledTreeModel")
+
+    registry.activate(v3)
+    assert not registry.pinned()
+    with open(registry.pointer_path) as file_obj:
+        assert json.load(file_obj)["history"] == [v1]
+    asyncio.run(watcher.check())
+    assert watcher.version == v3
+
+
+def test_cached_training_run_does_not_republish(tmp_path, monkeypatch, training_data):
+    pytest.importorskip("xgboost")
+    pytest.importorskip("catboost")
+    preprocessor, X, y = training_data
+    monkeypatch.chdir(tmp_path)
+    save_object(os.path.join("artifacts", "preprocessor.pkl"), preprocessor)
+
+    def fake_evaluate_models(X_train, y_train, X_test, y_test, models, params, **kwargs):
+        models["Logistic Regression"].set_params(max_iter=1000).fit(X_train, y_train)
+        return {"Logistic Regression": 0.8}
+
+    monkeypatch.setattr(src.components.model_trainer, "evaluate_models", fake_evaluate_models)
+    arrays = np.c_[X, y]
+    train_array, test_array = arrays[:400], arrays[400:]
+
+    model_trainer = ModelTrainer()
+    model_trainer.model_trainer_config.cv_results_db_path = None
+    model_trainer.initiate_model_trainer(train_array, test_array)
+    registry = ModelRegistry(ModelRegistryConfig(registry_dir=model_trainer.model_trainer_config.registry_dir))
+    assert [version["version"] for version in registry.versions()] == ["v0001"]
+
+    # Publish and roll back to another version; the cached run must not reactivate v0001.
+    other = save_version_files("other", preprocessor, LogisticRegression(C=0.1, max_iter=1000).fit(X, y))
+    registry.publish(other, override_pin=True)
+    registry.rollback()
+    registry.activate("v0002")
+
+    model_trainer.initiate_model_trainer(train_array, test_array)
+    assert [version["version"] for version in registry.versions()] == ["v0001", "v0002"]
+    assert registry.current() == "v0002"
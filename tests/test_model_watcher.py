@@ -0,0 +1,22 @@
+import asyncio
+import os
+
+from api.model_watcher import ModelWatcher
+from src.model_registry import ModelRegistryConfig
+from src.utils import save_object
+
+
+def test_watcher_starts_without_a_model_and_loads_the_default_artifacts(tmp_path, monkeypatch, fitted_artifacts):
+    monkeypatch.chdir(tmp_path)
+    watcher = ModelWatcher(ModelRegistryConfig(registry_dir=str(tmp_path / "registry")), poll_seconds=0)
+    assert watcher.pipeline is None
+    assert watcher.info()["model"] is None
+    assert not asyncio.run(watcher.check())
+
+    preprocessor, model = fitted_artifacts
+    save_object(os.path.join("artifacts", "preprocessor.pkl"), preprocessor)
+    save_object(os.path.join("artifacts", "model.pkl"), model)
+
+    assert asyncio.run(watcher.check())
+    assert watcher.version is None
+    assert watcher.info()["model"] == "RandomForestClassifier"
@@ -0,0 +1,55 @@
+import copy
+
+import numpy as np
+from sklearn.base import clone
+
+from api.schemas import LoanData
+from src.pipelines.prediction_pipeline import PredictionPipeline, PredictionPipelineConfig
+
+
+EXAMPLE = LoanData.Config.schema_extra["example"]
+
+
+def make_pipeline(fitted_artifacts):
+    preprocessor, model = fitted_artifacts
+    return PredictionPipeline(preprocessor=preprocessor, model=model,
+                              config=PredictionPipelineConfig(use_compiled_model=False, use_serving_artifact=False))
+
+
+def test_validate_rejects_unknown_categories(fitted_artifacts):
+    pipeline = make_pipeline(fitted_artifacts)
+    unknown = dict(EXAMPLE, gender="Alien")
+    missing = dict(EXAMPLE, self_employed=None)
+
+    errors = pipeline.validate([copy.deepcopy(EXAMPLE), unknown, missing])
+
+    assert list(errors) == [1]
+    assert errors[1] == [f"Gender: 'Alien' is not one of {pipeline.allowed_categories()['Gender']}"]
+
+
+def test_validate_accepts_aliases_and_numeric_categories(fitted_artifacts):
+    pipeline = make_pipeline(fitted_artifacts)
+    records = {"married": ["Married", "No"], "dependents": [2.0, "3+"]}
+    columns = {field: [EXAMPLE[field]] * 2 for field in EXAMPLE} | records
+
+    assert pipeline.validate(columns) == {}
+
+
+def test_featurize_matches_preprocessor_transform(fitted_artifacts, loan_frame):
+    preprocessor, _ = fitted_artifacts
+    pipeline = make_pipeline(fitted_artifacts)
+    features = loan_frame.drop(columns=["Loan_Status", "Loan_ID"])
+
+    assert pipeline.compiled
+    np.testing.assert_allclose(pipeline.featurize(features), preprocessor.transform(features), rtol=0, atol=1e-12)
+
+
+def test_infrequent_category_encoders_are_applied_through_the_preprocessor(fitted_artifacts, loan_frame):
+    preprocessor, model = fitted_artifacts
+    preprocessor = clone(preprocessor).set_params(cat_pipeline__onehot__min_frequency=100)
+    features = loan_frame.drop(columns=["Loan_Status", "Loan_ID"])
+    preprocessor.fit(features)
+    pipeline = make_pipeline((preprocessor, model))
+
+    assert not pipeline.compiled
+    np.testing.assert_array_equal(pipeline.featurize(features), preprocessor.transform(features))
@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.components.data_transformation import CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS, DataTransformation
+from src.components.preprocessing_statistics import PreprocessingStatistics
+
+
+def fit_both(frame, chunk_size):
+    """
+    Fit the preprocessor in one batch, and from statistics computed per chunk and merged.
+    """
+    transformation = DataTransformation()
+    batch = transformation.get_data_transformer_object().fit(frame)
+    statistics = PreprocessingStatistics(NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS)
+    for start in range(0, len(frame), chunk_size):
+        chunk = PreprocessingStatistics(NUMERICAL_COLUMNS, CATEGORICAL_COLUMNS)
+        statistics.merge(chunk.update(frame.iloc[start:start + chunk_size]))
+    incremental = statistics.build_preprocessor(transformation.get_data_transformer_object())
+    return batch, incremental, statistics
+
+
+def steps(preprocessor):
+    num_pipeline = preprocessor.named_transformers_["num_pipeline"]
+    cat_pipeline = preprocessor.named_transformers_["cat_pipeline"]
+    return (num_pipeline.named_steps["imputer"], num_pipeline.named_steps["scalar"],
+            cat_pipeline.named_steps["imputer"], cat_pipeline.named_steps["onehot"])
+
+
+def test_merged_statistics_match_the_batch_fit(loan_frame):
+    features = loan_frame.drop(columns=["Loan_Status", "Loan_ID"])
+    batch, incremental, _ = fit_both(features, chunk_size=100)
+
+    for batch_step, incremental_step in zip(steps(batch)[:2], steps(incremental)[:2]):
+        for attribute in ("statistics_", "mean_", "var_", "scale_"):
+            if hasattr(batch_step, attribute):
+                np.testing.assert_allclose(getattr(incremental_step, attribute), getattr(batch_step, attribute),
+                                           rtol=1e-12)
+    assert list(steps(incremental)[2].statistics_) == list(steps(batch)[2].statistics_)
+    assert [list(c) for c in steps(incremental)[3].categories_] == [list(c) for c in steps(batch)[3].categories_]
+    np.testing.assert_allclose(incremental.transform(features), batch.transform(features), rtol=1e-12, atol=1e-12)
+
+
+def test_medians_above_the_exact_limit_are_within_the_sketch_accuracy(loan_frame):
+    # Resample the applications with continuous incomes and loan amounts, so that the columns have more
+    # distinct values than the sketch counts exactly and the medians come from its logarithmic buckets.
+    rng = np.random.default_rng(0)
+    features = loan_frame.drop(columns=["Loan_Status", "Loan_ID"])
+    frame = features.sample(40_000, replace=True, random_state=0).reset_index(drop=True)
+    for column in ("ApplicantIncome", "CoapplicantIncome", "LoanAmount"):
+        frame[column] = frame[column] * rng.uniform(0.9, 1.1, len(frame))
+    batch, incremental, statistics = fit_both(frame, chunk_size=7_000)
+    assert not statistics.sketches["ApplicantIncome"].is_exact
+
+    relative_accuracy = statistics.sketches["ApplicantIncome"].relative_accuracy
+    batch_imputer, batch_scaler = steps(batch)[:2]
+    incremental_imputer, incremental_scaler = steps(incremental)[:2]
+    np.testing.assert_allclose(incremental_imputer.statistics_, batch_imputer.statistics_, rtol=relative_accuracy)
+    # The scaling statistics are exact up to the imputed median of the missing rows.
+    np.testing.assert_allclose(incremental_scaler.mean_, batch_scaler.mean_, rtol=relative_accuracy)
+    np.testing.assert_allclose(incremental_scaler.var_, batch_scaler.var_, rtol=relative_accuracy)
+    assert list(steps(incremental)[2].statistics_) == list(steps(batch)[2].statistics_)
+    # A median off by the sketch's accuracy moves the imputed features by a fraction of the scale only.
+    differences = np.abs(incremental.transform(frame) - batch.transform(frame))
+    assert differences.max() < 1e-2
@@ -0,0 +1,34 @@
+from src.logger import logging
+from src.exception import CustomException
+from src.components.model_trainer import ModelTrainer
+
+import argparse
+import sys
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Update the active registry version with newly labeled loan applications.")
+    parser.add_argument("new_data", help="Labeled applications (data/loan_dataset.csv schema, .csv/.feather/.parquet)")
+    parser.add_argument("--holdout", default=None, help="Labeled applications to compare the models on; "
+                                                        "defaults to artifacts/test_arr.npy if it "
+                                                        "matches the active version's preprocessor")
+    parser.add_argument("--rounds", type=int, default=None, help="Trees or boosting rounds added per update")
+    parser.add_argument("--tolerance", type=float, default=None, help="Holdout accuracy drop allowed for promotion")
+    return parser.parse_args()
+
+
+if __name__=="__main__":
+    args = parse_args()
+    logging.info("Incremental model update has started")
+
+    try:
+        model_trainer = ModelTrainer()
+        if args.rounds is not None:
+            model_trainer.model_trainer_config.update_rounds = args.rounds
+        if args.tolerance is not None:
+            model_trainer.model_trainer_config.promotion_tolerance = args.tolerance
+        print(model_trainer.update_model(args.new_data, holdout_path=args.holdout))
+
+    except Exception as e:
+        logging.info("Custom Exception")
+        raise CustomException(e, sys)